@@ -3,11 +3,35 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from datetime import datetime, timedelta
 from faker import Faker
+import os
 import time
+import logging
+import threading
+import hashlib
+import json
+import html
+import re
+import shutil
+import smtplib
+import sqlite3
+import tempfile
+import unicodedata
+from email.message import EmailMessage
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import pyarrow as pa
+import pyarrow.parquet as pq
 from streamlit_option_menu import option_menu
-import random
+
+try:
+    import openpyxl  # opcional: habilita a exportação em XLSX
+except ImportError:
+    openpyxl = None
 
 st.set_page_config(
     page_title="Aurum - Dashboard Starter",
@@ -16,7 +40,110 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-fake = Faker('pt_BR')
+# Dados compartilhados entre sessões: com Copy-on-Write nenhuma operação derivada altera o frame em cache
+pd.set_option('mode.copy_on_write', True)
+
+DATASET_SEED = 42
+DATASET_TTL = 60 * 60  # segundos até o dataset em cache ser recarregado
+
+# Volumes do dataset sintético; AURUM_PERFIL=carga gera volumes para teste de carga
+PERFIS_DATASET = {
+    'demo': {'meses': 24, 'granularidade': 'ME', 'vendedores': 10, 'transacoes': 3000, 'lote': 20,
+             'visitantes': 60000, 'unidades': 300},
+    'carga': {'meses': 24, 'granularidade': 'D', 'vendedores': 2000, 'transacoes': 5000000, 'lote': 20000,
+              'visitantes': 8000000, 'unidades': 5000},
+}
+DATASET_PERFIL = os.environ.get('AURUM_PERFIL', 'demo')
+POOL_NOMES = 5000  # tamanho máximo dos pools de nomes/empresas do Faker
+
+# Tabelas persistidas em Arrow IPC (colunar, sem compressão) e lidas via memory-map: os processos do
+# servidor compartilham as mesmas páginas pelo page cache do sistema operacional
+DATA_DIR = Path(os.environ.get('AURUM_DATA_DIR', Path(__file__).parent / 'data'))
+COLUNAS_TRANSACAO = ['data', 'cliente', 'produto', 'valor', 'status', 'vendedor', 'regiao']
+
+FIGURE_CACHE_MAX = 64  # figuras serializadas mantidas no cache LRU
+FORECAST_HORIZON = 6  # meses projetados após o último mês fechado
+FORECAST_Z = 1.96  # banda de confiança de 95% da projeção
+FUNNEL_CACHE_MAX = 32  # recortes do funil mantidos no cache LRU
+COHORT_MAX_MESES = 64  # meses de atividade por cliente, um bit de um uint64 por mês
+COHORT_HEATMAP_MESES = 12  # coortes e meses de vida mostrados no heatmap
+GEO_CELULA_GRAUS = 0.5  # lado da célula do índice espacial em grade
+GEO_MAX_MARCADORES = 1500  # pontos por camada do mapa antes de agrupar em clusters
+RAIO_TERRA_KM = 6371.0
+COBERTURA_BLOCO = 4000000  # distâncias ponto x unidade calculadas por bloco na atribuição
+CHAT_CACHE_MAX = 256  # respostas do chatbot mantidas no cache LRU
+CHAT_DB_PATH = DATA_DIR / 'chat.sqlite3'  # histórico do chat por usuário
+CHAT_PAGE_SIZE = 20  # mensagens carregadas por página do histórico
+CHAT_RETENTION = 500  # mensagens mantidas por usuário; as mais antigas são apagadas
+CHAT_SESSION_MAX = 100  # mensagens mantidas na sessão (múltiplo de CHAT_PAGE_SIZE); o resto fica só no banco
+CHAT_BACKEND = os.environ.get('AURUM_CHAT_BACKEND', 'local')  # backend de respostas do chatbot
+CHAT_STREAM_INTERVAL = 0.05  # segundos mínimos entre atualizações da resposta em streaming
+LEADERBOARD_PAGE_SIZE = 25  # vendedores por página do Hall da Fama
+FEED_PAGE_SIZE = 6  # cartões por página do feed de transações
+EXPORT_CHUNK_ROWS = 200000  # linhas por bloco gravado na exportação
+XLSX_MAX_ROWS = 1048575  # limite de linhas de uma planilha, descontado o cabeçalho
+EXPORT_MAX_BYTES = 2 * 1024 ** 3  # espaço em disco dos relatórios gerados; os mais antigos são apagados
+
+# Envio de relatórios por email; o padrão aponta para um servidor SMTP local de depuração:
+#   python -m aiosmtpd -n -l localhost:1025
+SMTP_CONFIG = {
+    'host': os.environ.get('AURUM_SMTP_HOST', 'localhost'),
+    'port': int(os.environ.get('AURUM_SMTP_PORT', 1025)),
+    'usuario': os.environ.get('AURUM_SMTP_USER'),
+    'senha': os.environ.get('AURUM_SMTP_PASSWORD'),
+    'starttls': os.environ.get('AURUM_SMTP_STARTTLS', '0') == '1',
+    'remetente': os.environ.get('AURUM_SMTP_FROM', 'relatorios@aurum.local'),
+}
+EMAIL_WORKERS = 2  # envios simultâneos por processo
+EMAIL_MAX_PENDING = 10  # jobs na fila ou em execução antes de recusar novos envios
+EMAIL_JOBS_KEPT = 50  # jobs concluídos mantidos para exibição do status
+LOGIN_PAINT_BUDGET_MS = 1500  # orçamento de latência do login até a primeira renderização do dashboard
+
+logger = logging.getLogger(__name__)
+
+# Domínios usados na geração do dataset; o app lê as tabelas de dimensão persistidas a partir deles
+REGIOES_UF = {'SP': 'São Paulo', 'RJ': 'Rio de Janeiro', 'MG': 'Minas Gerais', 'PR': 'Paraná', 'RS': 'Rio Grande do Sul'}
+REGIOES = list(REGIOES_UF.values())
+PRODUTOS = ['Aurum Premium', 'Aurum Standard', 'Aurum Starter', 'Aurum Enterprise', 'Aurum Pro']
+STATUS_TRANSACAO = ['Concluída', 'Pendente', 'Processando']
+
+# Unidades de infraestrutura: as principais, a partir das quais a rede sintética é gerada
+UNIDADES_PRINCIPAIS = {
+    'Local': ['Centro SP', 'Filial RJ', 'CD Campinas', 'Escritório BH', 'Hub Curitiba', 
+             'Base Floripa', 'Centro GO', 'Filial Salvador', 'Hub Recife', 'Base Fortaleza'],
+    'Cidade': ['São Paulo', 'Rio de Janeiro', 'Campinas', 'Belo Horizonte', 'Curitiba',
+               'Florianópolis', 'Goiânia', 'Salvador', 'Recife', 'Fortaleza'],
+    'Tipo': ['Sede', 'Filial', 'Centro de Distribuição', 'Escritório', 'Hub Logístico',
+            'Base Operacional', 'Centro Regional', 'Filial', 'Hub Logístico', 'Base Operacional'],
+    'Status': ['Ativo', 'Ativo', 'Ativo', 'Ativo', 'Ativo', 'Ativo', 'Ativo', 'Manutenção', 'Ativo', 'Ativo'],
+    'Funcionarios': [350, 180, 45, 85, 120, 65, 95, 140, 110, 75],
+    'Cobertura_KM': [500, 400, 300, 350, 450, 280, 380, 420, 390, 320],
+    'Lat': [-23.5505, -22.9068, -22.9056, -19.9167, -25.2521, -27.2423, -16.6864, -12.9714, -8.0476, -3.7319],
+    'Lon': [-46.6333, -43.1729, -47.0608, -43.9345, -49.2908, -48.2619, -49.2643, -38.5014, -34.8770, -38.5267]
+}
+
+# Cores e símbolos por tipo de unidade no mapa
+TIPOS_UNIDADE = {
+    'Sede': {'color': '#DAA520', 'symbol': 'star', 'size': 20},
+    'Filial': {'color': '#00BFFF', 'symbol': 'circle', 'size': 15},
+    'Centro de Distribuição': {'color': '#FF6347', 'symbol': 'square', 'size': 18},
+    'Escritório': {'color': '#32CD32', 'symbol': 'triangle-up', 'size': 12},
+    'Hub Logístico': {'color': '#FF1493', 'symbol': 'diamond', 'size': 16},
+    'Base Operacional': {'color': '#9370DB', 'symbol': 'cross', 'size': 14},
+    'Centro Regional': {'color': '#FF8C00', 'symbol': 'hexagon', 'size': 15}
+}
+
+# Janelas do mapa: (lat mínima, lat máxima, lon mínima, lon máxima)
+VIEWPORTS_MAPA = {
+    'Brasil': (-34.0, 6.0, -74.0, -34.0),
+    'Sudeste': (-25.5, -14.0, -53.5, -39.0),
+    'Sul': (-34.0, -22.5, -58.0, -47.5),
+    'Centro-Oeste': (-24.5, -7.0, -61.5, -45.5),
+    'Nordeste': (-18.5, -1.0, -48.5, -34.5),
+    'Norte': (-13.5, 5.5, -74.0, -46.0),
+}
+ETAPAS_FUNIL = ['Visitantes', 'Leads', 'Oportunidades', 'Propostas', 'Fechamentos']
+CONVERSAO_FUNIL = [0.35, 0.34, 0.375]  # chance de avançar de etapa no log sintético (até Propostas)
 
 # Inicializar estado da sessão
 if 'logged_in' not in st.session_state:
@@ -26,397 +153,2232 @@ if 'theme' not in st.session_state:
 if 'hide_tutorial' not in st.session_state:
     st.session_state.hide_tutorial = False
 
-def get_theme_colors():
-    themes = {
-        'pastel': {
-            'primary': '#87CEEB',
-            'secondary': '#98FB98', 
-            'accent': '#F0A3C9',
-            'background': '#F8F8FF',
-            'text': '#4A4A4A',
-            'gradients': ['#87CEEB', '#98FB98', '#DDA0DD', '#F0E68C', '#FFB6C1']
-        },
-        'neon': {
-            'primary': '#00FFFF',
-            'secondary': '#FF1493',
-            'accent': '#FFD700',
-            'background': '#1A1A1A',
-            'text': '#FFFFFF',
-            'gradients': ['#00FFFF', '#FF1493', '#00FF00', '#FFD700', '#FF4500']
-        },
-        'glass': {
-            'primary': '#6366F1',
-            'secondary': '#8B5CF6',
-            'accent': '#EC4899',
-            'background': '#F1F5F9',
-            'text': '#334155',
-            'gradients': ['#6366F1', '#8B5CF6', '#EC4899', '#F59E0B', '#10B981']
-        }
+THEMES = {
+    'pastel': {
+        'primary': '#87CEEB',
+        'secondary': '#98FB98', 
+        'accent': '#F0A3C9',
+        'background': '#F8F8FF',
+        'text': '#4A4A4A',
+        'gradients': ['#87CEEB', '#98FB98', '#DDA0DD', '#F0E68C', '#FFB6C1']
+    },
+    'neon': {
+        'primary': '#00FFFF',
+        'secondary': '#FF1493',
+        'accent': '#FFD700',
+        'background': '#1A1A1A',
+        'text': '#FFFFFF',
+        'gradients': ['#00FFFF', '#FF1493', '#00FF00', '#FFD700', '#FF4500']
+    },
+    'glass': {
+        'primary': '#6366F1',
+        'secondary': '#8B5CF6',
+        'accent': '#EC4899',
+        'background': '#F1F5F9',
+        'text': '#334155',
+        'gradients': ['#6366F1', '#8B5CF6', '#EC4899', '#F59E0B', '#10B981']
     }
-    return themes[st.session_state.theme]
+}
+
+def get_theme_colors():
+    return THEMES[st.session_state.theme]
 
-def generate_fake_data():
-    np.random.seed(42)
-    random.seed(42)
+def generate_fake_data(seed=DATASET_SEED, perfil=DATASET_PERFIL):
+    # Geradores próprios desta chamada: nada depende do estado global de np.random/random/Faker,
+    # então o resultado é determinístico por seed e seguro entre as threads de sessão do Streamlit
+    config = PERFIS_DATASET[perfil]
+    rng = np.random.default_rng(seed)
+    fake = Faker('pt_BR')
+    fake.seed_instance(seed)
     
-    # Dados de vendas mensais
-    months = pd.date_range(start='2023-01-01', end='2024-12-31', freq='ME')
-    vendas_mensais = []
+    # Curva mensal (tendência + sazonalidade + ruído) dos meses fechados, mais o mês corrente parcial
+    hoje = pd.Timestamp.today().normalize()
+    meses = pd.period_range(end=hoje.to_period('M'), periods=config['meses'] + 1, freq='M')
     base_value = 1000000
     
-    for i, month in enumerate(months):
-        trend = base_value + (i * 50000)
-        seasonal = np.sin(i * np.pi / 6) * 200000
-        noise = np.random.normal(0, 100000)
-        value = max(trend + seasonal + noise, 500000)
-        vendas_mensais.append({
-            'data': month,
-            'vendas': value,
-            'meta': trend * 1.1
-        })
+    i = np.arange(len(meses))
+    trend = base_value + (i * 50000)
+    seasonal = np.sin(i * np.pi / 6) * 200000
+    noise = rng.normal(0, 100000, len(meses))
+    curva = np.maximum(trend + seasonal + noise, 500000)
+    curva[-1] *= hoje.day / hoje.days_in_month
     
-    df_vendas = pd.DataFrame(vendas_mensais)
+    # Pools de nomes gerados uma única vez e amostrados por índice
+    n_vendedores = config['vendedores']
+    n_transacoes = config['transacoes']
+    # Nomes de vendedor distintos: o pool não repete nomes e, além dele, cada volta ganha um sufixo
+    nomes = [fake.unique.name() for _ in range(min(n_vendedores, POOL_NOMES))]
+    ids = rng.permutation(n_vendedores)
+    nomes_vendedores = [nome if volta == 0 else f"{nome} {volta + 1}"
+                        for nome, volta in zip(np.array(nomes, dtype=object)[ids % len(nomes)], ids // len(nomes))]
+    empresas = pd.unique(np.array([fake.company() for _ in range(min(n_transacoes, POOL_NOMES))], dtype=object))
     
-    # Top produtos
-    produtos = ['Aurum Premium', 'Aurum Standard', 'Aurum Starter', 'Aurum Enterprise', 'Aurum Pro']
-    vendas_produtos = [np.random.randint(500000, 2000000) for _ in produtos]
+    # Metas: a curva convertida em receita esperada (transações concluídas x ticket médio);
+    # pendentes e processando são pipeline e não contam como realizado
+    ticket_medio = (10000 + 200000) / 2
+    receita_por_unidade = n_transacoes / len(STATUS_TRANSACAO) * ticket_medio / curva.sum()
+    metas = pd.Series(trend[:-1] * 1.1 * receita_por_unidade, index=meses[:-1], name='meta')
     
-    # Top vendedores
-    vendedores = []
-    for i in range(10):
-        vendedores.append({
-            'nome': fake.name(),
-            'vendas': np.random.randint(100000, 500000),
-            'meta': np.random.randint(120000, 600000),
-            'regiao': random.choice(['São Paulo', 'Rio de Janeiro', 'Minas Gerais', 'Paraná', 'Rio Grande do Sul'])
-        })
+    # Top vendedores (meta mensal em torno da fatia média do último mês fechado)
+    vendedores = pd.DataFrame({
+        'nome': np.array(nomes_vendedores, dtype=object),
+        'meta': (metas.iloc[-1] / n_vendedores * rng.uniform(0.8, 1.3, n_vendedores)).round(),
+        'regiao': pd.Categorical.from_codes(rng.integers(0, len(REGIOES), n_vendedores), categories=REGIOES)
+    })
     
-    # Últimas transações
-    transacoes = []
-    for i in range(50):
-        transacoes.append({
-            'data': fake.date_between(start_date='-30d', end_date='today'),
-            'cliente': fake.company(),
-            'produto': random.choice(produtos),
-            'valor': np.random.randint(10000, 200000),
-            'status': random.choice(['Concluída', 'Pendente', 'Processando'])
-        })
+    # Transações distribuídas entre os meses conforme a curva; cada uma atribuída a um vendedor,
+    # herdando sua região
+    mes_idx = rng.choice(len(meses), size=n_transacoes, p=curva / curva.sum())
+    inicio_mes = meses.to_timestamp().values.astype('datetime64[D]')
+    dias_mes = np.append(meses[:-1].days_in_month, hoje.day)
+    dia = (rng.random(n_transacoes) * dias_mes[mes_idx]).astype(np.int64)
+    vendedor_ids = rng.integers(0, n_vendedores, n_transacoes).astype(np.int32)
+    transacoes = pd.DataFrame({
+        'data': (inicio_mes[mes_idx] + dia).astype('datetime64[ns]'),
+        'cliente': pd.Categorical.from_codes(rng.integers(0, len(empresas), n_transacoes), categories=empresas),
+        'produto': pd.Categorical.from_codes(rng.integers(0, len(PRODUTOS), n_transacoes), categories=PRODUTOS),
+        'valor': rng.integers(10000, 200000, n_transacoes),
+        'status': pd.Categorical.from_codes(rng.integers(0, len(STATUS_TRANSACAO), n_transacoes), categories=STATUS_TRANSACAO),
+        'vendedor': vendedor_ids,
+        'regiao': pd.Categorical.from_codes(vendedores['regiao'].cat.codes.values[vendedor_ids], categories=REGIOES)
+    })
+    eventos = generate_funnel_events(rng, transacoes, inicio_mes[0], hoje, config['visitantes'])
     
-    return df_vendas, produtos, vendas_produtos, vendedores, transacoes
+    return metas, vendedores, transacoes, eventos
 
-def generate_chat_history():
-    """Gera histórico de chat pré-populado para demonstração"""
-    chat_history = [
-        {
-            'type': 'user',
-            'message': 'Qual foi a performance das vendas no último trimestre?',
-            'timestamp': '14:32',
-            'avatar': '👤'
-        },
-        {
-            'type': 'ai',
-            'message': '📊 **Análise Q4 2024**: Tivemos um excelente trimestre! As vendas cresceram **22,8%** vs trimestre anterior, totalizando **R$ 27,3M**. O **Aurum Premium** foi nosso destaque com 35% do volume total. A região **Sudeste** manteve a liderança com 45% das vendas. Posso detalhar algum aspecto específico?',
-            'timestamp': '14:32',
-            'avatar': '🤖'
-        },
-        {
-            'type': 'user',
-            'message': 'Como está nossa taxa de conversão comparado com a média do mercado?',
-            'timestamp': '14:35',
-            'avatar': '👤'
-        },
-        {
-            'type': 'ai',
-            'message': '🎯 **Taxa de Conversão Aurum**: Atualmente estamos com **14,8%**, que é **78% superior** à média do mercado (8,3%). Nos últimos 6 meses, mantivemos crescimento constante:\n\n• Jan: 12,1%\n• Fev: 12,8% \n• Mar: 13,2%\n• Abr: 13,9%\n• Mai: 14,3%\n• Jun: 14,8%\n\nNosso funil otimizado e time comercial têm sido os principais drivers desse resultado! 🚀',
-            'timestamp': '14:35',
-            'avatar': '🤖'
-        },
-        {
-            'type': 'user',
-            'message': 'Preciso de insights sobre os KPIs mais importantes para apresentar na board',
-            'timestamp': '14:38',
-            'avatar': '👤'
-        },
-        {
-            'type': 'ai',
-            'message': '📈 **TOP KPIs para Board Meeting**:\n\n🏆 **Receita Total**: R$ 12,5M (+8,5% MoM)\n💰 **Margem Bruta**: 34,8% (acima da meta de 32%)\n👥 **CAC Payback**: 8,2 meses (meta: <12 meses)\n🔄 **Churn Rate**: 3,2% (melhor da categoria)\n⚡ **NPS Score**: 78 (zona de excelência)\n\n**Highlights**: Crescimento orgânico de 65%, expansão para 3 novos mercados e time de vendas 127% acima da meta. Recomendo focar na **margem** e **eficiência operacional** como diferencial competitivo.',
-            'timestamp': '14:38',
-            'avatar': '🤖'
-        }
-    ]
-    return chat_history
+def generate_funnel_events(rng, transacoes, inicio, hoje, n_visitantes):
+    """Log sintético de eventos do funil (visita → lead → oportunidade → proposta → fechamento)
+    
+    Os clientes com transações são os prospects que fecham, na data da primeira compra; os demais
+    visitantes param em alguma etapa anterior. Parte dos prospects repete a visita, então cada
+    etapa pode aparecer mais de uma vez por prospect no log.
+    """
+    inicio = np.datetime64(inicio, 'D').astype(np.int64)
+    fim = np.datetime64(hoje.date(), 'D').astype(np.int64)
+    codigos = transacoes['cliente'].cat.codes.values
+    primeira_compra = np.full(len(transacoes['cliente'].cat.categories), np.iinfo(np.int64).max)
+    np.minimum.at(primeira_compra, codigos, transacoes['data'].values.astype('datetime64[D]').astype(np.int64))
+    primeira_compra = primeira_compra[primeira_compra != np.iinfo(np.int64).max]
+    n_clientes = len(primeira_compra)
+    n = max(n_visitantes, n_clientes)
+    
+    # Etapa mais funda alcançada: os clientes fecham; os demais avançam com as taxas de conversão
+    etapa_final = np.zeros(n, dtype=np.int8)
+    for etapa, taxa in enumerate(CONVERSAO_FUNIL):
+        etapa_final += (etapa_final == etapa) & (rng.random(n) < taxa)
+    etapa_final[:n_clientes] = len(ETAPAS_FUNIL) - 1
+    
+    # Dias entre etapas; os clientes são ancorados de trás para frente na primeira compra
+    dias = np.zeros((n, len(ETAPAS_FUNIL)), dtype=np.int32)
+    dias[:, 1:] = rng.integers(1, 15, (n, len(ETAPAS_FUNIL) - 1)).cumsum(axis=1)
+    visita = rng.integers(inicio, fim + 1, n)
+    visita[:n_clientes] = primeira_compra - dias[:n_clientes, -1]
+    
+    tamanhos = etapa_final.astype(np.int64) + 1
+    prospects = np.repeat(np.arange(n, dtype=np.int32), tamanhos)
+    etapas = (np.arange(len(prospects)) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)).astype(np.int8)
+    datas = visita[prospects] + dias[prospects, etapas]
+    
+    # Visitas repetidas depois da primeira
+    repetem = np.flatnonzero(rng.random(n) < 0.3).astype(np.int32)
+    prospects = np.concatenate([prospects, repetem])
+    etapas = np.concatenate([etapas, np.zeros(len(repetem), dtype=np.int8)])
+    datas = np.concatenate([datas, visita[repetem] + rng.integers(0, 30, len(repetem))])
+    
+    validos = datas <= fim
+    eventos = pd.DataFrame({
+        'data': datas[validos].astype('datetime64[D]').astype('datetime64[ns]'),
+        'prospect': prospects[validos],
+        'etapa': pd.Categorical.from_codes(etapas[validos], categories=ETAPAS_FUNIL),
+    })
+    return eventos.sort_values('data', kind='stable', ignore_index=True)
 
-def create_chat_message(message_data):
-    """Cria uma bolha de mensagem do chat"""
-    colors = get_theme_colors()
-    is_user = message_data['type'] == 'user'
-    
-    # Cores baseadas no tema atual
-    if is_user:
-        bg_color = colors['primary']
-        text_color = '#FFFFFF'
-        align = 'right'
-        margin = 'margin-left: 80px; margin-right: 10px;'
+def generate_geography(rng, n_clientes, n_unidades):
+    """Rede sintética de unidades em torno das principais e a localização de cada cliente
+    
+    As unidades extras herdam a cidade de uma unidade principal, com dispersão de ~1°. Cada
+    cliente fica perto de uma unidade sorteada pelo porte (funcionários), a uma distância da
+    ordem da cobertura dela, então parte dos clientes fica fora de qualquer cobertura.
+    """
+    principais = pd.DataFrame(UNIDADES_PRINCIPAIS)
+    n = max(n_unidades - len(principais), 0)
+    ancora = rng.integers(0, len(principais), n)
+    tipos = np.array([tipo for tipo in TIPOS_UNIDADE if tipo != 'Sede'], dtype=object)[rng.integers(0, len(TIPOS_UNIDADE) - 1, n)]
+    cidades = principais['Cidade'].values[ancora]
+    extras = pd.DataFrame({
+        'Local': [f"{tipo} {cidade} {i}" for i, (tipo, cidade) in enumerate(zip(tipos, cidades), start=len(principais) + 1)],
+        'Cidade': cidades,
+        'Tipo': tipos,
+        'Status': np.where(rng.random(n) < 0.08, 'Manutenção', 'Ativo'),
+        'Funcionarios': rng.integers(10, 200, n),
+        'Cobertura_KM': rng.integers(40, 250, n),
+        'Lat': principais['Lat'].values[ancora] + rng.normal(0, 1.0, n),
+        'Lon': principais['Lon'].values[ancora] + rng.normal(0, 1.0, n),
+    })
+    unidades = pd.concat([principais, extras], ignore_index=True)
+    
+    peso = unidades['Funcionarios'].to_numpy(dtype=float)
+    perto = rng.choice(len(unidades), size=n_clientes, p=peso / peso.sum())
+    dispersao = unidades['Cobertura_KM'].to_numpy()[perto] / 111.0 * 0.6
+    clientes = pd.DataFrame({
+        'id': np.arange(n_clientes, dtype=np.int32),
+        'lat': unidades['Lat'].to_numpy()[perto] + rng.normal(0, 1, n_clientes) * dispersao,
+        'lon': unidades['Lon'].to_numpy()[perto] + rng.normal(0, 1, n_clientes) * dispersao,
+    })
+    return unidades, clientes
+
+@st.cache_resource
+def get_dataset_registry():
+    """Versão corrente do dataset, compartilhada por todas as sessões do processo"""
+    return {'versao': 1, 'lock': threading.Lock()}
+
+def get_dataset_version():
+    return get_dataset_registry()['versao']
+
+def invalidate_dataset():
+    """Publica uma nova versão do dataset e descarta as versões em cache"""
+    registry = get_dataset_registry()
+    with registry['lock']:
+        registry['versao'] += 1
+    load_dataset.clear()
+
+@st.cache_resource(ttl=DATASET_TTL, max_entries=2, show_spinner="Carregando dados...")
+def load_dataset(versao, dia, perfil=DATASET_PERFIL):
+    """Abre o store de uma versão do dataset, compartilhado entre as sessões
+    
+    Aqui só os metadados são lidos: cada tabela é carregada (ou derivada) na primeira vez em que
+    é pedida via get_table(). As tabelas são somente leitura; ingestões publicam novas tabelas
+    sob o lock do store. O dia de geração faz parte do diretório: os dados sintéticos terminam
+    em hoje, então a virada do dia gera um dataset novo em vez de servir meses defasados.
+    """
+    seed = DATASET_SEED + versao - 1
+    diretorio = DATA_DIR / f"{perfil}-seed{seed}-{dia}"
+    granularidade = PERFIS_DATASET[perfil]['granularidade']
+    if not (diretorio / 'manifest.json').exists():
+        persist_dataset(diretorio, granularidade, *generate_fake_data(seed, perfil))
+        remove_stale_datasets(perfil, dia)
+    
+    manifesto = json.loads((diretorio / 'manifest.json').read_text())
+    return {
+        'versao': versao,
+        'revisao': len(list_parts(diretorio)),
+        'seed': seed,
+        'perfil': perfil,
+        'granularidade': granularidade,
+        'diretorio': diretorio,
+        'lock': threading.Lock(),
+        'carregando': {},
+        'prefetch': set(),
+        'gerado_em': datetime.fromisoformat(manifesto['gerado_em']),
+        'atualizado_em': datetime.now(),
+        'tabelas': {},
+    }
+
+def get_store():
+    """Store da versão corrente do dataset, gerado para o dia de hoje"""
+    return load_dataset(get_dataset_version(), pd.Timestamp.today().strftime('%Y%m%d'))
+
+def remove_stale_datasets(perfil, dia):
+    """Apaga diretórios de dias anteriores a ontem; o de ontem fica para processos que ainda
+    não trocaram de store"""
+    ontem = (pd.Timestamp(dia) - pd.Timedelta(days=1)).strftime('%Y%m%d')
+    for diretorio in DATA_DIR.glob(f"{perfil}-seed*-*"):
+        if diretorio.name.rsplit('-', 1)[1] < ontem:
+            shutil.rmtree(diretorio, ignore_errors=True)
+
+def get_table(store, nome):
+    """Tabela do store, carregada ou derivada sob demanda na primeira vez em que é pedida
+    
+    Cada tabela tem seu próprio lock de carga, para que a carga de uma tabela grande em segundo
+    plano não bloqueie as demais. Se uma ingestão publicar nova revisão durante a carga, a
+    tabela é recarregada em vez de publicada desatualizada.
+    """
+    tabela = store['tabelas'].get(nome)
+    if tabela is not None:
+        return tabela
+    
+    with store['lock']:
+        lock = store['carregando'].setdefault(nome, threading.Lock())
+    with lock:
+        while True:
+            tabela = store['tabelas'].get(nome)
+            if tabela is not None:
+                return tabela
+            revisao = store['revisao']
+            tabela = CARREGADORES_TABELA[nome](store)
+            with store['lock']:
+                if store['revisao'] == revisao:
+                    store['tabelas'] = dict(store['tabelas'], **{nome: tabela})
+                    return tabela
+
+def write_table(diretorio, nome, df, substituir=True):
+    """Grava um DataFrame como arquivo Arrow IPC; a troca pelo arquivo final é atômica
+    
+    O temporário é único por escrita, então processos e threads concorrentes nunca gravam no mesmo
+    arquivo. Com substituir=False o arquivo final não é sobrescrito: se já existir, levanta
+    FileExistsError.
+    """
+    tabela = pa.Table.from_pandas(df, preserve_index=False)
+    descritor, temporario = tempfile.mkstemp(prefix=f".{nome}.", suffix='.arrow.tmp', dir=diretorio)
+    os.close(descritor)
+    try:
+        with pa.OSFile(temporario, 'wb') as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as writer:
+            writer.write_table(tabela)
+        if substituir:
+            os.replace(temporario, diretorio / f"{nome}.arrow")
+        else:
+            os.link(temporario, diretorio / f"{nome}.arrow")
+    finally:
+        Path(temporario).unlink(missing_ok=True)
+
+def read_table(diretorio, nome, colunas=None):
+    """Lê uma tabela Arrow IPC via memory-map, projetando só as colunas pedidas
+    
+    Os arrays numéricos, de datas e os códigos categóricos apontam direto para as páginas
+    mapeadas (sem cópia, somente leitura); colunas não projetadas nunca são lidas do disco.
+    """
+    tabela = pa.ipc.open_file(pa.memory_map(str(diretorio / f"{nome}.arrow"))).read_all()
+    if colunas is not None:
+        tabela = tabela.select(colunas)
+    return tabela.to_pandas(split_blocks=True)
+
+def list_parts(diretorio):
+    """Lotes ingeridos, um arquivo por lote, na ordem de ingestão"""
+    return sorted(diretorio.glob('transacoes-*.arrow'))
+
+def publish_part(diretorio, lote, revisao):
+    """Grava o lote na primeira parte livre a partir de `revisao` e devolve o número usado
+    
+    A parte é criada sem sobrescrever (link do temporário), então dois processos ingerindo ao
+    mesmo tempo nunca ficam com o mesmo número: quem perde a corrida tenta o seguinte. As partes
+    em disco são a revisão do dataset, sem buracos na numeração.
+    """
+    while True:
+        if not (diretorio / f"transacoes-{revisao:06d}.arrow").exists():
+            try:
+                write_table(diretorio, f"transacoes-{revisao:06d}", lote, substituir=False)
+                return revisao
+            except FileExistsError:
+                pass
+        revisao += 1
+
+def persist_dataset(destino, granularidade, metas, vendedores, transacoes, eventos):
+    """Grava as tabelas geradas e o cubo pré-agregado num diretório temporário do processo, que é
+    renomeado para o destino no fim; se outro processo publicar primeiro, a cópia é descartada"""
+    DATA_DIR.mkdir(parents=True, exist_ok=True)
+    diretorio = Path(tempfile.mkdtemp(prefix=f".{destino.name}.", dir=DATA_DIR))
+    transacoes = transacoes.sort_values('data', kind='stable', ignore_index=True)
+    rollup = build_rollup_cube(transacoes, granularidade)
+    meses = list(rollup['clientes_por_mes'])
+    
+    write_table(diretorio, 'metas', pd.DataFrame({'mes': metas.index.to_timestamp(), 'meta': metas.values}))
+    write_table(diretorio, 'vendedores', vendedores)
+    write_table(diretorio, 'transacoes', transacoes)
+    write_table(diretorio, 'eventos', eventos)
+    for nome, dimensao in build_dimensions(transacoes).items():
+        write_table(diretorio, f"dim_{nome}", dimensao)
+    write_table(diretorio, 'cubo', rollup['cubo'])
+    write_table(diretorio, 'clientes_mes', pd.DataFrame({
+        'mes': np.repeat(pd.PeriodIndex(meses).to_timestamp(), [len(rollup['clientes_por_mes'][m]) for m in meses]),
+        'cliente': np.concatenate([rollup['clientes_por_mes'][m] for m in meses]),
+    }))
+    manifesto = {'gerado_em': datetime.now().isoformat(), 'linhas': len(transacoes)}
+    (diretorio / 'manifest.json').write_text(json.dumps(manifesto, ensure_ascii=False))
+    try:
+        os.rename(diretorio, destino)
+    except OSError:
+        shutil.rmtree(diretorio, ignore_errors=True)
+        if not (destino / 'manifest.json').exists():
+            raise
+
+def load_metas(store):
+    metas = read_table(store['diretorio'], 'metas')
+    return pd.Series(metas['meta'].values, index=metas['mes'].dt.to_period('M'), name='meta')
+
+def load_vendedores(store):
+    return read_table(store['diretorio'], 'vendedores')
+
+def build_dimensions(transacoes):
+    """Tabelas de dimensão (id inteiro + nome) a partir das categorias da tabela de fatos
+    
+    O id é o código categórico da coluna nas transações, então fatos e dimensões se ligam pelo
+    código sem comparar strings.
+    """
+    def dimensao(coluna):
+        categorias = transacoes[coluna].cat.categories
+        return pd.DataFrame({'id': np.arange(len(categorias), dtype=np.int32), 'nome': categorias.astype(str)})
+    
+    regioes = dimensao('regiao')
+    regioes['uf'] = regioes['nome'].map({nome: uf for uf, nome in REGIOES_UF.items()})
+    return {'clientes': dimensao('cliente'), 'produtos': dimensao('produto'), 'regioes': regioes,
+            'status': dimensao('status')}
+
+def load_dimensions(store):
+    """Dimensões persistidas; diretórios gravados antes delas as derivam das transações uma vez"""
+    diretorio = store['diretorio']
+    if not (diretorio / 'dim_status.arrow').exists():
+        for nome, dimensao in build_dimensions(read_table(diretorio, 'transacoes', ['cliente', 'produto', 'regiao', 'status'])).items():
+            write_table(diretorio, f"dim_{nome}", dimensao)
+    return {nome: read_table(diretorio, f"dim_{nome}") for nome in ('clientes', 'produtos', 'regioes', 'status')}
+
+def get_dimension(store, nome):
+    """Nomes de uma dimensão na ordem dos ids (a mesma das categorias nas transações)"""
+    return tuple(get_table(store, 'dimensoes')[nome]['nome'])
+
+def load_transacoes(store):
+    """Tabela base mais os lotes ingeridos, mantida em ordem de data"""
+    diretorio = store['diretorio']
+    partes = list_parts(diretorio)[:store['revisao']]
+    transacoes = read_table(diretorio, 'transacoes', COLUNAS_TRANSACAO)
+    if partes:
+        transacoes = pd.concat([transacoes] + [read_table(diretorio, parte.stem, COLUNAS_TRANSACAO) for parte in partes],
+                               ignore_index=True)
+        if not transacoes['data'].is_monotonic_increasing:
+            transacoes = transacoes.sort_values('data', kind='stable', ignore_index=True)
+    return transacoes
+
+def load_rollup(store):
+    """Cubo persistido com os lotes ingeridos depois dele aplicados incrementalmente
+    
+    Não precisa das transações brutas; só as recalcula se o diretório não tiver o cubo.
+    """
+    diretorio = store['diretorio']
+    if not (diretorio / 'cubo.arrow').exists():
+        return build_rollup_cube(get_table(store, 'transacoes'), store['granularidade'])
+    
+    cubo = read_table(diretorio, 'cubo')
+    pares = read_table(diretorio, 'clientes_mes')
+    clientes_por_mes = group_clientes_por_mes(pares['mes'].values, pares['cliente'].values)
+    rollup = {
+        'cubo': cubo,
+        'mensal': summarize_months(cubo, clientes_por_mes),
+        'clientes_por_mes': clientes_por_mes,
+        'granularidade': store['granularidade'],
+    }
+    for parte in list_parts(diretorio)[:store['revisao']]:
+        rollup = update_rollup_cube(rollup, read_table(diretorio, parte.stem, COLUNAS_TRANSACAO))
+    return rollup
+
+def aggregate_cube(transacoes, granularidade):
+    """Soma e contagem das transações por período x região x produto x status"""
+    if granularidade == 'D':
+        periodo = transacoes['data']
     else:
-        if st.session_state.theme == 'neon':
-            bg_color = 'linear-gradient(135deg, rgba(0, 255, 255, 0.2) 0%, rgba(255, 20, 147, 0.2) 100%)'
-            text_color = '#FFFFFF'
-        elif st.session_state.theme == 'glass':
-            bg_color = 'linear-gradient(135deg, rgba(255, 255, 255, 0.3) 0%, rgba(99, 102, 241, 0.2) 100%)'
-            text_color = '#FFFFFF'
-        else:  # pastel
-            bg_color = 'linear-gradient(135deg, rgba(135, 206, 235, 0.2) 0%, rgba(152, 251, 152, 0.2) 100%)'
-            text_color = '#FFFFFF'
-        align = 'left'
-        margin = 'margin-right: 80px; margin-left: 10px;'
+        periodo = transacoes['data'] + pd.offsets.MonthEnd(0)
+    return (transacoes
+            .groupby([periodo.rename('periodo'), 'regiao', 'produto', 'status'], observed=True)['valor']
+            .agg(['sum', 'size'])
+            .rename(columns={'sum': 'valor', 'size': 'transacoes'})
+            .reset_index())
+
+def summarize_months(cubo, clientes_por_mes):
+    """Total mensal por status a partir das linhas do cubo"""
+    mes = cubo['periodo'].dt.to_period('M')
+    mensal = cubo.pivot_table(index=mes, columns='status', values=['valor', 'transacoes'],
+                              aggfunc='sum', fill_value=0, observed=False)
+    return pd.DataFrame({
+        'valor': mensal['valor'].sum(axis=1),
+        'transacoes': mensal['transacoes'].sum(axis=1),
+        'receita': mensal['valor']['Concluída'],
+        'concluidas': mensal['transacoes']['Concluída'],
+        'pipeline': mensal['valor'][['Pendente', 'Processando']].sum(axis=1),
+        'clientes': [len(clientes_por_mes.get(m, ())) for m in mensal.index],
+    }, index=mensal.index)
+
+def group_clientes_por_mes(datas, codigos):
+    """Códigos distintos de cliente por mês (contagem distinta não é somável no cubo)"""
+    n_clientes = int(codigos.max()) + 1 if len(codigos) else 1
+    meses = datas.astype('datetime64[M]').astype(np.int64)
+    chaves = np.unique(meses * n_clientes + codigos.astype(np.int64))
+    meses_unicos, inicios = np.unique(chaves // n_clientes, return_index=True)
+    grupos = np.split(chaves % n_clientes, inicios[1:])
+    return {pd.Period(np.datetime64(int(mes), 'M'), freq='M'): grupo for mes, grupo in zip(meses_unicos, grupos)}
+
+def build_rollup_cube(transacoes, granularidade):
+    """Pré-agrega as transações em período x região x produto x status (soma e contagem)
     
-    st.markdown(f"""
-    <div style="display: flex; justify-content: {align}; margin-bottom: 15px;">
-        <div style="max-width: 75%; {margin}">
-            <div style="display: flex; align-items: flex-start; {'flex-direction: row-reverse;' if is_user else ''}">
-                <div style="{'margin-left: 10px;' if is_user else 'margin-right: 10px;'} margin-top: 5px;">
-                    <div style="width: 40px; height: 40px; border-radius: 50%; 
-                                background: {'linear-gradient(135deg, ' + colors['primary'] + ', ' + colors['secondary'] + ')' if is_user else 'linear-gradient(135deg, ' + colors['accent'] + ', ' + colors['primary'] + ')'};
-                                display: flex; align-items: center; justify-content: center;
-                                font-size: 18px; border: 2px solid white; box-shadow: 0 2px 10px rgba(0,0,0,0.2);">
-                        {message_data['avatar']}
-                    </div>
-                </div>
-                <div style="{'background: linear-gradient(135deg, ' + colors['primary'] + ', ' + colors['secondary'] + ');' if is_user else 'background: ' + bg_color + ';'}
-                            color: {text_color}; padding: 12px 18px; border-radius: 18px;
-                            box-shadow: 0 4px 15px rgba(0,0,0,0.1); backdrop-filter: blur(10px);
-                            {'border-top-right-radius: 5px;' if is_user else 'border-top-left-radius: 5px;'}">
-                    <div style="font-size: 14px; line-height: 1.4; font-weight: {'500' if is_user else '400'};">
-                        {message_data['message']}
-                    </div>
-                    <div style="font-size: 11px; opacity: 0.7; margin-top: 6px; text-align: {'right' if is_user else 'left'};">
-                        {message_data['timestamp']}
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+    O período segue a granularidade do perfil (fim do mês ou dia). Também guarda o total mensal
+    por status e os clientes distintos por mês, que não podem ser somados a partir do cubo.
+    """
+    cubo = aggregate_cube(transacoes, granularidade)
+    clientes_por_mes = group_clientes_por_mes(transacoes['data'].values, transacoes['cliente'].cat.codes.values)
+    return {
+        'cubo': cubo,
+        'mensal': summarize_months(cubo, clientes_por_mes),
+        'clientes_por_mes': clientes_por_mes,
+        'granularidade': granularidade,
+    }
 
-def create_typing_indicator():
-    """Cria indicador de digitação do AI"""
-    colors = get_theme_colors()
+def update_rollup_cube(rollup, lote):
+    """Novo rollup com o lote somado apenas nos buckets e meses que ele afeta"""
+    chaves = ['periodo', 'regiao', 'produto', 'status']
+    delta = aggregate_cube(lote, rollup['granularidade']).set_index(chaves)
+    cubo = rollup['cubo'].set_index(chaves)
     
-    st.markdown(f"""
-    <div style="display: flex; justify-content: left; margin-bottom: 15px;">
-        <div style="max-width: 75%; margin-right: 80px; margin-left: 10px;">
-            <div style="display: flex; align-items: flex-start;">
-                <div style="margin-right: 10px; margin-top: 5px;">
-                    <div style="width: 40px; height: 40px; border-radius: 50%; 
-                                background: linear-gradient(135deg, {colors['accent']}, {colors['primary']});
-                                display: flex; align-items: center; justify-content: center;
-                                font-size: 18px; border: 2px solid white; box-shadow: 0 2px 10px rgba(0,0,0,0.2);">
-                        🤖
-                    </div>
-                </div>
-                <div style="background: linear-gradient(135deg, rgba(135, 206, 235, 0.2) 0%, rgba(152, 251, 152, 0.2) 100%);
-                            color: #FFFFFF; padding: 12px 18px; border-radius: 18px;
-                            box-shadow: 0 4px 15px rgba(0,0,0,0.1); backdrop-filter: blur(10px);
-                            border-top-left-radius: 5px;">
-                    <div style="display: flex; align-items: center; gap: 4px;">
-                        <div style="width: 8px; height: 8px; background: #FFFFFF; border-radius: 50%; 
-                                    animation: pulse 1.4s ease-in-out infinite;"></div>
-                        <div style="width: 8px; height: 8px; background: #FFFFFF; border-radius: 50%; 
-                                    animation: pulse 1.4s ease-in-out infinite; animation-delay: 0.2s;"></div>
-                        <div style="width: 8px; height: 8px; background: #FFFFFF; border-radius: 50%; 
-                                    animation: pulse 1.4s ease-in-out infinite; animation-delay: 0.4s;"></div>
-                        <span style="margin-left: 8px; font-size: 12px; opacity: 0.9; color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">IA Aurum está pensando...</span>
-                    </div>
-                </div>
-            </div>
-        </div>
-    </div>
-    <style>
-    @keyframes pulse {{
-        0%, 60%, 100% {{ transform: scale(1); opacity: 1; }}
-        30% {{ transform: scale(1.2); opacity: 0.7; }}
-    }}
-    </style>
-    """, unsafe_allow_html=True)
+    comuns = delta.index.intersection(cubo.index)
+    cubo.loc[comuns] += delta.loc[comuns]
+    cubo = pd.concat([cubo, delta.drop(comuns)]).reset_index()
+    
+    clientes_por_mes = dict(rollup['clientes_por_mes'])
+    for mes, codigos in group_clientes_por_mes(lote['data'].values, lote['cliente'].cat.codes.values).items():
+        clientes_por_mes[mes] = np.union1d(clientes_por_mes.get(mes, codigos[:0]), codigos)
+    
+    afetados = delta.index.get_level_values('periodo').to_period('M').unique()
+    linhas_afetadas = cubo[cubo['periodo'].dt.to_period('M').isin(afetados)]
+    mensal = pd.concat([
+        rollup['mensal'].drop(afetados, errors='ignore'),
+        summarize_months(linhas_afetadas, clientes_por_mes),
+    ]).sort_index()
+    return dict(rollup, cubo=cubo, mensal=mensal, clientes_por_mes=clientes_por_mes)
 
-def create_quick_suggestions():
-    """Cria sugestões rápidas de perguntas"""
-    colors = get_theme_colors()
-    suggestions = [
-        "📊 Análise de performance trimestral",
-        "🎯 Comparativo de metas vs realizados", 
-        "👥 Insights sobre satisfação do cliente",
-        "💰 Projeção de receita para Q1",
-        "🚀 Oportunidades de crescimento",
-        "📈 Tendências do mercado atual"
-    ]
+def build_sales_series(rollup, metas):
+    """Série de receita realizada (só concluídas) vs meta dos períodos fechados, lida do cubo"""
+    cubo = rollup['cubo']
+    vendas = cubo[cubo['status'] == 'Concluída'].groupby('periodo')['valor'].sum()
+    vendas = vendas[vendas.index.to_period('M') <= metas.index[-1]]
+    meses = vendas.index.to_period('M')
+    meta = metas.reindex(meses).values
+    if rollup['granularidade'] == 'D':
+        meta = meta / vendas.index.days_in_month
+    return pd.DataFrame({'data': vendas.index, 'vendas': vendas.values, 'meta': meta})
+
+def rollup_by(rollup, dimensao, meses=None):
+    """Total de vendas por uma dimensão do cubo (opcionalmente só nos últimos N meses fechados)"""
+    cubo = rollup['cubo']
+    if meses:
+        fim = get_reference_month(rollup)
+        mes = cubo['periodo'].dt.to_period('M')
+        cubo = cubo[(mes > fim - meses) & (mes <= fim)]
+    totais = cubo.groupby(dimensao, observed=False)['valor'].sum()
+    return pd.DataFrame({dimensao: totais.index.astype(str), 'vendas': totais.values})
+
+def get_reference_month(rollup):
+    """Último mês fechado: os KPIs não comparam o mês corrente, ainda parcial"""
+    return rollup['mensal'].index.max() - 1
+
+def pct_change(atual, anterior):
+    return (atual / anterior - 1) * 100 if anterior else 0.0
+
+def compute_kpis(rollup, metas):
+    """KPIs dos cards a partir do total mensal do cubo (mês de referência vs anterior)"""
+    ref = get_reference_month(rollup)
+    mensal = rollup['mensal'].reindex(pd.period_range(end=ref, periods=24, freq='M'), fill_value=0)
+    atual, anterior = mensal.loc[ref], mensal.loc[ref - 1]
     
-    st.markdown(f"<h4 style='color: {colors['primary']}; margin-bottom: 15px;'>💡 Perguntas Populares</h4>", unsafe_allow_html=True)
+    def ticket(m):
+        return m['valor'].sum() / m['transacoes'].sum() if m['transacoes'].sum() else 0.0
     
-    cols = st.columns(2)
-    for i, suggestion in enumerate(suggestions):
-        with cols[i % 2]:
-            if st.button(suggestion, key=f"suggest_{i}", use_container_width=True):
-                st.session_state['new_message'] = suggestion
-                st.rerun()
+    def conversao(m):
+        return m['concluidas'].sum() / m['transacoes'].sum() * 100 if m['transacoes'].sum() else 0.0
+    
+    ultimos_12, anteriores_12 = mensal.iloc[-12:], mensal.iloc[-24:-12]
+    trimestre, trimestre_anterior = mensal.iloc[-3:], mensal.iloc[-6:-3]
+    mes, mes_anterior = mensal.iloc[-1:], mensal.iloc[-2:-1]
+    meta = metas.get(ref, 0)
+    return {
+        'receita_12m': ultimos_12['receita'].sum(),
+        'receita_12m_delta': pct_change(ultimos_12['receita'].sum(), anteriores_12['receita'].sum()),
+        'vendas_mes': atual['transacoes'],
+        'vendas_mes_delta': pct_change(atual['transacoes'], anterior['transacoes']),
+        'clientes_ativos': atual['clientes'],
+        'clientes_ativos_delta': pct_change(atual['clientes'], anterior['clientes']),
+        'ticket_medio': ticket(mes),
+        'ticket_medio_delta': pct_change(ticket(mes), ticket(mes_anterior)),
+        'conversao_mes': conversao(mes),
+        'conversao_mes_delta': conversao(mes) - conversao(mes_anterior),
+        'conversao_trimestre': conversao(trimestre),
+        'conversao_trimestre_delta': conversao(trimestre) - conversao(trimestre_anterior),
+        'meta_mes': meta,
+        'meta_mes_delta': pct_change(meta, metas.get(ref - 1, 0)),
+        'realizado_mes': atual['receita'],
+        'realizado_vs_meta': pct_change(atual['receita'], meta),
+        'pipeline': atual['pipeline'],
+        'pipeline_delta': pct_change(atual['pipeline'], anterior['pipeline']),
+    }
 
-def inject_theme_css():
-    colors = get_theme_colors()
+def build_forecast_design(meses, origem):
+    """Matriz do modelo: intercepto, tendência linear e dummies de mês (janeiro é a referência)"""
+    t = np.asarray([(mes - origem).n for mes in meses], dtype=float)
+    mes_do_ano = np.asarray([mes.month for mes in meses])
+    dummies = (mes_do_ano[:, None] == np.arange(2, 13)[None, :]).astype(float)
+    return np.column_stack([np.ones(len(meses)), t, dummies])
+
+def fit_forecast_models(rollup):
+    """Ajusta tendência + sazonalidade mensal para o total e para cada produto x região
     
-    if st.session_state.theme == 'neon':
-        css = f"""
-        <style>
-        .main {{
-            background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%);
-        }}
-        
-        /* Sidebar Neon */
-        .css-1d391kg {{
-            background: linear-gradient(180deg, #0f0f0f 0%, #1a1a1a 100%);
-            border-right: 2px solid {colors['primary']};
-            box-shadow: 5px 0 20px rgba(0, 255, 255, 0.3);
-        }}
-        
-        .css-1d391kg .stSelectbox > div > div {{
-            background: linear-gradient(135deg, rgba(0, 255, 255, 0.1) 0%, rgba(255, 20, 147, 0.1) 100%);
-            border: 1px solid {colors['primary']};
-            border-radius: 10px;
-            backdrop-filter: blur(10px);
-        }}
-        
-        .css-1d391kg .stButton > button {{
-            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
-            border: none;
-            border-radius: 12px;
-            color: white;
-            font-weight: bold;
-            padding: 12px 24px;
-            transition: all 0.3s ease;
-            text-shadow: 0 0 10px rgba(255, 255, 255, 0.8);
-            box-shadow: 0 0 15px rgba(0, 255, 255, 0.4), 0 4px 15px rgba(0, 0, 0, 0.3);
-        }}
-        
-        .css-1d391kg .stButton > button:hover {{
-            transform: translateY(-3px) scale(1.05);
-            box-shadow: 0 0 25px rgba(0, 255, 255, 0.6), 0 8px 25px rgba(0, 0, 0, 0.4);
-            text-shadow: 0 0 20px rgba(255, 255, 255, 1);
-        }}
-        
-        .css-1d391kg .stButton > button:active {{
-            transform: translateY(-1px) scale(1.02);
-        }}
-        
-        .metric-card {{
-            background: linear-gradient(135deg, rgba(0, 255, 255, 0.1) 0%, rgba(255, 20, 147, 0.1) 100%);
-            border: 2px solid {colors['primary']};
-            border-radius: 15px;
-            padding: 20px;
-            backdrop-filter: blur(10px);
-            box-shadow: 0 0 20px rgba(0, 255, 255, 0.3);
-            color: {colors['text']};
-        }}
-        .section-header {{
-            color: {colors['primary']};
-            text-shadow: 0 0 10px {colors['primary']};
-            font-weight: bold;
-        }}
-        .vendedor-card {{
-            background: linear-gradient(135deg, rgba(0, 255, 255, 0.15) 0%, rgba(255, 20, 147, 0.15) 100%);
-            border: 1px solid {colors['primary']};
-            border-radius: 15px;
-            padding: 20px;
-            margin: 10px 0;
-            backdrop-filter: blur(10px);
-            box-shadow: 0 0 15px rgba(0, 255, 255, 0.2);
-            color: {colors['text']};
-        }}
-        
-        /* Botões premium gerais - Neon */
-        .stButton > button {{
-            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
-            border: none;
-            border-radius: 12px;
-            color: white;
-            font-weight: bold;
-            padding: 12px 24px;
-            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
-            text-shadow: 0 0 10px rgba(255, 255, 255, 0.8);
-            box-shadow: 0 0 15px rgba(0, 255, 255, 0.4), 0 4px 15px rgba(0, 0, 0, 0.3);
-            position: relative;
-            overflow: hidden;
-        }}
-        
-        .stButton > button:before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
-            transition: left 0.6s ease;
-        }}
-        
-        .stButton > button:hover:before {{
-            left: 100%;
-        }}
-        
-        .stButton > button:hover {{
-            transform: translateY(-5px) scale(1.08);
-            box-shadow: 0 0 30px rgba(0, 255, 255, 0.7), 0 10px 30px rgba(0, 0, 0, 0.5);
-            text-shadow: 0 0 20px rgba(255, 255, 255, 1);
-        }}
-        
-        .stButton > button:active {{
-            transform: translateY(-2px) scale(1.04);
-            transition: all 0.1s ease;
-        }}
-        
-        /* Animações extras premium - Neon */
-        @keyframes pulse-neon {{
-            0% {{ box-shadow: 0 0 15px rgba(0, 255, 255, 0.4); }}
-            50% {{ box-shadow: 0 0 25px rgba(0, 255, 255, 0.8); }}
-            100% {{ box-shadow: 0 0 15px rgba(0, 255, 255, 0.4); }}
-        }}
-        
-        .stButton > button[data-testid="primary-button"] {{
-            animation: pulse-neon 2s infinite;
-        }}
-        
-        .stSelectbox > div > div > div {{
-            background: linear-gradient(135deg, rgba(0, 255, 255, 0.1) 0%, rgba(255, 20, 147, 0.1) 100%);
-            border: 1px solid {colors['primary']};
-            color: {colors['text']};
-        }}
-        
-        /* Estilo menu navegação - Neon */
-        .nav-link {{
-            background: linear-gradient(135deg, rgba(0, 255, 255, 0.15) 0%, rgba(255, 20, 147, 0.15) 100%) !important;
-            border: 2px solid {colors['primary']} !important;
-            border-radius: 12px !important;
-            color: {colors['text']} !important;
-            font-weight: bold !important;
-            transition: all 0.3s ease !important;
-            box-shadow: 0 0 15px rgba(0, 255, 255, 0.3) !important;
-            text-shadow: 0 0 8px rgba(255, 255, 255, 0.6) !important;
-        }}
-        
-        .nav-link:hover {{
-            transform: translateY(-3px) scale(1.05) !important;
-            box-shadow: 0 0 25px rgba(0, 255, 255, 0.6) !important;
-            border-color: {colors['secondary']} !important;
-            text-shadow: 0 0 15px rgba(255, 255, 255, 1) !important;
-        }}
-        
-        .nav-link-selected {{
-            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%) !important;
+    Todas as séries compartilham a mesma matriz de desenho, então um único lstsq resolve o lote
+    inteiro (uma coluna de Y por série). Guarda só os parâmetros ajustados; as projeções saem de
+    forecast_series() para qualquer horizonte.
+    """
+    cubo = rollup['cubo']
+    cubo = cubo[cubo['status'] == 'Concluída']
+    ref = get_reference_month(rollup)
+    meses = pd.period_range(rollup['mensal'].index.min(), ref, freq='M')
+    por_serie = (cubo.groupby([cubo['periodo'].dt.to_period('M').rename('mes'), 'produto', 'regiao'], observed=True)['valor']
+                 .sum().unstack(['produto', 'regiao'], fill_value=0).reindex(meses, fill_value=0))
+    por_serie.insert(0, ('Total', 'Total'), por_serie.sum(axis=1))
+    # Motor do índice montado aqui, antes de o modelo ser publicado para as outras threads
+    por_serie.columns.get_loc(('Total', 'Total'))
+    
+    X = build_forecast_design(meses, meses[0])
+    Y = por_serie.to_numpy(dtype=float)
+    coeficientes, _, posto, _ = np.linalg.lstsq(X, Y, rcond=None)
+    residuos = Y - X @ coeficientes
+    graus_liberdade = max(len(meses) - posto, 1)
+    return {
+        'origem': meses[0],
+        'ref': ref,
+        'series': por_serie.columns,
+        'coeficientes': coeficientes,
+        'sigma': np.sqrt((residuos ** 2).sum(axis=0) / graus_liberdade),
+        'xtx_inv': np.linalg.pinv(X.T @ X),
+    }
+
+def forecast_series(modelo, horizonte=FORECAST_HORIZON):
+    """Projeção e banda de confiança de todas as séries nos meses seguintes ao último fechado
+    
+    Retorna DataFrames (meses x séries) de previsão, limite inferior e superior. A banda é o
+    intervalo de predição do modelo linear (erro do ajuste + variância do resíduo). O total é
+    sempre a primeira coluna: quem o lê usa a posição, porque as colunas compartilham o índice
+    de modelo['series'] entre as threads e a primeira busca por rótulo num MultiIndex não é
+    segura em paralelo.
+    """
+    meses = pd.period_range(modelo['ref'] + 1, periods=horizonte, freq='M')
+    X = build_forecast_design(meses, modelo['origem'])
+    previsao = X @ modelo['coeficientes']
+    fator = np.sqrt(1 + np.einsum('ij,jk,ik->i', X, modelo['xtx_inv'], X))
+    margem = FORECAST_Z * fator[:, None] * modelo['sigma'][None, :]
+    
+    def quadro(valores):
+        return pd.DataFrame(np.clip(valores, 0, None), index=meses, columns=modelo['series'])
+    return quadro(previsao), quadro(previsao - margem), quadro(previsao + margem)
+
+def build_forecast_frame(store, meses=12):
+    """Série mensal realizado vs meta dos últimos meses fechados seguida da projeção do total"""
+    rollup = get_table(store, 'rollup')
+    metas = get_table(store, 'metas')
+    historico = pd.period_range(end=get_reference_month(rollup), periods=meses, freq='M')
+    previsao, inferior, superior = forecast_series(get_table(store, 'previsao'))
+    
+    realizado = rollup['mensal']['receita'].reindex(historico, fill_value=0).astype(float)
+    todos = historico.append(previsao.index)
+    frame = pd.DataFrame({
+        'data': todos.to_timestamp(how='end').normalize(),
+        'vendas': realizado.reindex(todos).values,
+        'meta': metas.reindex(todos).values,
+        'previsao': previsao.iloc[:, 0].reindex(todos).values,
+        'inferior': inferior.iloc[:, 0].reindex(todos).values,
+        'superior': superior.iloc[:, 0].reindex(todos).values,
+    })
+    # A projeção parte do último ponto realizado, para as linhas se ligarem no gráfico
+    frame.loc[meses - 1, ['previsao', 'inferior', 'superior']] = realizado.iloc[-1]
+    return frame
+
+def load_funnel_log(store):
+    """Log de eventos do funil como arrays NumPy (dias desde 1970, prospect, código da etapa)
+    
+    Também guarda a coorte de cada prospect (mês da primeira visita) e o cache de funis já
+    calculados por recorte.
+    """
+    eventos = read_table(store['diretorio'], 'eventos')
+    dias = eventos['data'].values.astype('datetime64[D]').astype(np.int32)
+    prospects = eventos['prospect'].values
+    etapas = eventos['etapa'].cat.codes.values
+    
+    # O log está em ordem de data: a primeira visita de cada prospect é a primeira ocorrência
+    visitas = np.flatnonzero(etapas == 0)
+    unicos, primeiras = np.unique(prospects[visitas], return_index=True)
+    coortes = np.full(int(prospects.max()) + 1 if len(prospects) else 0, -1, dtype=np.int32)
+    coortes[unicos] = dias[visitas[primeiras]].astype('datetime64[D]').astype('datetime64[M]').astype(np.int32)
+    return {
+        'dias': dias,
+        'prospects': prospects,
+        'etapas': etapas,
+        'coortes': coortes,
+        'funis': OrderedDict(),
+        'lock': threading.Lock(),
+    }
+
+def get_funnel_period(funil):
+    """Primeiro e último dia com eventos no log"""
+    return tuple(pd.Timestamp(np.datetime64(int(dia), 'D')) for dia in funil['dias'][[0, -1]])
+
+def compute_funnel(funil, inicio, fim, coortes=()):
+    """Prospects em cada etapa e conversão etapa a etapa dentro de um recorte
+    
+    Considera os eventos de [inicio, fim] (fatia contígua do log ordenado por data) e, se houver,
+    só os prospects das coortes pedidas. Um prospect conta numa etapa se a primeira ocorrência dela
+    não for anterior à da etapa anterior, que ele também precisa ter alcançado.
+    """
+    dia_inicio, dia_fim = (np.datetime64(dia, 'D').astype(np.int64) for dia in (inicio, fim))
+    de = np.searchsorted(funil['dias'], dia_inicio, side='left')
+    ate = np.searchsorted(funil['dias'], dia_fim, side='right')
+    dias, prospects, etapas = funil['dias'][de:ate], funil['prospects'][de:ate], funil['etapas'][de:ate]
+    if coortes:
+        na_coorte = np.isin(funil['coortes'][prospects], np.asarray(coortes, dtype=np.int32))
+        dias, prospects, etapas = dias[na_coorte], prospects[na_coorte], etapas[na_coorte]
+    
+    sem_data = np.iinfo(np.int32).max
+    anterior = None
+    quantidades = []
+    for etapa in range(len(ETAPAS_FUNIL)):
+        nesta = etapas == etapa
+        primeira = np.full(len(funil['coortes']), sem_data, dtype=np.int32)
+        np.minimum.at(primeira, prospects[nesta], dias[nesta])
+        if anterior is not None:
+            primeira[primeira < anterior] = sem_data
+        quantidades.append(int((primeira != sem_data).sum()))
+        anterior = primeira
+    
+    quantidades = np.array(quantidades)
+    anteriores = np.concatenate([quantidades[:1], quantidades[:-1]])
+    return pd.DataFrame({
+        'Etapa': ETAPAS_FUNIL,
+        'Quantidade': quantidades,
+        'Conversão (%)': np.divide(quantidades * 100, anteriores, out=np.zeros(len(quantidades)), where=anteriores > 0),
+        'Conversão Total (%)': quantidades * 100 / quantidades[0] if quantidades[0] else np.zeros(len(quantidades)),
+    })
+
+def get_funnel(funil, inicio, fim, coortes=()):
+    """Funil de um recorte; recortes repetidos saem do cache LRU do log"""
+    chave = (pd.Timestamp(inicio).date(), pd.Timestamp(fim).date(), tuple(sorted(coortes)))
+    with funil['lock']:
+        resultado = funil['funis'].get(chave)
+        if resultado is not None:
+            funil['funis'].move_to_end(chave)
+            return resultado
+    
+    resultado = compute_funnel(funil, *chave)
+    with funil['lock']:
+        funil['funis'][chave] = resultado
+        while len(funil['funis']) > FUNNEL_CACHE_MAX:
+            funil['funis'].popitem(last=False)
+    return resultado
+
+def build_cohort_matrix(transacoes):
+    """Matriz de atividade cliente x mês em bitset (um uint64 por cliente) e receita por coorte
+    
+    O bit j de um cliente indica compra no mês origem + j; a coorte de aquisição é o bit mais baixo.
+    1M de clientes ocupam 8 MB. A receita (transações concluídas) fica somada em coorte x mês de
+    calendário, sem guardar nada por cliente além do bitset.
+    """
+    meses = transacoes['data'].values.astype('datetime64[M]').astype(np.int64)
+    fim = int(meses.max()) if len(meses) else 0
+    origem = max(int(meses.min()) if len(meses) else 0, fim - COHORT_MAX_MESES + 1)
+    coortes = {
+        'origem': origem,
+        'atividade': np.zeros(len(transacoes['cliente'].cat.categories), dtype=np.uint64),
+        'receita': np.zeros((COHORT_MAX_MESES, COHORT_MAX_MESES)),
+    }
+    return update_cohort_matrix(coortes, transacoes)
+
+def update_cohort_matrix(coortes, lote):
+    """Nova matriz com os bits e a receita do lote somados à anterior
+    
+    Retorna None quando o lote exige refazer a matriz do zero: meses fora da janela de bits ou
+    clientes que passariam a ter uma coorte de aquisição mais antiga.
+    """
+    codigos = lote['cliente'].cat.codes.values.astype(np.int64)
+    meses = lote['data'].values.astype('datetime64[M]').astype(np.int64) - coortes['origem']
+    if len(meses) and meses.max() >= COHORT_MAX_MESES:
+        return None
+    dentro = meses >= 0
+    codigos, meses = codigos[dentro], meses[dentro]
+    
+    atividade = coortes['atividade']
+    if len(codigos) and codigos.max() >= len(atividade):
+        atividade = np.concatenate([atividade, np.zeros(codigos.max() + 1 - len(atividade), dtype=np.uint64)])
+    antes = get_cohort_months(atividade[codigos])
+    atividade = atividade.copy()
+    np.bitwise_or.at(atividade, codigos, np.left_shift(np.uint64(1), meses.astype(np.uint64)))
+    
+    coorte = get_cohort_months(atividade[codigos])
+    if ((antes >= 0) & (coorte != antes)).any():
+        return None
+    
+    concluidas = (lote['status'].values == 'Concluída')[dentro]
+    receita = coortes['receita'] + np.bincount(coorte * COHORT_MAX_MESES + meses, minlength=COHORT_MAX_MESES ** 2,
+                                               weights=lote['valor'].values[dentro] * concluidas).reshape(COHORT_MAX_MESES, -1)
+    return {
+        'origem': coortes['origem'],
+        'atividade': atividade,
+        'receita': receita,
+        'ativos': count_cohort_activity(atividade),
+    }
+
+def get_cohort_months(atividade):
+    """Índice do bit mais baixo de cada bitset (mês de aquisição); -1 para clientes sem compras"""
+    menor_bit = atividade & (~atividade + np.uint64(1))
+    return np.where(atividade > 0, np.log2(np.maximum(menor_bit, 1).astype(float)), -1).astype(np.int64)
+
+def count_cohort_activity(atividade):
+    """Clientes ativos de cada coorte em cada mês de calendário (coorte x mês)"""
+    coorte = get_cohort_months(atividade)
+    ativos = np.zeros((COHORT_MAX_MESES, COHORT_MAX_MESES), dtype=np.int64)
+    clientes = coorte >= 0
+    atividade, coorte = atividade[clientes], coorte[clientes]
+    # Só percorre os meses até o bit mais alto presente em algum cliente
+    n_meses = int(np.bitwise_or.reduce(atividade)).bit_length() if len(atividade) else 0
+    for mes in range(n_meses):
+        ativo = (atividade >> np.uint64(mes)) & np.uint64(1) == 1
+        ativos[:, mes] = np.bincount(coorte[ativo], minlength=COHORT_MAX_MESES)
+    return ativos
+
+def to_cohort_age(matriz):
+    """Reindexa uma matriz coorte x mês de calendário para coorte x meses desde a aquisição"""
+    n = matriz.shape[1]
+    calendario = np.arange(n)[:, None] + np.arange(n)[None, :]
+    return np.where(calendario < n, matriz[np.arange(n)[:, None], np.minimum(calendario, n - 1)], np.nan)
+
+def compute_cohort_metrics(coortes, ref):
+    """Tamanho, retenção (%) e LTV acumulado (R$ por cliente) de cada coorte até o mês de referência
+    
+    As matrizes de retenção e LTV são indexadas por coorte (mês de aquisição) e meses de vida.
+    """
+    n = min(ref.ordinal - coortes['origem'] + 1, COHORT_MAX_MESES)
+    ativos = coortes['ativos'][:n, :n]
+    receita = coortes['receita'][:n, :n]
+    tamanhos = np.diag(ativos).astype(float)
+    por_cliente = np.divide(1, tamanhos, out=np.zeros(n), where=tamanhos > 0)[:, None]
+    
+    indice = pd.period_range(end=ref, periods=n, freq='M')
+    vidas = [f"M+{idade}" for idade in range(n)]
+    return {
+        'tamanhos': pd.Series(tamanhos, index=indice),
+        'ativos': pd.DataFrame(ativos, index=indice),
+        'receita': pd.DataFrame(receita, index=indice),
+        'retencao': pd.DataFrame(to_cohort_age(ativos) * por_cliente * 100, index=indice, columns=vidas),
+        'ltv': pd.DataFrame(np.nancumsum(to_cohort_age(receita), axis=1) * por_cliente, index=indice, columns=vidas)
+               .where(~np.isnan(to_cohort_age(receita))),
+    }
+
+def compute_customer_kpis(coortes, ref):
+    """KPIs da aba Clientes: novos clientes, retenção mês a mês e LTV médio (receita por cliente adquirido)"""
+    metricas = compute_cohort_metrics(coortes, ref)
+    tamanhos, receita = metricas['tamanhos'], metricas['receita'].to_numpy()
+    n = len(tamanhos)
+    
+    # Clientes ativos em cada mês e, desses, os que também compraram no mês anterior
+    atividade = coortes['atividade']
+    ativos_mes = metricas['ativos'].to_numpy().sum(axis=0)
+    recorrentes = [0] + [int(((atividade >> np.uint64(mes)) & (atividade >> np.uint64(mes - 1)) & np.uint64(1)).sum())
+                         for mes in range(1, n)]
+    
+    def retencao(mes):
+        return recorrentes[mes] / ativos_mes[mes - 1] * 100 if mes >= 1 and ativos_mes[mes - 1] else 0.0
+    
+    def ltv(mes):
+        clientes = tamanhos.iloc[:mes + 1].sum()
+        return receita[:mes + 1, :mes + 1].sum() / clientes if clientes else 0.0
+    
+    ultimo = n - 1
+    return {
+        'novos': int(tamanhos.iloc[-1]),
+        'novos_delta': pct_change(tamanhos.iloc[-1], tamanhos.iloc[-2] if n > 1 else 0),
+        'retencao': retencao(ultimo),
+        'retencao_delta': retencao(ultimo) - retencao(ultimo - 1),
+        'ltv': ltv(ultimo),
+        'ltv_delta': pct_change(ltv(ultimo), ltv(ultimo - 3) if ultimo >= 3 else 0),
+        'retencao_coortes': metricas['retencao'].tail(COHORT_HEATMAP_MESES).iloc[:, :COHORT_HEATMAP_MESES],
+        'ltv_coortes': metricas['ltv'].tail(COHORT_HEATMAP_MESES).iloc[:, :COHORT_HEATMAP_MESES],
+    }
+
+def load_geography(store):
+    """Unidades e localização dos clientes, com um índice espacial em grade para cada camada
+    
+    A geografia é gerada (com semente própria do dataset) e gravada na primeira vez em que o
+    diretório é aberto; depois só é lida.
+    """
+    diretorio = store['diretorio']
+    if not (diretorio / 'clientes_geo.arrow').exists():
+        unidades, clientes = generate_geography(np.random.default_rng([store['seed'], 1]), len(get_dimension(store, 'clientes')),
+                                                PERFIS_DATASET[store['perfil']]['unidades'])
+        write_table(diretorio, 'unidades', unidades)
+        write_table(diretorio, 'clientes_geo', clientes)
+    
+    unidades = read_table(diretorio, 'unidades')
+    clientes = read_table(diretorio, 'clientes_geo')
+    return {
+        'unidades': unidades,
+        'clientes': clientes,
+        'indice_unidades': build_grid_index(unidades['Lat'].to_numpy(), unidades['Lon'].to_numpy()),
+        'indice_clientes': build_grid_index(clientes['lat'].to_numpy(), clientes['lon'].to_numpy()),
+    }
+
+def build_grid_index(lat, lon, celula=GEO_CELULA_GRAUS):
+    """Índice espacial em grade: pontos ordenados por célula (lat x lon) com o início de cada célula
+    
+    Cada célula não vazia vira um intervalo contíguo de `ordem`, então uma consulta por retângulo
+    só visita as células que o cruzam e confere as coordenadas exatas dos pontos delas.
+    """
+    n_colunas = int(np.ceil(360 / celula))
+    chave = np.floor((lat + 90) / celula).astype(np.int64) * n_colunas + np.floor((lon + 180) / celula).astype(np.int64)
+    ordem = np.argsort(chave, kind='stable')
+    chaves, inicios = np.unique(chave[ordem], return_index=True)
+    return {
+        'lat': lat,
+        'lon': lon,
+        'celula': celula,
+        'n_colunas': n_colunas,
+        'ordem': ordem,
+        'chaves': chaves,
+        'inicios': np.append(inicios, len(ordem)),
+    }
+
+def query_grid_bbox(indice, lat_min, lat_max, lon_min, lon_max):
+    """Posições (em ordem crescente) dos pontos dentro do retângulo"""
+    celula, n_colunas = indice['celula'], indice['n_colunas']
+    linhas, colunas = np.divmod(indice['chaves'], n_colunas)
+    cruzam = np.flatnonzero(
+        (linhas >= np.floor((lat_min + 90) / celula)) & (linhas <= np.floor((lat_max + 90) / celula)) &
+        (colunas >= np.floor((lon_min + 180) / celula)) & (colunas <= np.floor((lon_max + 180) / celula)))
+    
+    # Concatena os intervalos das células sem laço: posição = início da célula + deslocamento
+    inicios = indice['inicios'][cruzam]
+    tamanhos = indice['inicios'][cruzam + 1] - inicios
+    deslocamento = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    candidatos = indice['ordem'][np.repeat(inicios, tamanhos) + deslocamento]
+    
+    lat, lon = indice['lat'][candidatos], indice['lon'][candidatos]
+    dentro = (lat >= lat_min) & (lat <= lat_max) & (lon >= lon_min) & (lon <= lon_max)
+    return np.sort(candidatos[dentro])
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Distância em km pela fórmula de haversine (aceita arrays com broadcasting)"""
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RAIO_TERRA_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+def query_grid_radius(indice, lat, lon, raio_km):
+    """Posições e distâncias dos pontos a até raio_km de (lat, lon)
+    
+    O retângulo que envolve o círculo filtra pela grade; a haversine só roda nos candidatos.
+    """
+    dlat = np.degrees(raio_km / RAIO_TERRA_KM)
+    dlon = dlat / max(np.cos(np.radians(lat)), 1e-6)
+    candidatos = query_grid_bbox(indice, lat - dlat, lat + dlat, lon - dlon, lon + dlon)
+    distancias = haversine_km(lat, lon, indice['lat'][candidatos], indice['lon'][candidatos])
+    dentro = distancias <= raio_km
+    return candidatos[dentro], distancias[dentro]
+
+def cluster_points(lat, lon, celula):
+    """Agrupa pontos em células de `celula` graus: centroide e quantidade de cada cluster"""
+    chave = np.floor((lat + 90) / celula).astype(np.int64) * int(np.ceil(360 / celula)) + np.floor((lon + 180) / celula).astype(np.int64)
+    _, grupo, quantidade = np.unique(chave, return_inverse=True, return_counts=True)
+    return pd.DataFrame({
+        'lat': np.bincount(grupo, weights=lat) / quantidade,
+        'lon': np.bincount(grupo, weights=lon) / quantidade,
+        'quantidade': quantidade,
+    })
+
+def query_map_layer(indice, viewport, maximo=GEO_MAX_MARCADORES):
+    """Pontos de uma camada dentro da janela, ou clusters quando passam de `maximo`
+    
+    Retorna (posições, None) ou (None, clusters). O tamanho dos clusters acompanha a janela:
+    quanto mais aberta, maiores as células, mantendo da ordem de `maximo` marcadores.
+    """
+    lat_min, lat_max, lon_min, lon_max = viewport
+    posicoes = query_grid_bbox(indice, lat_min, lat_max, lon_min, lon_max)
+    if len(posicoes) <= maximo:
+        return posicoes, None
+    celula = max(lat_max - lat_min, lon_max - lon_min) / np.sqrt(maximo)
+    return None, cluster_points(indice['lat'][posicoes], indice['lon'][posicoes], celula)
+
+def coverage_circle(lat, lon, raio_km, pontos=72):
+    """Contorno (lat, lon) do círculo de cobertura, pelo ponto de destino a raio_km em cada rumo"""
+    rumo = np.linspace(0, 2 * np.pi, pontos)
+    lat1, lon1, d = np.radians(lat), np.radians(lon), raio_km / RAIO_TERRA_KM
+    lat2 = np.arcsin(np.sin(lat1) * np.cos(d) + np.cos(lat1) * np.sin(d) * np.cos(rumo))
+    lon2 = lon1 + np.arctan2(np.sin(rumo) * np.sin(d) * np.cos(lat1), np.cos(d) - np.sin(lat1) * np.sin(lat2))
+    return np.degrees(lat2), np.degrees(lon2)
+
+def to_unit_vectors(lat, lon):
+    """Coordenadas como vetores unitários 3D (n x 3)"""
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def grid_neighbor_pairs(indice, lat, lon):
+    """Pares (ponto, posição no índice) de cada ponto com os itens das 3 x 3 células em volta da sua"""
+    celula, n_colunas = indice['celula'], indice['n_colunas']
+    linha = np.floor((lat + 90) / celula).astype(np.int64)
+    coluna = np.floor((lon + 180) / celula).astype(np.int64)
+    vizinhas = ((linha[:, None, None] + np.arange(-1, 2)[None, :, None]) * n_colunas +
+                (coluna[:, None, None] + np.arange(-1, 2)[None, None, :])).reshape(len(lat), 9)
+    
+    celulas = np.minimum(np.searchsorted(indice['chaves'], vizinhas), len(indice['chaves']) - 1)
+    existe = indice['chaves'][celulas] == vizinhas
+    inicios = indice['inicios'][celulas]
+    tamanhos = np.where(existe, indice['inicios'][celulas + 1] - inicios, 0).ravel()
+    deslocamento = np.arange(tamanhos.sum()) - np.repeat(np.cumsum(tamanhos) - tamanhos, tamanhos)
+    pontos = np.repeat(np.arange(len(lat)), tamanhos.reshape(len(lat), 9).sum(axis=1))
+    return pontos, indice['ordem'][np.repeat(inicios.ravel(), tamanhos) + deslocamento]
+
+def assign_nearest_sites(lat, lon, unidades_lat, unidades_lon, unidades_raio_km):
+    """Unidade mais próxima de cada ponto, a distância até ela e se o ponto está em alguma cobertura
+    
+    Em vetores unitários, o maior produto escalar é a menor distância de grande círculo. Cada ponto
+    é comparado só com as unidades das células vizinhas da grade, e a resposta vale se a unidade
+    achada estiver mais perto que a borda dessa vizinhança; os demais passam para uma grade 4x mais
+    grossa. O que sobra (e os pontos fora do raio da mais próxima, que ainda podem estar no raio
+    de outra) é resolvido por blocos de multiplicação de matrizes contra todas as unidades.
+    """
+    n = len(lat)
+    unidades_lat, unidades_lon = np.asarray(unidades_lat), np.asarray(unidades_lon)
+    pontos = to_unit_vectors(lat, lon)
+    unidades = to_unit_vectors(unidades_lat, unidades_lon)
+    raio = np.asarray(unidades_raio_km, dtype=float)
+    cos_raio = np.cos(raio / RAIO_TERRA_KM)
+    mais_proxima = np.zeros(n, dtype=np.int64)
+    coberto = np.zeros(n, dtype=bool)
+    
+    # Grade inicial refinada até ~2 unidades por célula ocupada (a rede se concentra nas cidades)
+    celula = 10.0
+    while celula > 0.05 and len(unidades) > 2 * len(build_grid_index(unidades_lat, unidades_lon, celula)['chaves']):
+        celula /= 2
+    
+    pendentes = np.arange(n)
+    while len(pendentes) and celula <= 45:
+        indice = build_grid_index(unidades_lat, unidades_lon, celula)
+        melhor = np.full(len(pendentes), -2.0)
+        bloco = max(COBERTURA_BLOCO // 64, 1)
+        for inicio in range(0, len(pendentes), bloco):
+            posicoes = pendentes[inicio:inicio + bloco]
+            par_ponto, par_unidade = grid_neighbor_pairs(indice, lat[posicoes], lon[posicoes])
+            if not len(par_ponto):
+                continue
+            produto = np.einsum('ij,ij->i', pontos[posicoes][par_ponto], unidades[par_unidade])
+            # Pares em ordem de ponto: o maior produto de cada ponto e o primeiro par que o atinge
+            comecos = np.flatnonzero(np.r_[True, par_ponto[1:] != par_ponto[:-1]])
+            com_pares = par_ponto[comecos]
+            maior = np.maximum.reduceat(produto, comecos)
+            primeiro = np.minimum.reduceat(np.where(produto == np.repeat(maior, np.diff(np.append(comecos, len(produto)))),
+                                                    np.arange(len(produto)), len(produto)), comecos)
+            melhor[inicio + com_pares] = maior
+            mais_proxima[posicoes[com_pares]] = par_unidade[primeiro]
+        
+        # Resolvidos: a unidade achada está mais perto que a borda da vizinhança 3 x 3 (com folga)
+        plat, plon = lat[pendentes] + 90, lon[pendentes] + 180
+        dlat = np.minimum(plat - (np.floor(plat / celula) - 1) * celula, (np.floor(plat / celula) + 2) * celula - plat)
+        dlon = np.minimum(plon - (np.floor(plon / celula) - 1) * celula, (np.floor(plon / celula) + 2) * celula - plon)
+        cos_lat = np.cos(np.radians(np.minimum(np.abs(plat - 90) + 2 * celula, 90)))
+        borda_km = 0.9 * np.radians(np.minimum(dlat, dlon * cos_lat)) * RAIO_TERRA_KM
+        pendentes = pendentes[np.arccos(np.clip(melhor, -1, 1)) * RAIO_TERRA_KM > borda_km]
+        celula *= 4
+    
+    bloco = max(COBERTURA_BLOCO // max(len(unidades), 1), 1)
+    for inicio in range(0, len(pendentes), bloco):
+        posicoes = pendentes[inicio:inicio + bloco]
+        produto = pontos[posicoes] @ unidades.T
+        mais_proxima[posicoes] = produto.argmax(axis=1)
+        coberto[posicoes] = (produto >= cos_raio).any(axis=1)
+    
+    distancia = haversine_km(lat, lon, unidades_lat[mais_proxima], unidades_lon[mais_proxima])
+    coberto |= distancia <= raio[mais_proxima]
+    
+    # Fora do raio da mais próxima: ainda pode estar no raio (maior) de outra unidade
+    restantes = np.setdiff1d(np.flatnonzero(~coberto), pendentes)
+    for inicio in range(0, len(restantes), bloco):
+        posicoes = restantes[inicio:inicio + bloco]
+        coberto[posicoes] = (pontos[posicoes] @ unidades.T >= cos_raio).any(axis=1)
+    return mais_proxima, distancia, coberto
+
+def compute_coverage(geo, transacoes):
+    """Atribui cada cliente à unidade ativa mais próxima e soma a receita das transações por unidade
+    
+    Unidades em manutenção não atendem. Um cliente é descoberto quando não está no raio de
+    cobertura de nenhuma unidade ativa. A receita (transações concluídas) vai para a unidade do
+    cliente da transação.
+    """
+    unidades = geo['unidades']
+    ativas = np.flatnonzero(unidades['Status'].to_numpy() != 'Manutenção')
+    clientes = geo['clientes']
+    indice, distancia, coberto = assign_nearest_sites(
+        clientes['lat'].to_numpy(), clientes['lon'].to_numpy(), unidades['Lat'].to_numpy()[ativas],
+        unidades['Lon'].to_numpy()[ativas], unidades['Cobertura_KM'].to_numpy()[ativas])
+    unidade = ativas[indice]
+    
+    codigos = transacoes['cliente'].cat.codes.to_numpy()
+    concluidas = transacoes['status'].to_numpy() == 'Concluída'
+    receita_cliente = np.bincount(codigos, weights=transacoes['valor'].to_numpy() * concluidas, minlength=len(clientes))
+    
+    n = len(unidades)
+    n_clientes = np.bincount(unidade, minlength=n)
+    por_unidade = pd.DataFrame({
+        'Local': unidades['Local'],
+        'Tipo': unidades['Tipo'],
+        'Status': unidades['Status'],
+        'Clientes': n_clientes,
+        'Descobertos': np.bincount(unidade, weights=~coberto, minlength=n).astype(np.int64),
+        'Distancia_Media_KM': np.divide(np.bincount(unidade, weights=distancia, minlength=n), n_clientes,
+                                        out=np.full(n, np.nan), where=n_clientes > 0),
+        'Receita': np.bincount(unidade, weights=receita_cliente, minlength=n),
+    })
+    return {
+        'unidade': unidade,
+        'distancia_km': distancia,
+        'coberto': coberto,
+        'receita_cliente': receita_cliente,
+        'por_unidade': por_unidade.iloc[ativas].sort_values('Receita', ascending=False),
+    }
+
+def format_int(valor):
+    return f"{valor:,.0f}".replace(',', '.')
+
+def format_brl(valor):
+    """Valor monetário no padrão dos cards (R$ 12,5M / R$ 6.789)"""
+    if abs(valor) >= 1e6:
+        return "R$ " + f"{valor / 1e6:,.1f}".replace(',', '_').replace('.', ',').replace('_', '.') + "M"
+    return "R$ " + format_int(valor)
+
+def build_transaction_index(transacoes):
+    """Colunas de filtro das transações (já ordenadas por data) expostas como arrays NumPy"""
+    return {
+        'transacoes': transacoes,
+        'datas': transacoes['data'].values,
+        'regiao': transacoes['regiao'].cat.codes.values,
+        'produto': transacoes['produto'].cat.codes.values,
+        'vendedor': transacoes['vendedor'].values,
+        'valor': transacoes['valor'].values,
+        'status': transacoes['status'].cat.codes.values,
+        'ordens': {},
+    }
+
+def get_sorted_positions(indice, ordenacao, status=None):
+    """Posições em ordem crescente de data ou valor, opcionalmente só de um status
+    
+    Cada combinação é montada na primeira consulta e reaproveitada; ingestões que só anexam
+    linhas levam as ordens montadas adiante (extend_sorted_positions). Empates por valor mantêm a ordem por data (ordenação estável).
+    """
+    chave = (ordenacao, status)
+    ordem = indice['ordens'].get(chave)
+    if ordem is None:
+        if status is None:
+            ordem = np.arange(len(indice['valor'])) if ordenacao == 'data' else np.argsort(indice['valor'], kind='stable')
+        else:
+            base = get_sorted_positions(indice, ordenacao)
+            codigo = indice['transacoes']['status'].cat.categories.get_loc(status)
+            ordem = base[indice['status'][base] == codigo]
+        indice['ordens'][chave] = ordem
+    return ordem
+
+def extend_sorted_positions(indice, ordens, inicio):
+    """Leva as ordenações já montadas de um índice anterior para o índice com um lote anexado
+    
+    As posições novas vão para o fim da ordem por data; na ordem por valor entram por merge
+    (searchsorted) depois dos empates já presentes, o mesmo resultado da ordenação estável completa
+    sem refazer o argsort das linhas antigas.
+    """
+    valor = indice['valor']
+    novas = np.arange(inicio, len(valor))
+    for (ordenacao, status), ordem in list(ordens.items()):
+        posicoes = novas
+        if status is not None:
+            codigo = indice['transacoes']['status'].cat.categories.get_loc(status)
+            posicoes = novas[indice['status'][novas] == codigo]
+        if ordenacao == 'valor':
+            posicoes = posicoes[np.argsort(valor[posicoes], kind='stable')]
+            ordem = np.insert(ordem, np.searchsorted(valor[ordem], valor[posicoes], side='right'), posicoes)
+        else:
+            ordem = np.concatenate([ordem, posicoes])
+        indice['ordens'][(ordenacao, status)] = ordem
+
+def generate_transaction_batch(store, seed):
+    """Lote sintético de novas transações do dia, com as mesmas categorias da tabela existente"""
+    n = PERFIS_DATASET[store['perfil']]['lote']
+    rng = np.random.default_rng(seed)
+    vendedores = get_table(store, 'vendedores')
+    vendedor_ids = rng.integers(0, len(vendedores), n).astype(np.int32)
+    
+    def amostra(categorias):
+        return pd.Categorical.from_codes(rng.integers(0, len(categorias), n), categories=categorias)
+    
+    return pd.DataFrame({
+        'data': np.full(n, pd.Timestamp.today().normalize()),
+        'cliente': amostra(get_dimension(store, 'clientes')),
+        'produto': amostra(get_dimension(store, 'produtos')),
+        'valor': rng.integers(10000, 200000, n),
+        'status': amostra(get_dimension(store, 'status')),
+        'vendedor': vendedor_ids,
+        'regiao': pd.Categorical.from_codes(vendedores['regiao'].cat.codes.values[vendedor_ids],
+                                            categories=get_dimension(store, 'regioes'))
+    })
+
+def ingest_transactions(store, lote):
+    """Anexa um lote ao store e atualiza incrementalmente cubo, total mensal e série de vendas
+    
+    Transações e índice só são atualizados se já estiverem carregados; caso contrário o lote
+    gravado em disco entra no próximo carregamento.
+    """
+    lote = lote.sort_values('data', kind='stable', ignore_index=True)
+    # Carregadas fora do lock do store: a carga publica a tabela sob esse mesmo lock
+    get_table(store, 'rollup')
+    metas = get_table(store, 'metas')
+    with store['lock']:
+        diretorio = store['diretorio']
+        revisao = publish_part(diretorio, lote, store['revisao'] + 1)
+        if revisao > store['revisao'] + 1:
+            # Partes gravadas por outros processos desde a última revisão entram junto, na ordem
+            lote = pd.concat([read_table(diretorio, f"transacoes-{n:06d}", COLUNAS_TRANSACAO)
+                              for n in range(store['revisao'] + 1, revisao)] + [lote], ignore_index=True)
+            lote = lote.sort_values('data', kind='stable', ignore_index=True)
+        
+        novas = {'rollup': update_rollup_cube(store['tabelas']['rollup'], lote)}
+        novas['vendas'] = build_sales_series(novas['rollup'], metas)
+        novas['kpis'] = compute_kpis(novas['rollup'], metas)
+        transacoes = store['tabelas'].get('transacoes')
+        if transacoes is not None:
+            anterior = store['tabelas'].get('indice')
+            if len(transacoes) and lote['data'].iloc[0] < transacoes['data'].iloc[-1]:
+                # Lote retroativo: a ordem por data precisa ser refeita
+                transacoes = pd.concat([transacoes, lote]).sort_values('data', kind='stable', ignore_index=True)
+                anterior = None
+            else:
+                transacoes = pd.concat([transacoes, lote], ignore_index=True)
+            novas['transacoes'] = transacoes
+            novas['indice'] = build_transaction_index(transacoes)
+            if anterior is not None and len(anterior['valor']) == len(transacoes) - len(lote):
+                extend_sorted_positions(novas['indice'], anterior['ordens'], len(anterior['valor']))
+        coortes = store['tabelas'].get('coortes')
+        if coortes is not None:
+            coortes = update_cohort_matrix(coortes, lote)
+            if coortes is not None:
+                novas['coortes'] = coortes
+        
+        # Tabelas que não dependem das transações seguem; as demais derivadas são refeitas sob demanda
+        estaticas = {nome: tabela for nome, tabela in store['tabelas'].items() if nome in TABELAS_ESTATICAS}
+        store['tabelas'] = dict(estaticas, **novas)
+        store['revisao'] = revisao
+        store['atualizado_em'] = datetime.now()
+    return len(lote)
+
+def ingest_new_transactions():
+    """Simula a chegada de um novo lote de transações na versão corrente do dataset"""
+    store = get_store()
+    lote = generate_transaction_batch(store, seed=[store['seed'], store['revisao'] + 1])
+    return ingest_transactions(store, lote)
+
+TABELAS_ESTATICAS = ('metas', 'vendedores', 'dimensoes', 'funil', 'geo')
+
+CARREGADORES_TABELA = {
+    'metas': load_metas,
+    'vendedores': load_vendedores,
+    'dimensoes': load_dimensions,
+    'transacoes': load_transacoes,
+    'rollup': load_rollup,
+    'vendas': lambda store: build_sales_series(get_table(store, 'rollup'), get_table(store, 'metas')),
+    'indice': lambda store: build_transaction_index(get_table(store, 'transacoes')),
+    'kpis': lambda store: compute_kpis(get_table(store, 'rollup'), get_table(store, 'metas')),
+    'sugestoes': lambda store: compute_suggestions(store),
+    'previsao': lambda store: fit_forecast_models(get_table(store, 'rollup')),
+    'funil': load_funnel_log,
+    'geo': load_geography,
+    'cobertura': lambda store: compute_coverage(get_table(store, 'geo'), get_table(store, 'transacoes')),
+    'coortes': lambda store: build_cohort_matrix(get_table(store, 'transacoes')),
+    'kpis_clientes': lambda store: compute_customer_kpis(get_table(store, 'coortes'),
+                                                         get_reference_month(get_table(store, 'rollup'))),
+}
+
+def get_period_range(periodo, hoje=None):
+    """Intervalo [início, fim) de um período do filtro, relativo ao dia de hoje"""
+    hoje = hoje or pd.Timestamp.today().normalize()
+    inicios = {
+        'Hoje': hoje,
+        'Esta Semana': hoje - pd.Timedelta(days=hoje.weekday()),
+        'Este Mês': hoje.replace(day=1),
+        'Últimos 3 Meses': hoje - pd.DateOffset(months=3),
+        'Este Ano': hoje.replace(month=1, day=1),
+    }
+    return inicios[periodo], hoje + pd.Timedelta(days=1)
+
+def filter_transactions(indice, periodo, regioes, produto):
+    """Posições (no índice ordenado) das transações que atendem aos filtros
+    
+    O período é resolvido por busca binária na coluna de datas ordenada; região e produto
+    são comparados por código categórico apenas dentro dessa fatia.
+    """
+    inicio, fim = get_period_range(periodo)
+    lo, hi = np.searchsorted(indice['datas'], [np.datetime64(inicio), np.datetime64(fim)])
+    
+    if (not regioes or 'Todos' in regioes) and produto == 'Todos':
+        return np.arange(lo, hi)
+    
+    mask = np.ones(hi - lo, dtype=bool)
+    if regioes and 'Todos' not in regioes:
+        # Tabela de lookup por código: mais rápida que np.isin em fatias de milhões de linhas
+        categorias = indice['transacoes']['regiao'].cat.categories
+        selecionadas = np.zeros(len(categorias), dtype=bool)
+        selecionadas[categorias.get_indexer(regioes)] = True
+        mask &= selecionadas[indice['regiao'][lo:hi]]
+    if produto != 'Todos':
+        codigo = indice['transacoes']['produto'].cat.categories.get_loc(produto)
+        mask &= indice['produto'][lo:hi] == codigo
+    
+    return np.flatnonzero(mask) + lo
+
+def query_transaction_feed(indice, posicoes, status=None, ordenacao='data'):
+    """Posições do feed na ordem de exibição (mais recentes ou maiores valores primeiro)
+    
+    O resultado é uma view; a página é só uma fatia dele. Com filtro apenas de período e
+    ordenação por data, a consulta é uma busca binária na ordem pré-calculada.
+    """
+    ordem = get_sorted_positions(indice, ordenacao, status)
+    if len(posicoes) == 0:
+        return posicoes
+    if ordenacao == 'data' and posicoes[-1] - posicoes[0] + 1 == len(posicoes):
+        lo, hi = np.searchsorted(ordem, [posicoes[0], posicoes[-1] + 1])
+        return ordem[lo:hi][::-1]
+    
+    selecionadas = np.zeros(len(indice['valor']), dtype=bool)
+    selecionadas[posicoes] = True
+    return ordem[selecionadas[ordem]][::-1]
+
+def get_top_vendedores(indice, posicoes, vendedores, periodo, n=5):
+    """Ranking de vendedores pela receita (concluídas) das transações filtradas, com a meta mensal proporcional ao período
+    
+    Com n=None retorna todos os vendedores com vendas, já ordenados.
+    """
+    if len(posicoes) and posicoes[-1] - posicoes[0] + 1 == len(posicoes):
+        # Posições contíguas (só filtro de período): fatia sem cópia
+        posicoes = slice(posicoes[0], posicoes[-1] + 1)
+    # Só concluídas contam para a meta; pendentes e processando ainda são pipeline
+    concluida = indice['status'][posicoes] == STATUS_TRANSACAO.index('Concluída')
+    vendas = np.bincount(indice['vendedor'][posicoes], weights=indice['valor'][posicoes] * concluida, minlength=len(vendedores))
+    inicio, fim = get_period_range(periodo)
+    fator_meta = (fim - inicio).days / 30
+    
+    ranking = vendedores.assign(vendas=vendas, meta=(vendedores['meta'] * fator_meta).round())
+    ranking = ranking[ranking['vendas'] > 0]
+    ranking = ranking.sort_values('vendas', ascending=False, kind='stable') if n is None else ranking.nlargest(n, 'vendas')
+    return ranking.assign(posicao=np.arange(1, len(ranking) + 1),
+                          performance=(ranking['vendas'] / ranking['meta'] * 100).round(1))
+
+VISOES_EXPORTACAO = {
+    'vendas_mensais': '📈 Vendas mensais',
+    'vendedores': '🏆 Ranking de vendedores',
+    'transacoes': '💳 Transações',
+}
+
+FORMATOS_EXPORTACAO = {
+    'CSV': ('csv', 'text/csv'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+if openpyxl is not None:
+    FORMATOS_EXPORTACAO['XLSX'] = ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+def get_export_filters():
+    """Filtros correntes da aba de Vendas (ou os padrões, se a aba não estiver aberta)"""
+    return {
+        'periodo': st.session_state.get('filtro_periodo', "Este Mês"),
+        'regioes': list(st.session_state.get('filtro_regiao', ["Todos"])),
+        'produto': st.session_state.get('filtro_produto', "Todos"),
+    }
+
+def iter_export_chunks(store, visao, filtros):
+    """Blocos da visão exportada; transações saem em fatias de EXPORT_CHUNK_ROWS linhas"""
+    if visao == 'vendas_mensais':
+        yield get_table(store, 'vendas')
+        return
+    
+    indice = get_table(store, 'indice')
+    posicoes = filter_transactions(indice, filtros['periodo'], filtros['regioes'], filtros['produto'])
+    if visao == 'vendedores':
+        ranking = get_top_vendedores(indice, posicoes, get_table(store, 'vendedores'), filtros['periodo'], n=None)
+        yield ranking[['posicao', 'nome', 'regiao', 'vendas', 'meta', 'performance']]
+        return
+    
+    # Pelo menos um bloco, mesmo vazio, para o arquivo sair com cabeçalho/schema
+    nomes = get_table(store, 'vendedores')['nome'].to_numpy()
+    for inicio in range(0, max(len(posicoes), 1), EXPORT_CHUNK_ROWS):
+        bloco = indice['transacoes'].take(posicoes[inicio:inicio + EXPORT_CHUNK_ROWS])[COLUNAS_TRANSACAO]
+        yield bloco.assign(vendedor=nomes[bloco['vendedor'].to_numpy()])
+
+def write_export(blocos, caminho, formato):
+    """Grava os blocos um a um em um arquivo temporário e o publica com troca atômica"""
+    descritor, temporario = tempfile.mkstemp(prefix=f".{caminho.name}.", suffix='.tmp', dir=caminho.parent)
+    os.close(descritor)
+    temporario = Path(temporario)
+    try:
+        if formato == 'CSV':
+            with open(temporario, 'w', encoding='utf-8-sig', newline='') as arquivo:
+                for i, bloco in enumerate(blocos):
+                    bloco.to_csv(arquivo, header=i == 0, index=False)
+        
+        elif formato == 'Parquet':
+            writer = None
+            try:
+                for bloco in blocos:
+                    tabela = pa.Table.from_pandas(bloco, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(str(temporario), tabela.schema)
+                    writer.write_table(tabela)
+            finally:
+                if writer is not None:
+                    writer.close()
+        
+        else:
+            # Modo write_only: as linhas vão para o arquivo sem manter a planilha em memória
+            workbook = openpyxl.Workbook(write_only=True)
+            planilha = workbook.create_sheet(caminho.stem.split('-')[0])
+            linhas = 0
+            for i, bloco in enumerate(blocos):
+                linhas += len(bloco)
+                if linhas > XLSX_MAX_ROWS:
+                    raise ValueError(f"A exportação tem mais de {format_int(XLSX_MAX_ROWS)} linhas; use CSV ou Parquet.")
+                if i == 0:
+                    planilha.append(list(bloco.columns))
+                for linha in bloco.astype(object).itertuples(index=False):
+                    planilha.append(list(linha))
+            workbook.save(temporario)
+        
+        os.replace(temporario, caminho)
+    finally:
+        temporario.unlink(missing_ok=True)
+
+def export_report(store, visao, formato, filtros):
+    """Arquivo do relatório, gerado só na primeira exportação de cada assinatura de filtros
+    
+    A assinatura inclui a revisão do dataset e a data de hoje, porque períodos como "Hoje" e
+    "Este Mês" mudam de intervalo com o dia. A revisão também vai no nome do arquivo, para que
+    relatórios de revisões anteriores sejam apagados quando um novo é gerado.
+    """
+    assinatura = json.dumps([store['revisao'], datetime.now().date().isoformat(), visao, formato, filtros],
+                            ensure_ascii=False, sort_keys=True)
+    extensao = FORMATOS_EXPORTACAO[formato][0]
+    diretorio = store['diretorio'] / 'exports'
+    diretorio.mkdir(exist_ok=True)
+    caminho = diretorio / f"{visao}-r{store['revisao']:06d}-{hashlib.sha1(assinatura.encode('utf-8')).hexdigest()[:16]}.{extensao}"
+    
+    if not caminho.exists():
+        write_export(iter_export_chunks(store, visao, filtros), caminho, formato)
+        prune_exports(diretorio, caminho, store['revisao'])
+    return caminho
+
+def prune_exports(diretorio, caminho, revisao):
+    """Apaga relatórios de revisões anteriores e, do mais antigo para o mais novo, os que passam
+    de EXPORT_MAX_BYTES no total; o relatório recém-gerado (caminho) é sempre mantido"""
+    arquivos = []
+    for arquivo in diretorio.iterdir():
+        encontrado = re.search(r'-r(\d+)-', arquivo.name)
+        if arquivo == caminho or arquivo.name.startswith('.') or encontrado is None:
+            continue
+        if int(encontrado.group(1)) < revisao:
+            arquivo.unlink(missing_ok=True)
+            continue
+        try:
+            arquivos.append((arquivo.stat(), arquivo))
+        except FileNotFoundError:
+            pass  # apagado por outro processo no meio da varredura
+    
+    total = caminho.stat().st_size
+    for info, arquivo in sorted(arquivos, key=lambda item: item[0].st_mtime, reverse=True):
+        total += info.st_size
+        if total > EXPORT_MAX_BYTES:
+            arquivo.unlink(missing_ok=True)
+
+@st.cache_resource
+def get_email_queue():
+    """Fila de envio por processo: poucos workers dedicados, separados das sessões interativas"""
+    return {
+        'executor': ThreadPoolExecutor(max_workers=EMAIL_WORKERS, thread_name_prefix='aurum-email'),
+        'jobs': OrderedDict(),
+        'lock': threading.Lock(),
+    }
+
+def update_email_job(fila, job, **campos):
+    with fila['lock']:
+        job.update(campos)
+
+def send_email_report(store, job):
+    """Gera (ou reaproveita) o arquivo do relatório e o envia pelo SMTP configurado"""
+    fila = get_email_queue()
+    try:
+        update_email_job(fila, job, status='Gerando')
+        caminho = export_report(store, job['visao'], job['formato'], job['filtros'])
+        
+        mensagem = EmailMessage()
+        mensagem['Subject'] = f"Aurum - {VISOES_EXPORTACAO[job['visao']][2:]}"
+        mensagem['From'] = SMTP_CONFIG['remetente']
+        mensagem['To'] = job['destinatario']
+        mensagem.set_content(f"Segue em anexo o relatório gerado em {job['criado_em'].strftime('%d/%m/%Y %H:%M')}.")
+        tipo, subtipo = FORMATOS_EXPORTACAO[job['formato']][1].split('/')
+        mensagem.add_attachment(caminho.read_bytes(), maintype=tipo, subtype=subtipo, filename=caminho.name)
+        
+        update_email_job(fila, job, status='Enviando')
+        with smtplib.SMTP(SMTP_CONFIG['host'], SMTP_CONFIG['port'], timeout=30) as smtp:
+            if SMTP_CONFIG['starttls']:
+                smtp.starttls()
+            if SMTP_CONFIG['usuario']:
+                smtp.login(SMTP_CONFIG['usuario'], SMTP_CONFIG['senha'])
+            smtp.send_message(mensagem)
+        update_email_job(fila, job, status='Enviado', concluido_em=datetime.now())
+    except Exception as erro:
+        logger.exception("Falha no envio do relatório para %s", job['destinatario'])
+        update_email_job(fila, job, status='Falhou', erro=str(erro), concluido_em=datetime.now())
+
+def submit_email_report(destinatario, visao, formato, filtros):
+    """Enfileira o envio e retorna o id do job (None se a fila estiver cheia)"""
+    fila = get_email_queue()
+    job = {
+        'id': hashlib.sha1(f"{destinatario}:{time.time_ns()}".encode('utf-8')).hexdigest()[:10],
+        'destinatario': destinatario,
+        'visao': visao,
+        'formato': formato,
+        'filtros': filtros,
+        'status': 'Na fila',
+        'erro': None,
+        'criado_em': datetime.now(),
+        'concluido_em': None,
+    }
+    with fila['lock']:
+        pendentes = sum(j['status'] not in ('Enviado', 'Falhou') for j in fila['jobs'].values())
+        if pendentes >= EMAIL_MAX_PENDING:
+            return None
+        fila['jobs'][job['id']] = job
+        # Descarta os jobs concluídos mais antigos
+        concluidos = [i for i, j in fila['jobs'].items() if j['status'] in ('Enviado', 'Falhou')]
+        for i in concluidos[:max(0, len(fila['jobs']) - EMAIL_JOBS_KEPT)]:
+            del fila['jobs'][i]
+    fila['executor'].submit(send_email_report, get_store(), job)
+    return job['id']
+
+def get_email_jobs(ids):
+    """Cópia do estado dos jobs pedidos, do mais recente para o mais antigo"""
+    fila = get_email_queue()
+    with fila['lock']:
+        return [dict(fila['jobs'][i]) for i in reversed(ids) if i in fila['jobs']]
+
+def show_email_jobs():
+    """Status dos envios da sessão; enquanto houver job pendente, só este trecho é reexecutado"""
+    status_icon = {'Na fila': '🕒', 'Gerando': '⚙️', 'Enviando': '📤', 'Enviado': '✅', 'Falhou': '❌'}
+    for job in get_email_jobs(st.session_state.get('email_jobs', []))[:3]:
+        detalhe = f" — {job['erro']}" if job['erro'] else ""
+        st.caption(f"{status_icon[job['status']]} {job['destinatario']}: {job['status']}{detalhe}")
+
+# Motor de consultas do chatbot: a pergunta é normalizada, as dimensões conhecidas são
+# reconhecidas por vocabulário e a consulta resultante roda no cubo (ou no índice de transações)
+METRICAS_CHAT = {
+    'ticket': ('Ticket médio', ('ticket',)),
+    'transacoes': ('Transações', ('transacoes', 'transacao', 'pedidos', 'pedido', 'quantas', 'quantidade', 'numero de')),
+    # Receita é só o concluído, como no card Receita Total; vendas somam todos os status
+    'receita': ('Receita (concluídas)', ('receita', 'faturamento', 'faturou', 'faturado')),
+    'valor': ('Vendas', ('vendas', 'venda', 'vendemos', 'vendeu', 'valor')),
+}
+
+UF_REGIOES = {uf.lower(): nome for uf, nome in REGIOES_UF.items()}
+
+SINONIMOS_STATUS = {
+    'concluida': 'Concluída', 'concluidas': 'Concluída', 'fechada': 'Concluída', 'fechadas': 'Concluída',
+    'pendente': 'Pendente', 'pendentes': 'Pendente',
+    'processando': 'Processando', 'em processamento': 'Processando',
+}
+
+AGRUPAMENTOS_CHAT = {
+    'regiao': 'regiao', 'regioes': 'regiao', 'estado': 'regiao', 'estados': 'regiao',
+    'produto': 'produto', 'produtos': 'produto',
+    'status': 'status',
+    'mes': 'mes', 'meses': 'mes',
+    'vendedor': 'vendedor', 'vendedores': 'vendedor',
+}
+
+MESES_CHAT = ['janeiro', 'fevereiro', 'marco', 'abril', 'maio', 'junho', 'julho', 'agosto',
+              'setembro', 'outubro', 'novembro', 'dezembro']
+
+# (padrão, período) na ordem de prioridade; o primeiro que casar define o período da consulta
+PERIODOS_CHAT = [
+    (r'\bhoje\b', ('hoje', 0)),
+    (r'\bontem\b', ('ontem', 0)),
+    (r'\b(semana passada|ultima semana|semana anterior)\b', ('semana', 1)),
+    (r'\b(n?est|n?ess)a semana\b', ('semana', 0)),
+    (r'\b(mes passado|ultimo mes|mes anterior)\b', ('mes', 1)),
+    (r'\b((n?est|n?ess)e mes|mes atual)\b', ('mes', 0)),
+    (r'\b(trimestre passado|ultimo trimestre|trimestre anterior)\b', ('trimestre', 1)),
+    (r'\b((n?est|n?ess)e trimestre|trimestre atual)\b', ('trimestre', 0)),
+    (r'\b(ano passado|ultimo ano|ano anterior)\b', ('ano', 1)),
+    (r'\b((n?est|n?ess)e ano|ano atual)\b', ('ano', 0)),
+]
+
+def normalize_text(texto):
+    """Minúsculas, sem acentos e sem pontuação, com espaços simples"""
+    texto = unicodedata.normalize('NFKD', texto.lower())
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]+', ' ', texto).strip()
+
+def match_terms(texto, termos):
+    """Valores cujos termos aparecem como palavras inteiras no texto normalizado"""
+    return sorted({valor for termo, valor in termos.items() if re.search(rf'\b{termo}\b', texto)})
+
+@lru_cache(maxsize=1024)
+def parse_question(texto, produtos):
+    """Converte uma pergunta normalizada em consulta (métrica, período, filtros e agrupamento)
+    
+    Retorna None quando nada na pergunta é reconhecido. O período fica relativo (ex.: trimestre
+    anterior) e só vira datas na execução, então a consulta interpretada vale em qualquer dia.
+    """
+    metrica = next((m for m, (_, termos) in METRICAS_CHAT.items()
+                    if any(re.search(rf'\b{t}\b', texto) for t in termos)), None)
+    
+    periodo = next((p for padrao, p in PERIODOS_CHAT if re.search(padrao, texto)), None)
+    if periodo is None:
+        ultimos = re.search(r'\bultim[oa]s (\d+) (dias|meses)\b', texto)
+        mes = re.search(rf'\b({"|".join(MESES_CHAT)})\b', texto)
+        if ultimos:
+            periodo = (ultimos.group(2), int(ultimos.group(1)))
+        elif mes:
+            periodo = ('mes_nome', MESES_CHAT.index(mes.group(1)) + 1)
+    
+    termos_regiao = {normalize_text(r): r for r in REGIOES}
+    termos_regiao.update(UF_REGIOES)
+    termos_produto = {normalize_text(p): p for p in produtos}
+    # "premium" sozinho também identifica "Aurum Premium" quando a última palavra é única
+    ultimas = [normalize_text(p).split()[-1] for p in produtos]
+    termos_produto.update({u: p for u, p in zip(ultimas, produtos) if ultimas.count(u) == 1})
+    
+    agrupar = re.search(rf'\b(?:por|cada) ({"|".join(AGRUPAMENTOS_CHAT)})\b', texto)
+    consulta = {
+        'metrica': metrica or 'valor',
+        'periodo': periodo or ('meses', 12),
+        'regioes': match_terms(texto, termos_regiao),
+        'produtos': match_terms(texto, termos_produto),
+        'status': match_terms(texto, SINONIMOS_STATUS),
+        'agrupar': AGRUPAMENTOS_CHAT[agrupar.group(1)] if agrupar else None,
+    }
+    reconhecido = metrica or periodo or agrupar or consulta['regioes'] or consulta['produtos'] or consulta['status']
+    return consulta if reconhecido else None
+
+def resolve_chat_period(periodo, hoje=None):
+    """Intervalo [início, fim) e rótulo de um período relativo da consulta"""
+    hoje = hoje or pd.Timestamp.today().normalize()
+    amanha = hoje + pd.Timedelta(days=1)
+    tipo, n = periodo
+    
+    if tipo == 'hoje':
+        return hoje, amanha, "hoje"
+    if tipo == 'ontem':
+        return hoje - pd.Timedelta(days=1), hoje, "ontem"
+    if tipo == 'dias':
+        return amanha - pd.Timedelta(days=n), amanha, f"últimos {n} dias"
+    if tipo == 'meses':
+        return hoje - pd.DateOffset(months=n), amanha, f"últimos {n} meses"
+    if tipo == 'mes_nome':
+        inicio = pd.Timestamp(hoje.year - (n > hoje.month), n, 1)
+        return inicio, min(inicio + pd.DateOffset(months=1), amanha), f"{MESES_CHAT[n - 1].replace('marco', 'março')} de {inicio.year}"
+    
+    if tipo == 'semana':
+        inicio, duracao = hoje - pd.Timedelta(days=hoje.weekday() + 7 * n), pd.Timedelta(days=7)
+    elif tipo == 'mes':
+        inicio, duracao = hoje.replace(day=1) - pd.DateOffset(months=n), pd.DateOffset(months=1)
+    elif tipo == 'trimestre':
+        inicio, duracao = hoje.replace(month=(hoje.month - 1) // 3 * 3 + 1, day=1) - pd.DateOffset(months=3 * n), pd.DateOffset(months=3)
+    else:
+        inicio, duracao = hoje.replace(month=1, day=1) - pd.DateOffset(years=n), pd.DateOffset(years=1)
+    rotulos = {'semana': ("esta semana", "semana passada"), 'mes': ("este mês", "mês passado"),
+               'trimestre': ("este trimestre", "último trimestre"), 'ano': ("este ano", "ano passado")}
+    return inicio, min(inicio + duracao, amanha), rotulos[tipo][n]
+
+def run_chat_query(store, consulta, hoje=None):
+    """Executa a consulta e devolve o total e, se pedido, os totais por grupo
+    
+    Usa o cubo quando a granularidade dele cobre o período exatamente (cubo diário, ou período
+    em meses inteiros); vendedores e recortes de dias no cubo mensal vão ao índice de transações.
+    """
+    hoje = hoje or pd.Timestamp.today().normalize()
+    inicio, fim, rotulo = resolve_chat_period(consulta['periodo'], hoje)
+    meses_inteiros = inicio.day == 1 and (fim.day == 1 or fim > hoje)
+    
+    if consulta['agrupar'] != 'vendedor' and (store['granularidade'] == 'D' or meses_inteiros):
+        linhas = get_table(store, 'rollup')['cubo']
+        datas = linhas['periodo'].values
+        if store['granularidade'] != 'D':
+            datas = datas.astype('datetime64[M]').astype('datetime64[ns]')
+        linhas = linhas[(datas >= np.datetime64(inicio)) & (datas < np.datetime64(fim))]
+    else:
+        indice = get_table(store, 'indice')
+        lo, hi = np.searchsorted(indice['datas'], [np.datetime64(inicio), np.datetime64(fim)])
+        linhas = indice['transacoes'].iloc[lo:hi].rename(columns={'data': 'periodo'}).assign(transacoes=1)
+    
+    for coluna, valores in (('regiao', consulta['regioes']), ('produto', consulta['produtos']), ('status', consulta['status'])):
+        if valores:
+            linhas = linhas[linhas[coluna].isin(valores)]
+    if consulta['metrica'] == 'receita':
+        linhas = linhas[linhas['status'] == 'Concluída']
+    
+    def medida(valor, transacoes):
+        if consulta['metrica'] in ('valor', 'receita'):
+            return valor
+        if consulta['metrica'] == 'transacoes':
+            return transacoes
+        return np.divide(valor, transacoes, out=np.zeros(np.shape(valor), dtype=float), where=np.asarray(transacoes) > 0)
+    
+    grupos = None
+    if consulta['agrupar']:
+        if consulta['agrupar'] == 'mes':
+            chave = linhas['periodo'].dt.to_period('M').rename('mes')
+        else:
+            chave = consulta['agrupar']
+        somas = linhas.groupby(chave, observed=True)[['valor', 'transacoes']].sum()
+        if consulta['agrupar'] == 'mes':
+            rotulos = somas.index.strftime('%m/%Y')
+        elif consulta['agrupar'] == 'vendedor':
+            # Agrupa pelo id (nomes podem repetir entre vendedores); o nome é só o rótulo
+            rotulos = get_table(store, 'vendedores')['nome'].to_numpy()[somas.index.to_numpy()]
+        else:
+            rotulos = somas.index.astype(str)
+        grupos = pd.Series(medida(somas['valor'].values, somas['transacoes'].values), index=rotulos)
+        if consulta['agrupar'] != 'mes':
+            grupos = grupos.sort_values(ascending=False)
+    
+    valor, transacoes = linhas['valor'].sum(), linhas['transacoes'].sum()
+    return {
+        'inicio': inicio,
+        'fim': fim,
+        'rotulo': rotulo,
+        'transacoes': int(transacoes),
+        'total': float(medida(valor, transacoes)),
+        'grupos': grupos,
+    }
+
+def format_chat_answer(consulta, resultado):
+    """Resposta em texto para a bolha do chat"""
+    nome, _ = METRICAS_CHAT[consulta['metrica']]
+    formatar = format_int if consulta['metrica'] == 'transacoes' else format_brl
+    filtros = ', '.join(consulta['regioes'] + consulta['produtos'] + consulta['status'])
+    intervalo = f"{resultado['inicio']:%d/%m/%Y} a {resultado['fim'] - pd.Timedelta(days=1):%d/%m/%Y}"
+    
+    if resultado['transacoes'] == 0:
+        return f"🔍 Não encontrei transações{f' de {filtros}' if filtros else ''} em {resultado['rotulo']} ({intervalo})."
+    
+    resposta = (f"📊 <b>{nome}</b>{f' — {filtros}' if filtros else ''}, {resultado['rotulo']} ({intervalo}): "
+                f"<b>{formatar(resultado['total'])}</b>")
+    if resultado['grupos'] is not None:
+        # Por mês a série é cronológica: mostra os meses mais recentes
+        por_mes = consulta['agrupar'] == 'mes'
+        itens = resultado['grupos'].tail(10) if por_mes else resultado['grupos'].head(10)
+        omitidos = len(resultado['grupos']) - len(itens)
+        if omitidos and por_mes:
+            resposta += f"<br>… {omitidos} meses anteriores omitidos"
+        resposta += ''.join(f"<br>• {grupo}: <b>{formatar(v)}</b>" for grupo, v in itens.items())
+        if omitidos and not por_mes:
+            resposta += f"<br>… e mais {omitidos}"
+    return resposta
+
+@st.cache_resource
+def get_chat_cache():
+    """Cache LRU (por processo) de respostas do chatbot"""
+    return {'respostas': OrderedDict(), 'lock': threading.Lock(), 'hits': 0, 'misses': 0}
+
+def answer_question(store, pergunta):
+    """Responde uma pergunta sobre os dados; respostas repetidas saem do cache
+    
+    A chave combina a consulta interpretada (não o texto), a revisão do dataset e o dia, então
+    perguntas escritas de formas diferentes com o mesmo sentido compartilham a resposta.
+    """
+    consulta = parse_question(normalize_text(pergunta), get_dimension(store, 'produtos'))
+    if consulta is None:
+        return ("🤔 Ainda não entendi essa pergunta. Pergunte sobre <b>vendas</b>, <b>receita</b>, <b>transações</b> ou "
+                "<b>ticket médio</b>, com período, região, produto ou status — por exemplo: "
+                "<i>vendas do último trimestre por região</i> ou <i>transações pendentes de SP este mês</i>.")
+    
+    chave = (store['versao'], store['revisao'], pd.Timestamp.today().date(), json.dumps(consulta, sort_keys=True))
+    cache = get_chat_cache()
+    with cache['lock']:
+        resposta = cache['respostas'].get(chave)
+        if resposta is not None:
+            cache['respostas'].move_to_end(chave)
+            cache['hits'] += 1
+            return resposta
+    
+    resposta = format_chat_answer(consulta, run_chat_query(store, consulta))
+    with cache['lock']:
+        cache['misses'] += 1
+        cache['respostas'][chave] = resposta
+        while len(cache['respostas']) > CHAT_CACHE_MAX:
+            cache['respostas'].popitem(last=False)
+    return resposta
+
+def monthly_by(rollup, dimensao, concluidas=False):
+    """Vendas (ou, com concluidas=True, receita) por mês x dimensão do cubo (meses nas linhas)"""
+    cubo = rollup['cubo']
+    if concluidas:
+        cubo = cubo[cubo['status'] == 'Concluída']
+    return (cubo.groupby([cubo['periodo'].dt.to_period('M').rename('mes'), dimensao], observed=True)['valor']
+            .sum().unstack(fill_value=0))
+
+def format_pct(valor):
+    return f"{valor:+.1f}%".replace('.', ',')
+
+def analyze_quarter(store):
+    """Último trimestre fechado vs o anterior: receita, transações, ticket e destaques
+    
+    Receita e participações contam só as concluídas, como os cards; transações e ticket seguem
+    os cards de vendas (todos os status).
+    """
+    rollup = get_table(store, 'rollup')
+    mensal = rollup['mensal']
+    trimestre = (get_reference_month(rollup) + 1).asfreq('Q') - 1
+    
+    def totais(q):
+        meses = mensal[(mensal.index >= q.asfreq('M', 'start')) & (mensal.index <= q.asfreq('M', 'end'))]
+        return meses['receita'].sum(), meses['valor'].sum(), meses['transacoes'].sum()
+    
+    receita, valor, transacoes = totais(trimestre)
+    receita_ant, valor_ant, transacoes_ant = totais(trimestre - 1)
+    ticket, ticket_ant = valor / max(transacoes, 1), valor_ant / max(transacoes_ant, 1)
+    
+    no_trimestre = lambda df: df[(df.index >= trimestre.asfreq('M', 'start')) & (df.index <= trimestre.asfreq('M', 'end'))].sum()
+    produtos = no_trimestre(monthly_by(rollup, 'produto', concluidas=True))
+    regioes = no_trimestre(monthly_by(rollup, 'regiao', concluidas=True))
+    return (f"📊 <b>{trimestre.quarter}º trimestre de {trimestre.year}</b> vs trimestre anterior:"
+            f"<br>• Receita: <b>{format_brl(receita)}</b> ({format_pct(pct_change(receita, receita_ant))})"
+            f"<br>• Transações: <b>{format_int(transacoes)}</b> ({format_pct(pct_change(transacoes, transacoes_ant))})"
+            f"<br>• Ticket médio: <b>{format_brl(ticket)}</b> ({format_pct(pct_change(ticket, ticket_ant))})"
+            f"<br>• Produto líder: <b>{produtos.idxmax()}</b> ({produtos.max() / max(produtos.sum(), 1) * 100:.0f}% da receita)"
+            f"<br>• Região líder: <b>{regioes.idxmax()}</b> ({regioes.max() / max(regioes.sum(), 1) * 100:.0f}% da receita)")
+
+def analyze_targets(store):
+    """Realizado vs meta nos últimos seis meses fechados"""
+    rollup = get_table(store, 'rollup')
+    metas = get_table(store, 'metas')
+    meses = pd.period_range(end=get_reference_month(rollup), periods=6, freq='M')
+    realizado = rollup['mensal']['receita'].reindex(meses, fill_value=0)
+    atingimento = realizado / metas.reindex(meses).values * 100
+    
+    linhas = ''.join(f"<br>• {mes.strftime('%m/%Y')}: <b>{format_brl(r)}</b> de {format_brl(m)} "
+                     f"({'✅' if a >= 100 else '⚠️'} {a:.0f}%)"
+                     for mes, r, m, a in zip(meses, realizado, metas.reindex(meses).values, atingimento))
+    return (f"🎯 <b>Metas vs realizado</b> — meta batida em <b>{int((atingimento >= 100).sum())} de {len(meses)}</b> meses, "
+            f"atingimento médio de <b>{atingimento.mean():.0f}%</b>:{linhas}")
+
+def analyze_customers(store):
+    """Clientes ativos e receita por cliente nos últimos meses fechados"""
+    rollup = get_table(store, 'rollup')
+    meses = pd.period_range(end=get_reference_month(rollup), periods=6, freq='M')
+    mensal = rollup['mensal'].reindex(meses, fill_value=0)
+    por_cliente = mensal['receita'] / mensal['clientes'].clip(lower=1)
+    
+    linhas = ''.join(f"<br>• {mes.strftime('%m/%Y')}: <b>{format_int(c)}</b> clientes, {format_brl(v)} por cliente"
+                     for mes, c, v in zip(meses, mensal['clientes'], por_cliente))
+    return (f"👥 <b>Base de clientes</b> — {format_int(mensal['clientes'].iloc[-1])} clientes ativos no último mês fechado "
+            f"({format_pct(pct_change(mensal['clientes'].iloc[-1], mensal['clientes'].iloc[-2]))} vs mês anterior):{linhas}")
+
+def analyze_projection(store):
+    """Projeção do próximo trimestre pelo modelo de tendência + sazonalidade, com os destaques por produto x região"""
+    rollup = get_table(store, 'rollup')
+    modelo = get_table(store, 'previsao')
+    previsao, inferior, superior = forecast_series(modelo)
+    trimestre = (modelo['ref'] + 1).asfreq('Q') + 1
+    meses = pd.period_range(trimestre.asfreq('M', 'start'), trimestre.asfreq('M', 'end'), freq='M')
+    # Total na primeira coluna, lido por posição (ver forecast_series)
+    total, total_inferior, total_superior = (quadro.loc[meses].iloc[:, 0] for quadro in (previsao, inferior, superior))
+    
+    # Crescimento projetado de cada produto x região vs o mesmo trimestre do ano anterior
+    projetado = previsao.loc[meses].iloc[:, 1:].sum()
+    cubo = rollup['cubo']
+    ano_anterior = cubo['periodo'].dt.to_period('M').isin(meses - 12) & (cubo['status'] == 'Concluída')
+    realizado = cubo[ano_anterior].groupby(['produto', 'regiao'], observed=True)['valor'].sum().reindex(projetado.index)
+    crescimento = ((projetado / realizado.where(realizado > 0) - 1) * 100).dropna().sort_values(ascending=False)
+    
+    linhas = ''.join(f"<br>• {mes.strftime('%m/%Y')}: <b>{format_brl(p)}</b> ({format_brl(i)} a {format_brl(m)})"
+                     for mes, p, i, m in zip(meses, total, total_inferior, total_superior))
+    destaques = ''.join(f"<br>• {produto} em {regiao}: {format_pct(v)}" for (produto, regiao), v in crescimento.head(3).items())
+    return (f"💰 <b>Projeção para o {trimestre.quarter}º trimestre de {trimestre.year}</b>: "
+            f"<b>{format_brl(total.sum())}</b> (tendência + sazonalidade mensal, intervalo de 95% por mês):"
+            f"{linhas}<br>Maior crescimento projetado vs mesmo trimestre do ano anterior:{destaques}")
+
+def analyze_opportunities(store):
+    """Produtos e regiões cuja receita mais cresceu e caiu (3 meses fechados vs 3 anteriores)"""
+    rollup = get_table(store, 'rollup')
+    ref = get_reference_month(rollup)
+    recentes = pd.period_range(end=ref, periods=3, freq='M')
+    anteriores = recentes - 3
+    
+    def variacao(dimensao):
+        por_mes = monthly_by(rollup, dimensao, concluidas=True)
+        atual = por_mes.reindex(recentes, fill_value=0).sum()
+        base = por_mes.reindex(anteriores, fill_value=0).sum()
+        return ((atual / base.where(base > 0) - 1) * 100).dropna().sort_values(ascending=False)
+    
+    produtos, regioes = variacao('produto'), variacao('regiao')
+    pipeline = rollup['mensal']['pipeline'].get(ref, 0)
+    return (f"🚀 <b>Oportunidades</b> (últimos 3 meses vs 3 anteriores):"
+            f"<br>• Produto em alta: <b>{produtos.index[0]}</b> ({format_pct(produtos.iloc[0])})"
+            f"<br>• Produto mais fraco: <b>{produtos.index[-1]}</b> ({format_pct(produtos.iloc[-1])})"
+            f"<br>• Região em alta: <b>{regioes.index[0]}</b> ({format_pct(regioes.iloc[0])})"
+            f"<br>• Região mais fraca: <b>{regioes.index[-1]}</b> ({format_pct(regioes.iloc[-1])})"
+            f"<br>• Pipeline pendente no último mês: <b>{format_brl(pipeline)}</b>")
+
+def analyze_trends(store):
+    """Tendência da receita: média móvel de 3 meses, comparação anual e extremos dos últimos 12 meses"""
+    rollup = get_table(store, 'rollup')
+    ref = get_reference_month(rollup)
+    vendas = rollup['mensal']['receita'].reindex(pd.period_range(end=ref, periods=24, freq='M'), fill_value=0)
+    media_movel = vendas.rolling(3).mean()
+    ultimos_12 = vendas.iloc[-12:]
+    direcao = pct_change(media_movel.iloc[-1], media_movel.iloc[-4])
+    return (f"📈 <b>Tendência da receita</b> — média móvel de 3 meses em <b>{'alta' if direcao >= 0 else 'queda'}</b> "
+            f"({format_pct(direcao)} vs 3 meses atrás):"
+            f"<br>• {ref.strftime('%m/%Y')} vs mesmo mês do ano anterior: <b>{format_pct(pct_change(vendas.iloc[-1], vendas.iloc[-13]))}</b>"
+            f"<br>• Melhor mês (12m): <b>{ultimos_12.idxmax().strftime('%m/%Y')}</b> com {format_brl(ultimos_12.max())}"
+            f"<br>• Pior mês (12m): <b>{ultimos_12.idxmin().strftime('%m/%Y')}</b> com {format_brl(ultimos_12.min())}"
+            f"<br>• Acumulado 12 meses: <b>{format_brl(ultimos_12.sum())}</b> ({format_pct(pct_change(ultimos_12.sum(), vendas.iloc[:12].sum()))} vs 12 meses anteriores)")
+
+# Sugestões rápidas do chatbot, cada uma ligada a uma análise dos dados
+SUGESTOES_CHAT = {
+    "📊 Análise de performance trimestral": analyze_quarter,
+    "🎯 Comparativo de metas vs realizados": analyze_targets,
+    "👥 Insights sobre a base de clientes": analyze_customers,
+    "💰 Projeção de receita do próximo trimestre": analyze_projection,
+    "🚀 Oportunidades de crescimento": analyze_opportunities,
+    "📈 Tendências das vendas": analyze_trends,
+}
+
+def compute_suggestions(store):
+    """Respostas de todas as sugestões rápidas para a revisão corrente do dataset"""
+    return {sugestao: analise(store) for sugestao, analise in SUGESTOES_CHAT.items()}
+
+# Backends do chatbot: funções (store, pergunta) -> iterador de trechos de texto. Um backend
+# remoto (ex.: um modelo hospedado) só precisa se registrar aqui e ser escolhido via AURUM_CHAT_BACKEND
+CHAT_BACKENDS = {}
+
+def register_chat_backend(nome):
+    def registrar(backend):
+        CHAT_BACKENDS[nome] = backend
+        return backend
+    return registrar
+
+@register_chat_backend('local')
+def local_chat_backend(store, pergunta):
+    """Motor de consultas local, entregue palavra a palavra (as tags HTML seguem junto da palavra)"""
+    yield from re.findall(r'\S+\s*', answer_question(store, pergunta))
+
+def get_chat_backend():
+    backend = CHAT_BACKENDS.get(CHAT_BACKEND)
+    if backend is None:
+        logger.warning("Backend de chat desconhecido: %s; usando o local", CHAT_BACKEND)
+        backend = CHAT_BACKENDS['local']
+    return backend
+
+def stream_chat_response(destino, trechos):
+    """Escreve a resposta no espaço indicado conforme os trechos chegam
+    
+    O primeiro trecho substitui o indicador de digitação imediatamente; os seguintes são
+    agrupados em no máximo uma atualização a cada CHAT_STREAM_INTERVAL segundos.
+    Retorna o texto completo e os tempos até o primeiro trecho e até o fim, em ms.
+    """
+    inicio = time.perf_counter()
+    primeiro_ms = None
+    ultima_escrita = 0.0
+    texto = ''
+    
+    def escrever(conteudo):
+        destino.markdown(render_chat_message({'type': 'ai', 'message': conteudo, 'timestamp': '', 'avatar': '🤖'}),
+                         unsafe_allow_html=True)
+    
+    try:
+        for trecho in trechos:
+            texto += trecho
+            agora = time.perf_counter()
+            if primeiro_ms is None:
+                primeiro_ms = (agora - inicio) * 1000
+            if agora - ultima_escrita >= CHAT_STREAM_INTERVAL:
+                escrever(texto + ' ▌')
+                ultima_escrita = agora
+    except Exception:
+        logger.exception("Falha no backend de chat %s", CHAT_BACKEND)
+        texto += "<br>⚠️ Não consegui concluir a resposta agora. Tente novamente em instantes."
+    
+    texto = texto.strip()
+    escrever(texto)
+    total_ms = (time.perf_counter() - inicio) * 1000
+    return texto, (primeiro_ms if primeiro_ms is not None else total_ms), total_ms
+
+def generate_chat_history():
+    """Histórico inicial do chat: apresentação do assistente com exemplos de perguntas"""
+    chat_history = [
+        {
+            'type': 'ai',
+            'message': '👋 Olá! Respondo perguntas sobre os dados do dashboard, calculadas na hora. Experimente:'
+                       '<br>• <i>vendas do último trimestre por região</i>'
+                       '<br>• <i>ticket médio do Aurum Premium este ano</i>'
+                       '<br>• <i>transações pendentes de SP este mês</i>'
+                       '<br>• <i>vendas por vendedor no mês passado</i>',
+            'timestamp': datetime.now().strftime('%H:%M'),
+            'avatar': '🤖'
+        }
+    ]
+    return chat_history
+
+def render_chat_message(message_data):
+    """HTML de uma bolha do chat; o visual vem das classes do tema, então o HTML não depende dele"""
+    lado = 'user' if message_data['type'] == 'user' else 'ai'
+    return (f'<div class="chat-msg {lado}"><div class="avatar">{message_data["avatar"]}</div>'
+            f'<div class="balao"><div class="texto">{message_data["message"]}</div>'
+            f'<div class="hora">{message_data["timestamp"]}</div></div></div>')
+
+@st.cache_resource
+def get_chat_db():
+    """Conexão SQLite do histórico do chat, compartilhada entre as sessões do processo"""
+    CHAT_DB_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conexao = sqlite3.connect(str(CHAT_DB_PATH), check_same_thread=False)
+    conexao.execute("PRAGMA journal_mode=WAL")
+    conexao.execute("""
+        CREATE TABLE IF NOT EXISTS mensagens (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            usuario TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            mensagem TEXT NOT NULL,
+            criado_em TEXT NOT NULL,
+            html TEXT NOT NULL
+        )
+    """)
+    conexao.execute("CREATE INDEX IF NOT EXISTS mensagens_usuario ON mensagens (usuario, id)")
+    conexao.commit()
+    return {'conexao': conexao, 'lock': threading.Lock()}
+
+def append_chat_messages(usuario, mensagens):
+    """Grava mensagens novas (com o HTML já renderizado) e aplica a retenção do usuário
+    
+    Retorna [(id, html)] das mensagens gravadas, para a sessão anexar sem reler o histórico.
+    """
+    db = get_chat_db()
+    agora = datetime.now().isoformat(timespec='seconds')
+    gravadas = []
+    with db['lock'], db['conexao'] as conexao:
+        for mensagem in mensagens:
+            html_mensagem = render_chat_message(mensagem)
+            cursor = conexao.execute(
+                "INSERT INTO mensagens (usuario, tipo, mensagem, criado_em, html) VALUES (?, ?, ?, ?, ?)",
+                (usuario, mensagem['type'], mensagem['message'], agora, html_mensagem))
+            gravadas.append((cursor.lastrowid, html_mensagem))
+        conexao.execute("""
+            DELETE FROM mensagens WHERE usuario = ? AND id <= (
+                SELECT id FROM mensagens WHERE usuario = ? ORDER BY id DESC LIMIT 1 OFFSET ?
+            )
+        """, (usuario, usuario, CHAT_RETENTION))
+    return gravadas
+
+def load_chat_page(usuario, antes_de=None, limite=CHAT_PAGE_SIZE):
+    """Página de mensagens anteriores a um id, em ordem cronológica, e se ainda há mais antigas"""
+    db = get_chat_db()
+    with db['lock']:
+        linhas = db['conexao'].execute(
+            "SELECT id, html FROM mensagens WHERE usuario = ? AND id < ? ORDER BY id DESC LIMIT ?",
+            (usuario, antes_de if antes_de is not None else 2 ** 63 - 1, limite + 1)).fetchall()
+    return linhas[:limite][::-1], len(linhas) > limite
+
+def get_session_chat():
+    """Histórico do chat da sessão: só a página mais recente é lida ao abrir o chat"""
+    chat = st.session_state.get('chat')
+    if chat is None or chat['usuario'] != st.session_state.user:
+        mensagens, tem_anteriores = load_chat_page(st.session_state.user)
+        chat = st.session_state.chat = {
+            'usuario': st.session_state.user,
+            'mensagens': mensagens,
+            'tem_anteriores': tem_anteriores,
+            'blocos': {},
+        }
+    return chat
+
+def add_session_messages(chat, mensagens):
+    """Anexa mensagens à sessão, descartando páginas inteiras das mais antigas além de CHAT_SESSION_MAX
+    
+    Descartar de página em página mantém o alinhamento dos blocos já renderizados; as mensagens
+    descartadas continuam no banco.
+    """
+    chat['mensagens'] = chat['mensagens'] + mensagens
+    excesso = len(chat['mensagens']) - CHAT_SESSION_MAX
+    if excesso > 0:
+        chat['mensagens'] = chat['mensagens'][-(-excesso // CHAT_PAGE_SIZE) * CHAT_PAGE_SIZE:]
+        chat['tem_anteriores'] = True
+
+def iter_chat_blocks(chat):
+    """HTML do histórico da sessão em blocos de CHAT_PAGE_SIZE mensagens, na ordem cronológica
+    
+    Blocos completos não mudam mais: o HTML de cada um é juntado uma vez e guardado pelo id da
+    primeira mensagem. Só o último bloco, ainda aberto, é montado a cada execução.
+    """
+    mensagens = chat['mensagens']
+    blocos = {}
+    for inicio in range(0, len(mensagens), CHAT_PAGE_SIZE):
+        bloco = mensagens[inicio:inicio + CHAT_PAGE_SIZE]
+        if len(bloco) < CHAT_PAGE_SIZE:
+            yield ''.join(html_mensagem for _, html_mensagem in bloco)
+            break
+        chave = bloco[0][0]
+        blocos[chave] = chat['blocos'].get(chave) or ''.join(html_mensagem for _, html_mensagem in bloco)
+        yield blocos[chave]
+    chat['blocos'] = blocos
+
+def create_typing_indicator(destino):
+    """Mostra o indicador de digitação da IA no espaço indicado, até chegar o primeiro trecho da resposta"""
+    pontos = ''.join(f'<span class="digitando" style="animation-delay: {atraso}s"></span>' for atraso in (0, 0.2, 0.4))
+    destino.markdown(render_chat_message({
+        'type': 'ai',
+        'message': f'{pontos}<span class="pensando">IA Aurum está pensando...</span>',
+        'timestamp': '',
+        'avatar': '🤖'
+    }), unsafe_allow_html=True)
+
+def create_quick_suggestions():
+    """Cria sugestões rápidas de perguntas; retorna a sugestão clicada (ou None)"""
+    colors = get_theme_colors()
+    
+    st.markdown(f"<h4 style='color: {colors['primary']}; margin-bottom: 15px;'>💡 Perguntas Populares</h4>", unsafe_allow_html=True)
+    
+    escolhida = None
+    cols = st.columns(2)
+    for i, suggestion in enumerate(SUGESTOES_CHAT):
+        with cols[i % 2]:
+            if st.button(suggestion, key=f"suggest_{i}", use_container_width=True):
+                escolhida = suggestion
+    return escolhida
+
+def render_theme_css(theme):
+    colors = THEMES[theme]
+    
+    if theme == 'neon':
+        css = f"""
+        <style>
+        .main {{
+            background: linear-gradient(135deg, #1a1a1a 0%, #2d2d2d 100%);
+        }}
+        
+        /* Sidebar Neon */
+        .css-1d391kg {{
+            background: linear-gradient(180deg, #0f0f0f 0%, #1a1a1a 100%);
+            border-right: 2px solid {colors['primary']};
+            box-shadow: 5px 0 20px rgba(0, 255, 255, 0.3);
+        }}
+        
+        .css-1d391kg .stSelectbox > div > div {{
+            background: linear-gradient(135deg, rgba(0, 255, 255, 0.1) 0%, rgba(255, 20, 147, 0.1) 100%);
+            border: 1px solid {colors['primary']};
+            border-radius: 10px;
+            backdrop-filter: blur(10px);
+        }}
+        
+        .css-1d391kg .stButton > button {{
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
+            border: none;
+            border-radius: 12px;
+            color: white;
+            font-weight: bold;
+            padding: 12px 24px;
+            transition: all 0.3s ease;
+            text-shadow: 0 0 10px rgba(255, 255, 255, 0.8);
+            box-shadow: 0 0 15px rgba(0, 255, 255, 0.4), 0 4px 15px rgba(0, 0, 0, 0.3);
+        }}
+        
+        .css-1d391kg .stButton > button:hover {{
+            transform: translateY(-3px) scale(1.05);
+            box-shadow: 0 0 25px rgba(0, 255, 255, 0.6), 0 8px 25px rgba(0, 0, 0, 0.4);
+            text-shadow: 0 0 20px rgba(255, 255, 255, 1);
+        }}
+        
+        .css-1d391kg .stButton > button:active {{
+            transform: translateY(-1px) scale(1.02);
+        }}
+        
+        .metric-card {{
+            background: linear-gradient(135deg, rgba(0, 255, 255, 0.1) 0%, rgba(255, 20, 147, 0.1) 100%);
+            border: 2px solid {colors['primary']};
+            border-radius: 15px;
+            padding: 20px;
+            backdrop-filter: blur(10px);
+            box-shadow: 0 0 20px rgba(0, 255, 255, 0.3);
+            color: {colors['text']};
+        }}
+        .section-header {{
+            color: {colors['primary']};
+            text-shadow: 0 0 10px {colors['primary']};
+            font-weight: bold;
+        }}
+        
+        /* Botões premium gerais - Neon */
+        .stButton > button {{
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
+            border: none;
+            border-radius: 12px;
+            color: white;
+            font-weight: bold;
+            padding: 12px 24px;
+            transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
+            text-shadow: 0 0 10px rgba(255, 255, 255, 0.8);
+            box-shadow: 0 0 15px rgba(0, 255, 255, 0.4), 0 4px 15px rgba(0, 0, 0, 0.3);
+            position: relative;
+            overflow: hidden;
+        }}
+        
+        .stButton > button:before {{
+            content: '';
+            position: absolute;
+            top: 0;
+            left: -100%;
+            width: 100%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
+            transition: left 0.6s ease;
+        }}
+        
+        .stButton > button:hover:before {{
+            left: 100%;
+        }}
+        
+        .stButton > button:hover {{
+            transform: translateY(-5px) scale(1.08);
+            box-shadow: 0 0 30px rgba(0, 255, 255, 0.7), 0 10px 30px rgba(0, 0, 0, 0.5);
+            text-shadow: 0 0 20px rgba(255, 255, 255, 1);
+        }}
+        
+        .stButton > button:active {{
+            transform: translateY(-2px) scale(1.04);
+            transition: all 0.1s ease;
+        }}
+        
+        /* Animações extras premium - Neon */
+        @keyframes pulse-neon {{
+            0% {{ box-shadow: 0 0 15px rgba(0, 255, 255, 0.4); }}
+            50% {{ box-shadow: 0 0 25px rgba(0, 255, 255, 0.8); }}
+            100% {{ box-shadow: 0 0 15px rgba(0, 255, 255, 0.4); }}
+        }}
+        
+        .stButton > button[data-testid="primary-button"] {{
+            animation: pulse-neon 2s infinite;
+        }}
+        
+        .stSelectbox > div > div > div {{
+            background: linear-gradient(135deg, rgba(0, 255, 255, 0.1) 0%, rgba(255, 20, 147, 0.1) 100%);
+            border: 1px solid {colors['primary']};
+            color: {colors['text']};
+        }}
+        
+        /* Estilo menu navegação - Neon */
+        .nav-link {{
+            background: linear-gradient(135deg, rgba(0, 255, 255, 0.15) 0%, rgba(255, 20, 147, 0.15) 100%) !important;
+            border: 2px solid {colors['primary']} !important;
+            border-radius: 12px !important;
+            color: {colors['text']} !important;
+            font-weight: bold !important;
+            transition: all 0.3s ease !important;
+            box-shadow: 0 0 15px rgba(0, 255, 255, 0.3) !important;
+            text-shadow: 0 0 8px rgba(255, 255, 255, 0.6) !important;
+        }}
+        
+        .nav-link:hover {{
+            transform: translateY(-3px) scale(1.05) !important;
+            box-shadow: 0 0 25px rgba(0, 255, 255, 0.6) !important;
+            border-color: {colors['secondary']} !important;
+            text-shadow: 0 0 15px rgba(255, 255, 255, 1) !important;
+        }}
+        
+        .nav-link-selected {{
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%) !important;
             border: 2px solid {colors['accent']} !important;
             box-shadow: 0 0 20px rgba(0, 255, 255, 0.8) !important;
             animation: pulse-neon 1.5s infinite !important;
         }}
         </style>
         """
-    elif st.session_state.theme == 'glass':
+    elif theme == 'glass':
         css = f"""
         <style>
         .main {{
@@ -459,46 +2421,219 @@ def inject_theme_css():
         }}
         
         .css-1d391kg .stButton > button:active {{
-            transform: translateY(-2px) scale(1.03);
+            transform: translateY(-2px) scale(1.03);
+        }}
+        
+        .metric-card {{
+            background: linear-gradient(135deg, rgba(99, 102, 241, 0.1) 0%, rgba(139, 92, 246, 0.1) 100%);
+            border: 2px solid {colors['primary']};
+            border-radius: 20px;
+            padding: 20px;
+            backdrop-filter: blur(15px);
+            box-shadow: 0 8px 32px rgba(99, 102, 241, 0.2);
+            color: #ffffff;
+            font-weight: 700;
+        }}
+        .section-header {{
+            color: {colors['primary']};
+            font-weight: bold;
+        }}
+        
+        /* Botões premium gerais - Glass */
+        .stButton > button {{
+            background: linear-gradient(135deg, rgba(255, 255, 255, 0.4) 0%, rgba(99, 102, 241, 0.2) 100%);
+            border: 1px solid rgba(99, 102, 241, 0.4);
+            border-radius: 15px;
+            color: {colors['primary']};
+            font-weight: bold;
+            padding: 12px 24px;
+            transition: all 0.4s cubic-bezier(0.25, 0.46, 0.45, 0.94);
+            backdrop-filter: blur(20px);
+            box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15);
+            position: relative;
+            overflow: hidden;
+        }}
+        
+        .stButton > button:before {{
+            content: '';
+            position: absolute;
+            top: 0;
+            left: -100%;
+            width: 100%;
+            height: 100%;
+            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.4), transparent);
+            transition: left 0.7s ease;
+        }}
+        
+        .stButton > button:hover:before {{
+            left: 100%;
+        }}
+        
+        .stButton > button:hover {{
+            transform: translateY(-6px) scale(1.08);
+            background: linear-gradient(135deg, rgba(255, 255, 255, 0.6) 0%, rgba(99, 102, 241, 0.3) 100%);
+            box-shadow: 0 15px 40px rgba(99, 102, 241, 0.3);
+            border: 1px solid rgba(99, 102, 241, 0.6);
+        }}
+        
+        .stButton > button:active {{
+            transform: translateY(-3px) scale(1.04);
+            transition: all 0.1s ease;
+        }}
+        
+        /* Animações extras premium - Glass */
+        @keyframes pulse-glass {{
+            0% {{ box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15); }}
+            50% {{ box-shadow: 0 12px 35px rgba(99, 102, 241, 0.35); }}
+            100% {{ box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15); }}
+        }}
+        
+        .stButton > button[data-testid="primary-button"] {{
+            animation: pulse-glass 2.5s infinite;
+        }}
+        
+        .stSelectbox > div > div > div {{
+            background: linear-gradient(135deg, rgba(255, 255, 255, 0.2) 0%, rgba(99, 102, 241, 0.1) 100%);
+            border: 1px solid rgba(99, 102, 241, 0.4);
+            backdrop-filter: blur(10px);
+            color: {colors['primary']};
+        }}
+        
+        /* Estilo menu navegação - Glass */
+        .nav-link {{
+            background: linear-gradient(135deg, rgba(255, 255, 255, 0.25) 0%, rgba(99, 102, 241, 0.15) 100%) !important;
+            border: 2px solid rgba(99, 102, 241, 0.4) !important;
+            border-radius: 15px !important;
+            color: {colors['primary']} !important;
+            font-weight: bold !important;
+            transition: all 0.3s ease !important;
+            backdrop-filter: blur(20px) !important;
+            box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15) !important;
+        }}
+        
+        .nav-link:hover {{
+            transform: translateY(-4px) scale(1.06) !important;
+            background: linear-gradient(135deg, rgba(255, 255, 255, 0.4) 0%, rgba(99, 102, 241, 0.25) 100%) !important;
+            box-shadow: 0 12px 35px rgba(99, 102, 241, 0.3) !important;
+            border-color: rgba(99, 102, 241, 0.6) !important;
+        }}
+        
+        .nav-link-selected {{
+            background: linear-gradient(135deg, rgba(99, 102, 241, 0.3) 0%, rgba(139, 92, 246, 0.25) 100%) !important;
+            border: 2px solid {colors['accent']} !important;
+            box-shadow: 0 15px 40px rgba(99, 102, 241, 0.4) !important;
+            animation: pulse-glass 2s infinite !important;
+        }}
+        </style>
+        """
+    else:  # pastel
+        css = f"""
+        <style>
+        .main {{
+            background: linear-gradient(135deg, {colors['background']} 0%, #F0F8FF 100%);
+        }}
+        
+        /* Títulos sempre visíveis - Pastel */
+        .section-header, h3, .stMarkdown h3 {{
+            color: {colors['primary']} !important;
+            font-weight: bold !important;
+            text-shadow: 1px 1px 2px rgba(255,255,255,0.8) !important;
+        }}
+        
+        /* AURUM sempre dourado */
+        h1, .stMarkdown h1, h2, .stMarkdown h2 {{
+            color: #DAA520 !important;
+            font-weight: bold !important;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.3) !important;
+        }}
+        
+        /* Força cor dourada para qualquer texto AURUM */
+        *:contains("AURUM"), [data-testid="stMarkdownContainer"] h1,
+        [data-testid="stMarkdownContainer"] h2 {{
+            color: #DAA520 !important;
+        }}
+        
+        /* Sidebar Pastel */
+        .css-1d391kg {{
+            background: linear-gradient(180deg, rgba(248, 248, 255, 0.9) 0%, rgba(240, 248, 255, 0.85) 100%);
+            border-right: 3px solid {colors['primary']};
+            box-shadow: 5px 0 20px rgba(135, 206, 235, 0.3);
+            backdrop-filter: blur(5px);
+        }}
+        
+        .css-1d391kg h1 {{
+            color: #DAA520 !important;
+        }}
+        
+        .css-1d391kg h2 {{
+            color: #DAA520 !important;
+        }}
+        
+        .css-1d391kg h3 {{
+            color: {colors['primary']} !important;
+        }}
+        
+        .css-1d391kg .stSelectbox label {{
+            color: #FFFFFF !important;
+            font-weight: bold !important;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.8) !important;
+        }}
+        
+        .css-1d391kg .stSelectbox > div > div {{
+            background: linear-gradient(135deg, rgba(135, 206, 235, 0.15) 0%, rgba(152, 251, 152, 0.15) 100%);
+            border: 2px solid {colors['primary']};
+            border-radius: 12px;
+            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.2);
+        }}
+        
+        .css-1d391kg .stButton > button {{
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
+            border: none;
+            border-radius: 12px;
+            color: white;
+            font-weight: bold;
+            padding: 12px 24px;
+            transition: all 0.3s ease;
+            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4);
+            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
+        }}
+        
+        .css-1d391kg .stButton > button:hover {{
+            transform: translateY(-4px) scale(1.05);
+            box-shadow: 0 10px 30px rgba(135, 206, 235, 0.6);
+            background: linear-gradient(135deg, {colors['accent']} 0%, {colors['primary']} 100%);
+        }}
+        
+        .css-1d391kg .stButton > button:active {{
+            transform: translateY(-2px) scale(1.02);
         }}
         
         .metric-card {{
-            background: linear-gradient(135deg, rgba(99, 102, 241, 0.1) 0%, rgba(139, 92, 246, 0.1) 100%);
+            background: linear-gradient(135deg, rgba(135, 206, 235, 0.15) 0%, rgba(152, 251, 152, 0.15) 100%);
             border: 2px solid {colors['primary']};
-            border-radius: 20px;
+            border-radius: 15px;
             padding: 20px;
-            backdrop-filter: blur(15px);
-            box-shadow: 0 8px 32px rgba(99, 102, 241, 0.2);
+            box-shadow: 0 4px 15px rgba(135, 206, 235, 0.3);
             color: #ffffff;
             font-weight: 700;
+            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
         }}
         .section-header {{
             color: {colors['primary']};
             font-weight: bold;
         }}
-        .vendedor-card {{
-            background: linear-gradient(135deg, rgba(99, 102, 241, 0.08) 0%, rgba(139, 92, 246, 0.08) 100%);
-            border: 2px solid {colors['secondary']};
-            border-radius: 20px;
-            padding: 20px;
-            margin: 10px 0;
-            backdrop-filter: blur(15px);
-            box-shadow: 0 8px 32px rgba(139, 92, 246, 0.15);
-            color: #ffffff;
-            font-weight: 600;
-        }}
         
-        /* Botões premium gerais - Glass */
+        /* Botões premium gerais - Pastel */
         .stButton > button {{
-            background: linear-gradient(135deg, rgba(255, 255, 255, 0.4) 0%, rgba(99, 102, 241, 0.2) 100%);
-            border: 1px solid rgba(99, 102, 241, 0.4);
-            border-radius: 15px;
-            color: {colors['primary']};
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
+            border: none;
+            border-radius: 12px;
+            color: white;
             font-weight: bold;
             padding: 12px 24px;
-            transition: all 0.4s cubic-bezier(0.25, 0.46, 0.45, 0.94);
-            backdrop-filter: blur(20px);
-            box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15);
+            transition: all 0.4s cubic-bezier(0.68, -0.55, 0.265, 1.55);
+            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4);
+            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
             position: relative;
             overflow: hidden;
         }}
@@ -511,7 +2646,7 @@ def inject_theme_css():
             width: 100%;
             height: 100%;
             background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.4), transparent);
-            transition: left 0.7s ease;
+            transition: left 0.5s ease;
         }}
         
         .stButton > button:hover:before {{
@@ -519,658 +2654,1407 @@ def inject_theme_css():
         }}
         
         .stButton > button:hover {{
-            transform: translateY(-6px) scale(1.08);
-            background: linear-gradient(135deg, rgba(255, 255, 255, 0.6) 0%, rgba(99, 102, 241, 0.3) 100%);
-            box-shadow: 0 15px 40px rgba(99, 102, 241, 0.3);
-            border: 1px solid rgba(99, 102, 241, 0.6);
+            transform: translateY(-6px) scale(1.1);
+            box-shadow: 0 12px 35px rgba(135, 206, 235, 0.6);
+            background: linear-gradient(135deg, {colors['accent']} 0%, {colors['primary']} 100%);
         }}
         
         .stButton > button:active {{
-            transform: translateY(-3px) scale(1.04);
+            transform: translateY(-3px) scale(1.05);
             transition: all 0.1s ease;
         }}
         
-        /* Animações extras premium - Glass */
-        @keyframes pulse-glass {{
-            0% {{ box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15); }}
-            50% {{ box-shadow: 0 12px 35px rgba(99, 102, 241, 0.35); }}
-            100% {{ box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15); }}
+        /* Animações extras premium - Pastel */
+        @keyframes pulse-pastel {{
+            0% {{ box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4); }}
+            50% {{ box-shadow: 0 10px 30px rgba(135, 206, 235, 0.7); }}
+            100% {{ box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4); }}
         }}
         
         .stButton > button[data-testid="primary-button"] {{
-            animation: pulse-glass 2.5s infinite;
+            animation: pulse-pastel 2s infinite;
+        }}
+        
+        .stSelectbox > div > div > div {{
+            background: linear-gradient(135deg, rgba(135, 206, 235, 0.1) 0%, rgba(152, 251, 152, 0.1) 100%);
+            border: 2px solid {colors['primary']};
+            color: {colors['text']};
+        }}
+        
+        .stMultiSelect > div > div > div {{
+            background: linear-gradient(135deg, rgba(135, 206, 235, 0.1) 0%, rgba(152, 251, 152, 0.1) 100%);
+            border: 1px solid {colors['secondary']};
+            border-radius: 8px;
+        }}
+        
+        /* Filtros com texto branco - Pastel */
+        .stSelectbox label, .stMultiSelect label {{
+            color: #FFFFFF !important;
+            font-weight: bold !important;
+            text-shadow: 2px 2px 4px rgba(0,0,0,0.8) !important;
+        }}
+        
+        .stSelectbox > div > div > div, .stMultiSelect > div > div {{
+            color: #FFFFFF !important;
+            font-weight: bold !important;
+        }}
+        
+        /* Estilo menu navegação - Pastel */
+        .nav-link {{
+            background: linear-gradient(135deg, rgba(135, 206, 235, 0.2) 0%, rgba(152, 251, 152, 0.15) 100%) !important;
+            border: 3px solid {colors['primary']} !important;
+            border-radius: 12px !important;
+            color: {colors['primary']} !important;
+            font-weight: bold !important;
+            transition: all 0.4s cubic-bezier(0.68, -0.55, 0.265, 1.55) !important;
+            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.3) !important;
+        }}
+        
+        .nav-link:hover {{
+            transform: translateY(-5px) scale(1.08) !important;
+            background: linear-gradient(135deg, {colors['accent']} 0%, {colors['secondary']} 100%) !important;
+            box-shadow: 0 10px 30px rgba(135, 206, 235, 0.5) !important;
+            border-color: {colors['accent']} !important;
+            color: white !important;
+        }}
+        
+        .nav-link-selected {{
+            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%) !important;
+            border: 3px solid {colors['accent']} !important;
+            color: white !important;
+            box-shadow: 0 8px 25px rgba(135, 206, 235, 0.6) !important;
+            animation: pulse-pastel 1.8s infinite !important;
+        }}
+        </style>
+        """
+    
+    # Componentes comuns aos três temas entram no mesmo bloco <style>
+    return css.replace('</style>', render_component_css(theme) + '</style>')
+
+CHAT_AI_BACKGROUNDS = {
+    'neon': 'linear-gradient(135deg, rgba(0, 255, 255, 0.2) 0%, rgba(255, 20, 147, 0.2) 100%)',
+    'glass': 'linear-gradient(135deg, rgba(255, 255, 255, 0.3) 0%, rgba(99, 102, 241, 0.2) 100%)',
+    'pastel': 'linear-gradient(135deg, rgba(135, 206, 235, 0.2) 0%, rgba(152, 251, 152, 0.2) 100%)',
+}
+
+def render_component_css(theme):
+    """Regras dos componentes que usam classes em vez de estilo inline por item: placar de
+    vendedores, cartões do feed de transações e mensagens do chat"""
+    colors = THEMES[theme]
+    text_color = colors['text'] if theme == 'neon' else '#ffffff'
+    return f"""
+        .leaderboard {{
+            width: 100%;
+            border-collapse: separate;
+            border-spacing: 0 8px;
+            color: {text_color};
+        }}
+        .leaderboard th {{
+            font-size: 12px;
+            opacity: 0.8;
+            text-align: left;
+            padding: 0 12px;
+        }}
+        .leaderboard td {{
+            background: rgba(255, 255, 255, 0.08);
+            padding: 10px 12px;
+            text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.3);
+        }}
+        .leaderboard td:first-child {{
+            border-radius: 12px 0 0 12px;
+            font-weight: bold;
+        }}
+        .leaderboard td:last-child {{
+            border-radius: 0 12px 12px 0;
+            min-width: 140px;
+        }}
+        .leaderboard .avatar {{
+            display: inline-flex;
+            align-items: center;
+            justify-content: center;
+            width: 36px;
+            height: 36px;
+            margin-right: 10px;
+            border-radius: 50%;
+            background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']});
+            color: white;
+            font-weight: bold;
+        }}
+        .leaderboard .regiao {{
+            font-size: 12px;
+            opacity: 0.8;
+        }}
+        .leaderboard .barra {{
+            height: 6px;
+            margin-top: 4px;
+            border-radius: 3px;
+            background: rgba(255, 255, 255, 0.15);
+        }}
+        .leaderboard .barra div {{
+            height: 100%;
+            border-radius: 3px;
+            background: currentColor;
+        }}
+        .leaderboard .perf-alta {{ color: #00FF00; }}
+        .leaderboard .perf-media {{ color: #FFD700; }}
+        .leaderboard .perf-baixa {{ color: #FF6B6B; }}
+        .feed {{
+            display: grid;
+            grid-template-columns: repeat(3, 1fr);
+            gap: 15px;
+        }}
+        .feed-card {{
+            background: rgba(255, 255, 255, 0.1);
+            border-radius: 15px;
+            padding: 15px;
+            border: 1px solid {colors['primary']};
+            color: {colors['text']};
+        }}
+        .feed-card .status {{
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 10px;
+            font-size: 12px;
+            font-weight: bold;
+        }}
+        .feed-card .status span {{ font-size: 20px; }}
+        .feed-card .cliente {{
+            font-weight: bold;
+            margin-bottom: 8px;
+        }}
+        .feed-card .produto {{
+            color: {colors['accent']};
+            font-size: 14px;
+            margin-bottom: 8px;
+        }}
+        .feed-card .valor {{
+            font-size: 18px;
+            font-weight: bold;
+            color: #00FF00;
+        }}
+        .feed-card .data {{
+            font-size: 12px;
+            opacity: 0.8;
+            margin-top: 8px;
+        }}
+        .feed-card .concluida {{ color: #00FF00; }}
+        .feed-card .pendente {{ color: #FFD700; }}
+        .feed-card .processando {{ color: #00BFFF; }}
+        .chat-msg {{
+            display: flex;
+            align-items: flex-start;
+            max-width: 75%;
+            margin-bottom: 15px;
+        }}
+        .chat-msg.user {{
+            flex-direction: row-reverse;
+            margin-left: auto;
+            margin-right: 10px;
+        }}
+        .chat-msg.ai {{ margin-left: 10px; }}
+        .chat-msg .avatar {{
+            flex: none;
+            width: 40px;
+            height: 40px;
+            margin: 5px 10px 0;
+            border-radius: 50%;
+            display: flex;
+            align-items: center;
+            justify-content: center;
+            font-size: 18px;
+            border: 2px solid white;
+            box-shadow: 0 2px 10px rgba(0, 0, 0, 0.2);
+            background: linear-gradient(135deg, {colors['accent']}, {colors['primary']});
+        }}
+        .chat-msg.user .avatar {{ background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); }}
+        .chat-msg .balao {{
+            color: #FFFFFF;
+            padding: 12px 18px;
+            border-radius: 18px;
+            border-top-left-radius: 5px;
+            box-shadow: 0 4px 15px rgba(0, 0, 0, 0.1);
+            backdrop-filter: blur(10px);
+            background: {CHAT_AI_BACKGROUNDS[theme]};
+        }}
+        .chat-msg.user .balao {{
+            border-radius: 18px;
+            border-top-right-radius: 5px;
+            background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']});
+        }}
+        .chat-msg .texto {{
+            font-size: 14px;
+            line-height: 1.4;
         }}
+        .chat-msg.user .texto {{ font-weight: 500; }}
+        .chat-msg .hora {{
+            font-size: 11px;
+            opacity: 0.7;
+            margin-top: 6px;
+        }}
+        .chat-msg.user .hora {{ text-align: right; }}
+        .chat-msg .digitando {{
+            display: inline-block;
+            width: 8px;
+            height: 8px;
+            margin-right: 4px;
+            border-radius: 50%;
+            background: #FFFFFF;
+            animation: pulse 1.4s ease-in-out infinite;
+        }}
+        .chat-msg .pensando {{
+            margin-left: 4px;
+            font-size: 12px;
+            font-weight: bold;
+            opacity: 0.9;
+            text-shadow: 1px 1px 2px rgba(0, 0, 0, 0.5);
+        }}
+        @keyframes pulse {{
+            0%, 60%, 100% {{ transform: scale(1); opacity: 1; }}
+            30% {{ transform: scale(1.2); opacity: 0.7; }}
+        }}
+        """
+
+def minify_css(css):
+    """Remove comentários e espaços redundantes sem alterar seletores ou valores"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.strip()
+
+@st.cache_resource
+def get_theme_css_bundles():
+    """CSS de cada tema renderizado e minificado uma única vez por processo"""
+    bundles = {}
+    for theme in THEMES:
+        css = minify_css(render_theme_css(theme))
+        css_hash = hashlib.sha1(css.encode('utf-8')).hexdigest()[:12]
+        bundles[theme] = {
+            'hash': css_hash,
+            'css': css.replace('<style>', f'<style data-aurum-css="{theme}-{css_hash}">', 1),
+        }
+    return bundles
+
+def inject_theme_css():
+    bundle = get_theme_css_bundles()[st.session_state.theme]
+    st.markdown(bundle['css'], unsafe_allow_html=True)
+
+def show_login():
+    # CSS premium para tela de login
+    st.markdown("""
+    <style>
+    .stApp {
+        background: linear-gradient(135deg, #18181b 0%, #1f1f23 100%);
+    }
+    
+    .login-container {
+        max-width: 450px;
+        margin: 2rem auto;
+        padding: 3rem 2rem;
+        background: linear-gradient(135deg, rgba(255, 255, 255, 0.15) 0%, rgba(255, 255, 255, 0.05) 100%);
+        border-radius: 25px;
+        backdrop-filter: blur(20px);
+        box-shadow: 0 15px 50px rgba(0, 0, 0, 0.2);
+        border: 1px solid rgba(255, 255, 255, 0.2);
+    }
+    
+    .login-title {
+        text-align: center;
+        background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        background-clip: text;
+        font-size: 3.5rem;
+        font-weight: bold;
+        margin-bottom: 1rem;
+        text-shadow: 3px 3px 6px rgba(0,0,0,0.3);
+        animation: glow 2s ease-in-out infinite alternate;
+    }
+    
+    @keyframes glow {
+        from { filter: drop-shadow(0 0 10px rgba(251, 191, 36, 0.5)); }
+        to { filter: drop-shadow(0 0 20px rgba(251, 191, 36, 0.8)); }
+    }
+    
+    .login-subtitle {
+        text-align: center;
+        color: white;
+        font-size: 1.3rem;
+        font-weight: bold;
+        margin-bottom: 2rem;
+        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
+    }
+    
+    
+    .version-info {
+        text-align: center;
+        color: rgba(255, 255, 255, 0.8);
+        font-size: 0.9rem;
+        margin-top: 1rem;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+    
+    # Tutorial de modo escuro no login
+    st.error("""
+    💡 **DICA IMPORTANTE:** Para a melhor experiência visual, ative o modo escuro do seu navegador:
+    
+    🌙 **Chrome/Edge:** Clique nas **3 bolinhas (⋮)** → **Configurações** → **Aparência** → **Tema Escuro**
+    🦊 **Firefox:** Clique nas **3 linhas (≡)** → **Configurações** → **Geral** → **Tema Escuro**
+    🧭 **Safari:** Menu **Safari** → **Preferências** → **Aparência** → **Escuro**
+    """)
+    
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        # Container principal com glassmorphism
+        st.markdown("""
+        <div class="login-container">
+            <h1 class="login-title">🏆 AURUM</h1>
+            <p class="login-subtitle">Dashboard Starter</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        
+        # Informações da versão
+        st.markdown("""
+        <div class="version-info">
+            🚀 Versão Starter | v1.0.0
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # Aviso sobre dados fictícios
+        st.warning("""
+        **⚠️ IMPORTANTE:** Este é um dashboard de demonstração. Todos os dados apresentados são **FICTÍCIOS** e gerados automaticamente para fins de apresentação.
+        """)
+        
+        # Credenciais visíveis
+        st.info("""
+        **🔑 Credenciais de Acesso Demo:**
+        
+        👤 **Usuário:** `aurum`
+        🔐 **Senha:** `aurum`
+        
+        *Basta clicar em "ENTRAR" - os campos já estão preenchidos*
+        """)
+        
+        with st.form("login_form"):
+            username = st.text_input("👤 Usuário", placeholder="Digite: aurum", value="aurum")
+            password = st.text_input("🔐 Senha", type="password", placeholder="Digite: aurum", value="aurum")
+            
+            submitted = st.form_submit_button("🚀 ENTRAR NO DASHBOARD", use_container_width=True, type="primary")
+            
+            if submitted:
+                if username == "aurum" and password == "aurum":
+                    st.session_state.logged_in = True
+                    st.session_state.user = username
+                    st.session_state.login_started = time.perf_counter()
+                    st.session_state.show_balloons = True
+                    flash("✨ Login realizado com sucesso!", "🏆")
+                    st.rerun()
+                else:
+                    st.error("❌ Credenciais inválidas! Use: **aurum** / **aurum**")
         
-        .stSelectbox > div > div > div {{
-            background: linear-gradient(135deg, rgba(255, 255, 255, 0.2) 0%, rgba(99, 102, 241, 0.1) 100%);
-            border: 1px solid rgba(99, 102, 241, 0.4);
-            backdrop-filter: blur(10px);
-            color: {colors['primary']};
-        }}
+        # Call to action no final
+        st.markdown("---")
+        st.markdown("""
+        <div style="text-align: center; color: white; padding: 20px;">
+            <h3>🚀</h3>
+            <p>Starter <strong>AURUM</strong></p>
+        </div>
+        """, unsafe_allow_html=True)
+
+def create_kpi_card(title, value, delta, delta_label, icon):
+    colors = get_theme_colors()
+    
+    # Cor do título específica para temas pastel e glass
+    if st.session_state.theme in ['pastel', 'glass']:
+        title_color = "#FFFFFF"
+        title_shadow = "2px 2px 4px rgba(0,0,0,0.8)"
+    else:
+        title_color = colors['text']
+        title_shadow = "1px 1px 2px rgba(0,0,0,0.3)"
+    
+    st.markdown(f"""
+    <div class="metric-card">
+        <div style="display: flex; align-items: center; margin-bottom: 10px;">
+            <span style="font-size: 1.5rem; margin-right: 10px;">{icon}</span>
+            <span style="font-size: 0.9rem; color: {title_color}; font-weight: bold; text-shadow: {title_shadow};">{title}</span>
+        </div>
+        <div style="font-size: 2rem; font-weight: bold; margin: 10px 0; color: #FFFFFF; text-shadow: 2px 2px 4px rgba(0,0,0,0.5);">{value}</div>
+        <div style="color: {'#00FF00' if delta >= 0 else '#FF4500'}; font-size: 0.9rem; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">
+            {'📈' if delta >= 0 else '📉'} {delta:+.1f}% {delta_label}
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+def render_leaderboard(ranking):
+    """HTML do placar inteiro em uma única string; cores e barras são calculadas por coluna"""
+    performance = ranking['performance'].to_numpy()
+    classe = np.select([performance >= 100, performance >= 80], ['perf-alta', 'perf-media'], 'perf-baixa')
+    largura = np.clip(performance, 0, 100)
+    diferenca = ranking['vendas'].to_numpy() - ranking['meta'].to_numpy()
+    
+    linhas = [
+        f'<tr><td>#{posicao}</td>'
+        f'<td><span class="avatar">{nome[0]}</span>{nome}<div class="regiao">📍 {regiao}</div></td>'
+        f'<td>R$ {vendas:,.0f}</td><td>R$ {meta:,.0f}</td><td>{"▲" if diff > 0 else "▼"} R$ {abs(diff):,.0f}</td>'
+        f'<td class="{cls}">{perf:.1f}%<div class="barra"><div style="width:{w:.0f}%"></div></div></td></tr>'
+        for posicao, nome, regiao, vendas, meta, diff, perf, cls, w in zip(
+            ranking['posicao'], ranking['nome'], ranking['regiao'], ranking['vendas'], ranking['meta'],
+            diferenca, performance, classe, largura)
+    ]
+    return ('<table class="leaderboard"><thead><tr><th>#</th><th>Vendedor</th><th>💰 Vendas</th><th>🎯 Meta</th>'
+            '<th>📊 Diferença</th><th>Performance</th></tr></thead><tbody>' + ''.join(linhas) + '</tbody></table>')
+
+def render_transaction_feed(transacoes):
+    """HTML dos cartões de uma página do feed, em um único bloco"""
+    status_icon = {"Concluída": "✅", "Pendente": "⏳", "Processando": "🔄"}
+    status_class = {"Concluída": "concluida", "Pendente": "pendente", "Processando": "processando"}
+    clientes = transacoes['cliente'].astype(str)
+    clientes = clientes.str.slice(0, 25) + np.where(clientes.str.len() > 25, '...', '')
+    
+    cartoes = [
+        f'<div class="feed-card"><div class="status {status_class[status]}"><span>{status_icon[status]}</span>{status}</div>'
+        f'<div class="cliente">{cliente}</div><div class="produto">📦 {produto}</div>'
+        f'<div class="valor">💰 R$ {valor:,.0f}</div><div class="data">📅 {data}</div></div>'
+        for status, cliente, produto, valor, data in zip(
+            transacoes['status'], clientes, transacoes['produto'], transacoes['valor'],
+            transacoes['data'].dt.strftime('%d/%m/%Y'))
+    ]
+    return '<div class="feed">' + ''.join(cartoes) + '</div>'
+
+def create_transaction_feed(transacoes, posicoes, pagina=1, por_pagina=FEED_PAGE_SIZE):
+    """Feed paginado: só as linhas da página são lidas da tabela e serializadas"""
+    inicio = (pagina - 1) * por_pagina
+    st.markdown(render_transaction_feed(transacoes.take(posicoes[inicio:inicio + por_pagina])), unsafe_allow_html=True)
+
+def create_leaderboard(ranking, pagina=1, por_pagina=LEADERBOARD_PAGE_SIZE):
+    """Placar paginado: só a página visível é serializada, em um único elemento"""
+    inicio = (pagina - 1) * por_pagina
+    st.markdown(render_leaderboard(ranking.iloc[inicio:inicio + por_pagina]), unsafe_allow_html=True)
+
+@st.cache_resource
+def get_figure_cache():
+    """Cache LRU (por processo) de figuras Plotly já serializadas em JSON"""
+    return {'figuras': OrderedDict(), 'lock': threading.Lock(), 'hits': 0, 'misses': 0}
+
+def fingerprint_frame(data):
+    """Hash estável do conteúdo de um DataFrame (None para gráficos sem dados de entrada)"""
+    if data is None:
+        return None
+    hashes = pd.util.hash_pandas_object(data, index=True).values
+    return hashlib.blake2b(hashes.tobytes(), digest_size=16).hexdigest()
+
+def create_chart(chart_type, data, title):
+    """Retorna a figura do cache quando o mesmo gráfico já foi montado com os mesmos dados e tema"""
+    return pio.from_json(get_chart_json(chart_type, data, title, st.session_state.theme, get_figure_cache()))
+
+def get_chart_json(chart_type, data, title, theme, cache):
+    """JSON da figura, montado só na falta; não depende da sessão e pode rodar em segundo plano"""
+    chave = (chart_type, fingerprint_frame(data), title, theme)
+    
+    with cache['lock']:
+        fig_json = cache['figuras'].get(chave)
+        if fig_json is not None:
+            cache['figuras'].move_to_end(chave)
+            cache['hits'] += 1
+    
+    if fig_json is None:
+        fig_json = build_chart(chart_type, data, title, THEMES[theme]).to_json()
+        with cache['lock']:
+            cache['misses'] += 1
+            cache['figuras'][chave] = fig_json
+            while len(cache['figuras']) > FIGURE_CACHE_MAX:
+                cache['figuras'].popitem(last=False)
+    
+    return fig_json
+
+def build_chart(chart_type, data, title, colors):
+    
+    if chart_type == 'line':
+        fig = px.line(data, x='data', y='vendas', title=title)
+        fig.add_scatter(x=data['data'], y=data['meta'], mode='lines', name='Meta', line=dict(dash='dash'))
+        fig.update_traces(line=dict(color=colors['primary'], width=3))
         
-        /* Estilo menu navegação - Glass */
-        .nav-link {{
-            background: linear-gradient(135deg, rgba(255, 255, 255, 0.25) 0%, rgba(99, 102, 241, 0.15) 100%) !important;
-            border: 2px solid rgba(99, 102, 241, 0.4) !important;
-            border-radius: 15px !important;
-            color: {colors['primary']} !important;
-            font-weight: bold !important;
-            transition: all 0.3s ease !important;
-            backdrop-filter: blur(20px) !important;
-            box-shadow: 0 8px 25px rgba(99, 102, 241, 0.15) !important;
-        }}
+        if 'previsao' in data:
+            # Banda de confiança (preenchida entre os limites) e linha da projeção
+            r, g, b = (int(colors['accent'][i:i + 2], 16) for i in (1, 3, 5))
+            fig.add_scatter(x=data['data'], y=data['superior'], mode='lines', line=dict(width=0),
+                            showlegend=False, hoverinfo='skip')
+            fig.add_scatter(x=data['data'], y=data['inferior'], mode='lines', line=dict(width=0),
+                            fill='tonexty', fillcolor=f'rgba({r}, {g}, {b}, 0.2)', name='Intervalo 95%')
+            fig.add_scatter(x=data['data'], y=data['previsao'], mode='lines', name='Projeção',
+                            line=dict(color=colors['accent'], width=3, dash='dot'))
         
-        .nav-link:hover {{
-            transform: translateY(-4px) scale(1.06) !important;
-            background: linear-gradient(135deg, rgba(255, 255, 255, 0.4) 0%, rgba(99, 102, 241, 0.25) 100%) !important;
-            box-shadow: 0 12px 35px rgba(99, 102, 241, 0.3) !important;
-            border-color: rgba(99, 102, 241, 0.6) !important;
-        }}
+    elif chart_type == 'bar':
+        fig = go.Figure(data=[
+            go.Bar(x=data['produto'], y=data['vendas'], 
+                  marker=dict(color=colors['gradients'][:len(data)]))
+        ])
+        fig.update_layout(title=title)
         
-        .nav-link-selected {{
-            background: linear-gradient(135deg, rgba(99, 102, 241, 0.3) 0%, rgba(139, 92, 246, 0.25) 100%) !important;
-            border: 2px solid {colors['accent']} !important;
-            box-shadow: 0 15px 40px rgba(99, 102, 241, 0.4) !important;
-            animation: pulse-glass 2s infinite !important;
-        }}
-        </style>
-        """
-    else:  # pastel
-        css = f"""
-        <style>
-        .main {{
-            background: linear-gradient(135deg, {colors['background']} 0%, #F0F8FF 100%);
-        }}
+    elif chart_type == 'funnel':
+        fig = go.Figure(go.Funnel(y=data['Etapa'], x=data['Quantidade'], textinfo='value+percent previous',
+                                  marker=dict(color=colors['gradients'][:len(data)])))
+        fig.update_layout(title=title)
         
-        /* Títulos sempre visíveis - Pastel */
-        .section-header, h3, .stMarkdown h3 {{
-            color: {colors['primary']} !important;
-            font-weight: bold !important;
-            text-shadow: 1px 1px 2px rgba(255,255,255,0.8) !important;
-        }}
+    elif chart_type == 'heatmap':
+        fig = go.Figure(go.Heatmap(z=data.values, x=data.columns, y=data.index, texttemplate="%{z:,.0f}",
+                                   colorscale=[[0, colors['background']], [1, colors['primary']]], hoverongaps=False))
+        fig.update_layout(title=title, yaxis=dict(autorange='reversed', type='category'))
         
-        /* AURUM sempre dourado */
-        h1, .stMarkdown h1, h2, .stMarkdown h2 {{
-            color: #DAA520 !important;
-            font-weight: bold !important;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3) !important;
-        }}
+    elif chart_type == 'pie':
+        fig = px.pie(values=data['vendas'], names=data['regiao'], title=title, 
+                     color_discrete_sequence=colors['gradients'])
         
-        /* Força cor dourada para qualquer texto AURUM */
-        *:contains("AURUM"), [data-testid="stMarkdownContainer"] h1,
-        [data-testid="stMarkdownContainer"] h2 {{
-            color: #DAA520 !important;
-        }}
+    elif chart_type == 'gauge':
+        percentual = data['realizado'].iloc[0] / data['meta'].iloc[0] * 100 if data['meta'].iloc[0] else 0
+        fig = go.Figure(go.Indicator(
+            mode = "gauge+number+delta",
+            value = percentual,
+            domain = {'x': [0, 1], 'y': [0, 1]},
+            title = {'text': title},
+            delta = {'reference': 100},
+            gauge = {
+                'axis': {'range': [None, max(100, percentual)]},
+                'bar': {'color': colors['primary']},
+                'steps': [
+                    {'range': [0, 50], 'color': "lightgray"},
+                    {'range': [50, 80], 'color': colors['secondary']},
+                    {'range': [80, 100], 'color': colors['accent']}],
+                'threshold': {
+                    'line': {'color': "red", 'width': 4},
+                    'thickness': 0.75,
+                    'value': 90}}))
+    
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors['text'])
+    )
+    
+    return fig
+
+def show_mandatory_dark_mode_guide():
+    """Mostra guia obrigatório de modo escuro com botão para ocultar"""
+    if not st.session_state.hide_tutorial:
+        st.error("""
+        🌟 **EXPERIÊNCIA STARTER COMPLETA** 🌟
         
-        /* Sidebar Pastel */
-        .css-1d391kg {{
-            background: linear-gradient(180deg, rgba(248, 248, 255, 0.9) 0%, rgba(240, 248, 255, 0.85) 100%);
-            border-right: 3px solid {colors['primary']};
-            box-shadow: 5px 0 20px rgba(135, 206, 235, 0.3);
-            backdrop-filter: blur(5px);
-        }}
+        **Para aproveitar 100% dos efeitos visuais, ative o MODO ESCURO do seu navegador:**
         
-        .css-1d391kg h1 {{
-            color: #DAA520 !important;
-        }}
+        🌙 **Chrome/Edge:** Clique nas **3 bolinhas (⋮)** no canto superior direito → **Configurações** → **Aparência** → **Tema Escuro**
         
-        .css-1d391kg h2 {{
-            color: #DAA520 !important;
-        }}
+        🦊 **Firefox:** Clique nas **3 linhas (≡)** no canto superior direito → **Configurações** → **Geral** → **Tema Escuro**
         
-        .css-1d391kg h3 {{
-            color: {colors['primary']} !important;
-        }}
+        🧭 **Safari:** Menu **Safari** → **Preferências** → **Aparência** → **Escuro**
         
-        .css-1d391kg .stSelectbox label {{
-            color: #FFFFFF !important;
-            font-weight: bold !important;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.8) !important;
-        }}
+        ✨ **Os temas NEON LED e GLASS ficam ESPETACULARES no modo escuro!** ✨
+        """)
         
-        .css-1d391kg .stSelectbox > div > div {{
-            background: linear-gradient(135deg, rgba(135, 206, 235, 0.15) 0%, rgba(152, 251, 152, 0.15) 100%);
-            border: 2px solid {colors['primary']};
-            border-radius: 12px;
-            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.2);
-        }}
+        st.warning("""
+        💡 **DICA STARTER:** Após ativar o modo escuro, teste os 3 temas no sidebar e veja a diferença impressionante nos efeitos visuais!
+        """)
         
-        .css-1d391kg .stButton > button {{
-            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
-            border: none;
-            border-radius: 12px;
-            color: white;
-            font-weight: bold;
-            padding: 12px 24px;
-            transition: all 0.3s ease;
-            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4);
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-        }}
+        # Botão para ocultar o tutorial
+        col1, col2, col3 = st.columns([2, 1, 2])
+        with col2:
+            if st.button("✅ Entendi, não mostrar mais", type="primary", use_container_width=True):
+                st.session_state.hide_tutorial = True
+                st.success("✨ Tutorial ocultado! Você pode reativá-lo no sidebar.")
+                st.rerun()
+
+def create_premium_sidebar():
+    """Cria um sidebar premium e estiloso com controles principais"""
+    colors = get_theme_colors()
+    
+    with st.sidebar:
+        # Logo e título no sidebar
+        st.markdown(f"""
+        <div style="text-align: center; padding: 20px 0; margin-bottom: 30px;">
+            <h1 style="color: #DAA520; font-size: 2.5rem; margin: 0;">🏆</h1>
+            <h2 style="color: #DAA520 !important; font-size: 1.5rem; margin: 5px 0; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">AURUM</h2>
+            <p style="color: {colors['text']}; opacity: 0.8; margin: 0;">Dashboard Starter</p>
+        </div>
+        """, unsafe_allow_html=True)
         
-        .css-1d391kg .stButton > button:hover {{
-            transform: translateY(-4px) scale(1.05);
-            box-shadow: 0 10px 30px rgba(135, 206, 235, 0.6);
-            background: linear-gradient(135deg, {colors['accent']} 0%, {colors['primary']} 100%);
-        }}
+        st.markdown("---")
         
-        .css-1d391kg .stButton > button:active {{
-            transform: translateY(-2px) scale(1.02);
-        }}
+        # Seletor de tema premium
+        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>🎨 Personalização</h3>", unsafe_allow_html=True)
         
-        .metric-card {{
-            background: linear-gradient(135deg, rgba(135, 206, 235, 0.15) 0%, rgba(152, 251, 152, 0.15) 100%);
-            border: 2px solid {colors['primary']};
-            border-radius: 15px;
-            padding: 20px;
-            box-shadow: 0 4px 15px rgba(135, 206, 235, 0.3);
-            color: #ffffff;
-            font-weight: 700;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-        }}
-        .section-header {{
-            color: {colors['primary']};
-            font-weight: bold;
-        }}
-        .vendedor-card {{
-            background: linear-gradient(135deg, rgba(135, 206, 235, 0.12) 0%, rgba(152, 251, 152, 0.12) 100%);
-            border: 2px solid {colors['accent']};
-            border-radius: 15px;
-            padding: 20px;
-            margin: 10px 0;
-            box-shadow: 0 4px 15px rgba(152, 251, 152, 0.25);
-            color: #ffffff;
-            font-weight: 600;
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-        }}
+        theme_names = {'pastel': '🎨 Pastel Sofisticado', 'neon': '💡 Neon LED Vibrante', 'glass': '🔮 Glass Futurista'}
+        selected_theme = st.selectbox(
+            "Selecione o tema:", 
+            options=['pastel', 'neon', 'glass'],
+            format_func=lambda x: theme_names[x],
+            key="theme_selector"
+        )
+        if selected_theme != st.session_state.theme:
+            st.session_state.theme = selected_theme
+            st.rerun()
         
-        /* Botões premium gerais - Pastel */
-        .stButton > button {{
-            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%);
-            border: none;
-            border-radius: 12px;
-            color: white;
-            font-weight: bold;
-            padding: 12px 24px;
-            transition: all 0.4s cubic-bezier(0.68, -0.55, 0.265, 1.55);
-            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4);
-            text-shadow: 1px 1px 2px rgba(0,0,0,0.3);
-            position: relative;
-            overflow: hidden;
-        }}
+        st.markdown("<br>", unsafe_allow_html=True)
         
-        .stButton > button:before {{
-            content: '';
-            position: absolute;
-            top: 0;
-            left: -100%;
-            width: 100%;
-            height: 100%;
-            background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.4), transparent);
-            transition: left 0.5s ease;
-        }}
+        # Informações do usuário
+        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>👤 Usuário</h3>", unsafe_allow_html=True)
+        st.markdown(f"**Bem-vindo:** {st.session_state.user}")
+        st.markdown(f"**Sessão ativa desde:** {datetime.now().strftime('%H:%M')}")
+        st.markdown(f"**Última sync:** {get_store()['atualizado_em'].strftime('%d/%m/%Y %H:%M')}")
         
-        .stButton > button:hover:before {{
-            left: 100%;
-        }}
+        st.markdown("<br>", unsafe_allow_html=True)
         
-        .stButton > button:hover {{
-            transform: translateY(-6px) scale(1.1);
-            box-shadow: 0 12px 35px rgba(135, 206, 235, 0.6);
-            background: linear-gradient(135deg, {colors['accent']} 0%, {colors['primary']} 100%);
-        }}
+        # Status do sistema
+        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>⚡ Status Sistema</h3>", unsafe_allow_html=True)
         
-        .stButton > button:active {{
-            transform: translateY(-3px) scale(1.05);
-            transition: all 0.1s ease;
-        }}
+        col1, col2 = st.columns(2)
+        with col1:
+            st.metric("🚀 Performance", "98%", "2%")
+        with col2:
+            st.metric("📡 Conexão", "Ativo", "0ms")
         
-        /* Animações extras premium - Pastel */
-        @keyframes pulse-pastel {{
-            0% {{ box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4); }}
-            50% {{ box-shadow: 0 10px 30px rgba(135, 206, 235, 0.7); }}
-            100% {{ box-shadow: 0 6px 20px rgba(135, 206, 235, 0.4); }}
-        }}
+        figure_cache = get_figure_cache()
+        st.caption(f"🧩 Cache de gráficos: {figure_cache['hits']} hits / {figure_cache['misses']} misses "
+                   f"({len(figure_cache['figuras'])}/{FIGURE_CACHE_MAX})")
+        if 'login_paint_ms' in st.session_state:
+            st.caption(f"⏱️ Login → dashboard: {st.session_state.login_paint_ms:.0f} ms "
+                       f"(orçamento {LOGIN_PAINT_BUDGET_MS} ms)")
         
-        .stButton > button[data-testid="primary-button"] {{
-            animation: pulse-pastel 2s infinite;
-        }}
+        st.markdown("<br>", unsafe_allow_html=True)
         
-        .stSelectbox > div > div > div {{
-            background: linear-gradient(135deg, rgba(135, 206, 235, 0.1) 0%, rgba(152, 251, 152, 0.1) 100%);
-            border: 2px solid {colors['primary']};
-            color: {colors['text']};
-        }}
+        # Actions premium
+        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>⚡ Ações Rápidas</h3>", unsafe_allow_html=True)
         
-        .stMultiSelect > div > div > div {{
-            background: linear-gradient(135deg, rgba(135, 206, 235, 0.1) 0%, rgba(152, 251, 152, 0.1) 100%);
-            border: 1px solid {colors['secondary']};
-            border-radius: 8px;
-        }}
+        if st.button("📊 Atualizar Dados", use_container_width=True):
+            novas = ingest_new_transactions()
+            flash(f"✨ {novas} novas transações incorporadas!", "📊")
+            st.rerun()
         
-        /* Filtros com texto branco - Pastel */
-        .stSelectbox label, .stMultiSelect label {{
-            color: #FFFFFF !important;
-            font-weight: bold !important;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.8) !important;
-        }}
+        if st.button("♻️ Recarregar Base", use_container_width=True):
+            invalidate_dataset()
+            st.rerun()
         
-        .stSelectbox > div > div > div, .stMultiSelect > div > div {{
-            color: #FFFFFF !important;
-            font-weight: bold !important;
-        }}
+        with st.expander("📁 Exportar Relatório"):
+            visao = st.selectbox("Conteúdo:", list(VISOES_EXPORTACAO), format_func=VISOES_EXPORTACAO.get)
+            formato = st.selectbox("Formato:", list(FORMATOS_EXPORTACAO))
+            filtros = get_export_filters()
+            if visao != 'vendas_mensais':
+                st.caption(f"Filtros da aba Vendas: {filtros['periodo']} · {', '.join(filtros['regioes'])} · {filtros['produto']}")
+            
+            # O botão de download só aparece no run que gerou o arquivo: o Streamlit lê o arquivo
+            # inteiro para a memória a cada run em que o botão é renderizado. Gerar de novo a mesma
+            # assinatura só reabre o arquivo em cache no disco.
+            exportacao = None
+            if st.button("📤 Gerar arquivo", use_container_width=True):
+                try:
+                    with st.spinner("Gerando relatório..."):
+                        exportacao = export_report(get_store(), visao, formato, filtros)
+                except ValueError as erro:
+                    st.error(str(erro))
+            
+            if exportacao is not None:
+                with open(exportacao, 'rb') as arquivo:
+                    st.download_button(f"⬇️ Baixar {exportacao.suffix[1:].upper()}", arquivo, file_name=exportacao.name,
+                                       mime=dict(FORMATOS_EXPORTACAO.values())[exportacao.suffix[1:]],
+                                       on_click='ignore', use_container_width=True)
+            
+        with st.expander("📧 Enviar por Email"):
+            destinatario = st.text_input("Destinatário:", placeholder="nome@empresa.com")
+            st.caption(f"Envia {VISOES_EXPORTACAO[visao][2:].lower()} em {formato}, como configurado em Exportar Relatório.")
+            if st.button("📬 Enviar relatório", use_container_width=True):
+                if not re.fullmatch(r"[^@\s]+@[^@\s]+\.[^@\s]+", destinatario.strip()):
+                    st.error("Informe um email válido.")
+                else:
+                    job_id = submit_email_report(destinatario.strip(), visao, formato, filtros)
+                    if job_id is None:
+                        st.warning("⏳ Muitos envios em andamento; tente novamente em instantes.")
+                    else:
+                        st.session_state.setdefault('email_jobs', []).append(job_id)
+            
+            pendentes = any(job['status'] not in ('Enviado', 'Falhou')
+                            for job in get_email_jobs(st.session_state.get('email_jobs', [])))
+            st.fragment(show_email_jobs, run_every=2 if pendentes else None)()
         
-        /* Estilo menu navegação - Pastel */
-        .nav-link {{
-            background: linear-gradient(135deg, rgba(135, 206, 235, 0.2) 0%, rgba(152, 251, 152, 0.15) 100%) !important;
-            border: 3px solid {colors['primary']} !important;
-            border-radius: 12px !important;
-            color: {colors['primary']} !important;
-            font-weight: bold !important;
-            transition: all 0.4s cubic-bezier(0.68, -0.55, 0.265, 1.55) !important;
-            box-shadow: 0 6px 20px rgba(135, 206, 235, 0.3) !important;
-        }}
+        # Botão para reativar tutorial se estiver oculto
+        if st.session_state.hide_tutorial:
+            if st.button("💡 Mostrar Tutorial Modo Escuro", use_container_width=True):
+                st.session_state.hide_tutorial = False
+                st.rerun()
+            
+        st.markdown("<br>", unsafe_allow_html=True)
         
-        .nav-link:hover {{
-            transform: translateY(-5px) scale(1.08) !important;
-            background: linear-gradient(135deg, {colors['accent']} 0%, {colors['secondary']} 100%) !important;
-            box-shadow: 0 10px 30px rgba(135, 206, 235, 0.5) !important;
-            border-color: {colors['accent']} !important;
-            color: white !important;
-        }}
+        # Logout button premium
+        st.markdown("---")
+        if st.button("🚪 Logout", use_container_width=True, type="secondary"):
+            st.session_state.logged_in = False
+            st.rerun()
         
-        .nav-link-selected {{
-            background: linear-gradient(135deg, {colors['primary']} 0%, {colors['secondary']} 100%) !important;
-            border: 3px solid {colors['accent']} !important;
-            color: white !important;
-            box-shadow: 0 8px 25px rgba(135, 206, 235, 0.6) !important;
-            animation: pulse-pastel 1.8s infinite !important;
-        }}
-        </style>
-        """
+        # Footer do sidebar
+        st.markdown("<br><br>", unsafe_allow_html=True)
+        st.markdown(f"""
+        <div style="text-align: center; opacity: 0.7; font-size: 0.8rem;">
+            <p style="color: {colors['text']};">🚀 Aurum Starter</p>
+            <p style="color: {colors['text']};">v1.0.0 | 2024</p>
+        </div>
+        """, unsafe_allow_html=True)
+
+def flash(mensagem, icone):
+    """Agenda um aviso para a próxima renderização, sem bloquear a execução atual"""
+    st.session_state.setdefault('flash', []).append((mensagem, icone))
+
+def show_flash_messages():
+    """Exibe uma única vez os avisos agendados na execução anterior"""
+    for mensagem, icone in st.session_state.pop('flash', []):
+        st.toast(mensagem, icon=icone)
+    if st.session_state.pop('show_balloons', False):
+        st.balloons()
+
+def record_login_paint():
+    """Mede o tempo entre o login e o fim da primeira renderização do dashboard"""
+    inicio = st.session_state.pop('login_started', None)
+    if inicio is None:
+        return
+    st.session_state.login_paint_ms = (time.perf_counter() - inicio) * 1000
+    if st.session_state.login_paint_ms > LOGIN_PAINT_BUDGET_MS:
+        logger.warning("Login → dashboard em %.0f ms (orçamento: %d ms)",
+                       st.session_state.login_paint_ms, LOGIN_PAINT_BUDGET_MS)
+
+def overview_figures(store):
+    """Gráficos do Overview como (tipo, dados, título), a mesma chave usada pelo cache de figuras"""
+    kpis = get_table(store, 'kpis')
+    rollup = get_table(store, 'rollup')
+    return {
+        'linha': ('line', build_forecast_frame(store, 12), '📈 Evolução e Projeção de Vendas Aurum (12 meses)'),
+        'meta': ('gauge', pd.DataFrame({'realizado': [kpis['realizado_mes']], 'meta': [kpis['meta_mes']]}), '🎯 Meta vs Realizado'),
+        'produtos': ('bar', rollup_by(rollup, 'produto', meses=12), '🏆 Top 5 Produtos Aurum'),
+        'regioes': ('pie', rollup_by(rollup, 'regiao', meses=12), '🗺️ Distribuição por Região'),
+    }
+
+def vendas_figures(store):
+    """Gráficos da aba de Vendas como (tipo, dados, título)"""
+    return {
+        'produtos': ('bar', rollup_by(get_table(store, 'rollup'), 'produto', meses=1), '📊 Performance por Produto'),
+        'evolucao': ('line', build_forecast_frame(store, 6), '📈 Evolução Vendas (6 meses) e Projeção'),
+    }
+
+def render_overview(store):
+    st.markdown("<h2 class='section-header'>📊 Visão Geral Executiva</h2>", unsafe_allow_html=True)
+    
+    kpis = get_table(store, 'kpis')
+    
+    # KPIs
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        create_kpi_card("Receita Total", format_brl(kpis['receita_12m']), kpis['receita_12m_delta'], "vs 12 meses anteriores", "💰")
+    
+    with col2:
+        create_kpi_card("Vendas do Mês", format_int(kpis['vendas_mes']), kpis['vendas_mes_delta'], "vs mês anterior", "📈")
+    
+    with col3:
+        create_kpi_card("Clientes Ativos", format_int(kpis['clientes_ativos']), kpis['clientes_ativos_delta'], "vs mês anterior", "👥")
+    
+    with col4:
+        create_kpi_card("Ticket Médio", format_brl(kpis['ticket_medio']), kpis['ticket_medio_delta'], "vs mês anterior", "🎯")
+    
+    with col5:
+        create_kpi_card("Taxa Conversão", f"{kpis['conversao_mes']:.1f}%", kpis['conversao_mes_delta'], "p.p. vs mês anterior", "⚡")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Gráficos principais
+    figuras = overview_figures(store)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.plotly_chart(create_chart(*figuras['linha']), use_container_width=True)
+        st.plotly_chart(create_chart(*figuras['meta']), use_container_width=True)
+    
+    with col2:
+        st.plotly_chart(create_chart(*figuras['produtos']), use_container_width=True)
+        st.plotly_chart(create_chart(*figuras['regioes']), use_container_width=True)
+
+def render_vendas(store):
+    st.markdown("<h2 class='section-header'>💰 Análise de Vendas Detalhada</h2>", unsafe_allow_html=True)
+    
+    kpis = get_table(store, 'kpis')
+    
+    # KPIs específicos de vendas
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        create_kpi_card("Meta Mensal", format_brl(kpis['meta_mes']), kpis['meta_mes_delta'], "vs mês anterior", "🎯")
+    
+    with col2:
+        create_kpi_card("Realizado", format_brl(kpis['realizado_mes']), kpis['realizado_vs_meta'], "vs meta", "🚀")
+    
+    with col3:
+        create_kpi_card("Pipeline", format_brl(kpis['pipeline']), kpis['pipeline_delta'], "vs mês anterior", "⏳")
+    
+    with col4:
+        create_kpi_card("Conversão", f"{kpis['conversao_trimestre']:.1f}%", kpis['conversao_trimestre_delta'], "p.p. vs trimestre anterior", "⚡")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Gráficos de vendas
+    figuras = vendas_figures(store)
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Gráfico de performance por produto
+        st.plotly_chart(create_chart(*figuras['produtos']), use_container_width=True)
+    
+    with col2:
+        # Gráfico de evolução de vendas
+        st.plotly_chart(create_chart(*figuras['evolucao']), use_container_width=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Filtros para o Hall da Fama
+    st.markdown("<h3 class='section-header'>🔍 Filtros Hall da Fama</h3>", unsafe_allow_html=True)
+    
+    col_filtro1, col_filtro2, col_filtro3 = st.columns(3)
+    
+    with col_filtro1:
+        periodo = st.selectbox(
+            "📅 Período:",
+            ["Hoje", "Esta Semana", "Este Mês", "Últimos 3 Meses", "Este Ano"],
+            index=2,
+            key="filtro_periodo"
+        )
+    
+    with col_filtro2:
+        regiao = st.multiselect(
+            "🌍 Região:",
+            list(get_dimension(store, 'regioes')) + ["Todos"],
+            default=["Todos"],
+            key="filtro_regiao"
+        )
+    
+    with col_filtro3:
+        produto_filtro = st.selectbox(
+            "📦 Produto:",
+            ["Todos"] + list(get_dimension(store, 'produtos')),
+            index=0,
+            key="filtro_produto"
+        )
+    
+    indice = get_table(store, 'indice')
+    posicoes = filter_transactions(indice, periodo, regiao, produto_filtro)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Top Vendedores com cards visuais impressionantes
+    st.markdown("<h3 class='section-header'>🏆 Hall da Fama - Top Vendedores</h3>", unsafe_allow_html=True)
+    
+    col_top, col_pagina = st.columns([1, 3])
+    
+    with col_top:
+        top_n = st.selectbox("🏅 Exibir:", ["Top 5", "Top 10", "Top 50", "Top 200", "Todos"], index=0)
+    
+    n = None if top_n == "Todos" else int(top_n.split()[1])
+    top_vendedores = get_top_vendedores(indice, posicoes, get_table(store, 'vendedores'), periodo, n=n)
+    
+    if top_vendedores.empty:
+        st.info("Nenhuma venda encontrada para os filtros selecionados.")
+    else:
+        paginas = -(-len(top_vendedores) // LEADERBOARD_PAGE_SIZE)
+        pagina = 1
+        if paginas > 1:
+            with col_pagina:
+                pagina = st.number_input(f"📄 Página (de {paginas}):", min_value=1, max_value=paginas, value=1)
+        create_leaderboard(top_vendedores, pagina)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Últimas Transações com cards visuais
+    st.markdown("<h3 class='section-header'>💳 Últimas Transações VIP</h3>", unsafe_allow_html=True)
+    
+    col_ordem, col_status, col_pagina = st.columns(3)
+    
+    with col_ordem:
+        ordenacao = st.selectbox("↕️ Ordenar por:", ["Mais recentes", "Maior valor"], index=0)
+    
+    with col_status:
+        status_filtro = st.selectbox("🏷️ Status:", ["Todos"] + list(get_dimension(store, 'status')), index=0)
+    
+    # A ordem filtrada é montada uma vez por combinação de filtros; trocar de página só fatia.
+    # O diretório entra na chave: a virada do dia abre outro dataset com a mesma versão e revisão
+    chave_feed = (str(store['diretorio']), store['versao'], store['revisao'], periodo, tuple(regiao), produto_filtro, status_filtro, ordenacao)
+    feed = st.session_state.get('feed')
+    if feed is None or feed['chave'] != chave_feed:
+        feed = st.session_state.feed = {
+            'chave': chave_feed,
+            'posicoes': query_transaction_feed(indice, posicoes, None if status_filtro == "Todos" else status_filtro,
+                                               'data' if ordenacao == "Mais recentes" else 'valor'),
+        }
+    
+    if len(feed['posicoes']) == 0:
+        st.info("Nenhuma transação encontrada para os filtros selecionados.")
+    else:
+        paginas = -(-len(feed['posicoes']) // FEED_PAGE_SIZE)
+        with col_pagina:
+            pagina = st.number_input(f"📄 Página (de {format_int(paginas)}):", min_value=1, max_value=paginas, value=1)
+        create_transaction_feed(indice['transacoes'], feed['posicoes'], pagina)
+
+def render_clientes(store):
+    st.markdown("<h2 class='section-header'>👥 Análise de Clientes & Marketing</h2>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    kpis = get_table(store, 'kpis_clientes')
+    
+    with col1:
+        create_kpi_card("Novos Clientes", format_int(kpis['novos']), kpis['novos_delta'], "vs mês anterior", "👤")
+    
+    with col2:
+        create_kpi_card("Taxa Retenção", f"{kpis['retencao']:.1f}%", kpis['retencao_delta'], "p.p. vs mês anterior", "🔄")
+    
+    with col3:
+        create_kpi_card("LTV Médio", format_brl(kpis['ltv']), kpis['ltv_delta'], "vs trimestre", "💎")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Heatmap das coortes de aquisição (linhas) por meses de vida (colunas)
+    st.subheader("🧬 Coortes de Clientes")
+    
+    metrica = st.radio("Métrica das coortes:", ["Retenção (%)", "LTV acumulado (R$)"], horizontal=True,
+                       label_visibility="collapsed")
+    if metrica == "Retenção (%)":
+        dados, titulo = kpis['retencao_coortes'], "Retenção por coorte de aquisição (%)"
+    else:
+        dados, titulo = kpis['ltv_coortes'], "LTV acumulado por cliente, por coorte de aquisição (R$)"
+    st.plotly_chart(create_chart('heatmap', dados.set_axis(dados.index.strftime('%m/%Y')), titulo),
+                    use_container_width=True)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    # Funil de vendas calculado a partir do log de eventos dos prospects
+    st.subheader("🎯 Funil de Conversão Aurum")
+    
+    funil = get_table(store, 'funil')
+    primeiro_dia, ultimo_dia = get_funnel_period(funil)
+    col_datas, col_coortes = st.columns(2)
+    
+    with col_datas:
+        datas = st.date_input("📅 Período dos eventos:", value=(primeiro_dia, ultimo_dia),
+                              min_value=primeiro_dia, max_value=ultimo_dia, format="DD/MM/YYYY")
+    
+    with col_coortes:
+        coortes = st.multiselect("🧩 Coortes (mês da 1ª visita):", pd.period_range(primeiro_dia, ultimo_dia, freq='M'),
+                                 format_func=lambda mes: mes.strftime('%m/%Y'), placeholder="Todas as coortes")
+    
+    # Enquanto o usuário escolhe o intervalo o seletor devolve só a data inicial
+    inicio, fim = datas if len(datas) == 2 else (datas[0], ultimo_dia)
+    df_funil = get_funnel(funil, inicio, fim, [mes.ordinal for mes in coortes])
+    
+    col_grafico, col_tabela = st.columns([3, 2])
+    
+    with col_grafico:
+        st.plotly_chart(create_chart('funnel', df_funil, "Funil de Vendas Aurum"), use_container_width=True)
+    
+    with col_tabela:
+        st.dataframe(df_funil, hide_index=True, use_container_width=True, column_config={
+            'Quantidade': st.column_config.NumberColumn(format="localized"),
+            'Conversão (%)': st.column_config.NumberColumn(format="%.1f%%"),
+            'Conversão Total (%)': st.column_config.NumberColumn(format="%.1f%%"),
+        })
+
+def build_infra_map(geo, viewport, mostrar_clientes=True, unidade=None, coberto=None):
+    """Mapa das unidades (e clientes) da janela; camadas grandes demais viram clusters
+
+    Com `coberto` (por cliente), os clientes fora de qualquer cobertura aparecem destacados.
+    """
+    colors = get_theme_colors()
+    unidades = geo['unidades']
+    fig_mapa = go.Figure()
+    
+    posicoes, clusters = query_map_layer(geo['indice_unidades'], viewport)
+    if clusters is None:
+        # Um trace por tipo, para a legenda; as posições de cada tipo saem de um único groupby
+        na_janela = unidades.iloc[posicoes]
+        poucas = len(na_janela) <= 30
+        for tipo, linhas in na_janela.groupby('Tipo', sort=False).indices.items():
+            df_tipo = na_janela.iloc[linhas]
+            config = TIPOS_UNIDADE[tipo]
+            
+            fig_mapa.add_trace(go.Scattergeo(
+                lon=df_tipo['Lon'],
+                lat=df_tipo['Lat'],
+                text=df_tipo['Local'],
+                mode='markers+text' if poucas else 'markers',
+                name=tipo,
+                marker=dict(
+                    size=config['size'] if poucas else config['size'] * 0.6,
+                    color=config['color'],
+                    symbol=config['symbol'],
+                    line=dict(width=2 if poucas else 1, color='white')
+                ),
+                textposition="top center",
+                textfont=dict(size=10, color=config['color']),
+                hovertemplate=
+                '<b>%{text}</b><br>' +
+                'Tipo: ' + tipo + '<br>' +
+                'Funcionários: %{customdata[0]}<br>' +
+                'Cobertura: %{customdata[1]} km<br>' +
+                'Status: %{customdata[2]}' +
+                '<extra></extra>',
+                customdata=df_tipo[['Funcionarios', 'Cobertura_KM', 'Status']].values
+            ))
+    else:
+        fig_mapa.add_trace(go.Scattergeo(
+            lon=clusters['lon'], lat=clusters['lat'], text=clusters['quantidade'], mode='markers',
+            name='Unidades (agrupadas)',
+            marker=dict(size=np.minimum(8 + 3 * np.sqrt(clusters['quantidade']), 40), color=colors['primary'],
+                        opacity=0.8, line=dict(width=1, color='white')),
+            hovertemplate='<b>%{text} unidades</b><extra></extra>'
+        ))
+    
+    if mostrar_clientes:
+        posicoes, clusters = query_map_layer(geo['indice_clientes'], viewport)
+        if clusters is None:
+            clientes = geo['clientes'].iloc[posicoes]
+            fora = np.zeros(len(posicoes), dtype=bool) if coberto is None else ~coberto[posicoes]
+            fig_mapa.add_trace(go.Scattergeo(
+                lon=clientes['lon'][~fora], lat=clientes['lat'][~fora], mode='markers', name='Clientes',
+                marker=dict(size=4, color=colors['secondary'], opacity=0.6),
+                hoverinfo='skip'
+            ))
+            if fora.any():
+                fig_mapa.add_trace(go.Scattergeo(
+                    lon=clientes['lon'][fora], lat=clientes['lat'][fora], mode='markers', name='Clientes sem cobertura',
+                    marker=dict(size=6, color='red', symbol='x'),
+                    hoverinfo='skip'
+                ))
+        else:
+            fig_mapa.add_trace(go.Scattergeo(
+                lon=clusters['lon'], lat=clusters['lat'], text=clusters['quantidade'], mode='markers',
+                name='Clientes (agrupados)',
+                marker=dict(size=np.minimum(4 + 2 * np.sqrt(clusters['quantidade']), 30), color=colors['secondary'],
+                            opacity=0.5),
+                hovertemplate='<b>%{text} clientes</b><extra></extra>'
+            ))
+    
+    if unidade is not None:
+        local = unidades.iloc[unidade]
+        lat, lon = coverage_circle(local['Lat'], local['Lon'], local['Cobertura_KM'])
+        fig_mapa.add_trace(go.Scattergeo(
+            lon=lon, lat=lat, mode='lines', fill='toself', name=f"Cobertura {local['Local']}",
+            line=dict(color=colors['accent'], width=2), opacity=0.4, hoverinfo='skip'
+        ))
+    
+    lat_min, lat_max, lon_min, lon_max = viewport
+    fig_mapa.update_geos(
+        projection_type="natural earth",
+        showland=True, landcolor='#F0F0F0',
+        showocean=True, oceancolor='#E6F3FF',
+        showcountries=True, countrycolor='#CCCCCC',
+        showlakes=True, lakecolor='#E6F3FF',
+        lataxis_range=[lat_min, lat_max],
+        lonaxis_range=[lon_min, lon_max],
+        bgcolor="rgba(0,0,0,0)"
+    )
     
-    st.markdown(css, unsafe_allow_html=True)
+    fig_mapa.update_layout(
+        title="📍 Rede de Infraestrutura Aurum",
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=colors['text']),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig_mapa
 
-def show_login():
-    # CSS premium para tela de login
-    st.markdown("""
-    <style>
-    .stApp {
-        background: linear-gradient(135deg, #18181b 0%, #1f1f23 100%);
-    }
+def render_operacional(store):
+    st.markdown("<h2 class='section-header'>⚙️ Indicadores Operacionais</h2>", unsafe_allow_html=True)
     
-    .login-container {
-        max-width: 450px;
-        margin: 2rem auto;
-        padding: 3rem 2rem;
-        background: linear-gradient(135deg, rgba(255, 255, 255, 0.15) 0%, rgba(255, 255, 255, 0.05) 100%);
-        border-radius: 25px;
-        backdrop-filter: blur(20px);
-        box-shadow: 0 15px 50px rgba(0, 0, 0, 0.2);
-        border: 1px solid rgba(255, 255, 255, 0.2);
-    }
+    # Valores de referência fixos: o dataset só tem vendas (sem custos, horas trabalhadas ou
+    # orçamento), então produtividade, eficiência, margem e custos não têm de onde ser calculados
+    col1, col2, col3, col4 = st.columns(4)
     
-    .login-title {
-        text-align: center;
-        background: linear-gradient(135deg, #fbbf24 0%, #f59e0b 100%);
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        font-size: 3.5rem;
-        font-weight: bold;
-        margin-bottom: 1rem;
-        text-shadow: 3px 3px 6px rgba(0,0,0,0.3);
-        animation: glow 2s ease-in-out infinite alternate;
-    }
+    with col1:
+        create_kpi_card("Produtividade", "127%", 8.2, "vs meta", "⚡")
     
-    @keyframes glow {
-        from { filter: drop-shadow(0 0 10px rgba(251, 191, 36, 0.5)); }
-        to { filter: drop-shadow(0 0 20px rgba(251, 191, 36, 0.8)); }
-    }
+    with col2:
+        create_kpi_card("Eficiência", "94.2%", 5.1, "vs mês anterior", "🎯")
     
-    .login-subtitle {
-        text-align: center;
-        color: white;
-        font-size: 1.3rem;
-        font-weight: bold;
-        margin-bottom: 2rem;
-        text-shadow: 1px 1px 2px rgba(0,0,0,0.5);
-    }
+    with col3:
+        create_kpi_card("Margem", "34.8%", -1.2, "vs trimestre", "📊")
     
+    with col4:
+        create_kpi_card("Custos", "R$ 2.1M", -3.5, "vs orçado", "💸")
     
-    .version-info {
-        text-align: center;
-        color: rgba(255, 255, 255, 0.8);
-        font-size: 0.9rem;
-        margin-top: 1rem;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.caption("Indicadores ilustrativos: a base de vendas não traz custos, horas nem orçamento para calculá-los.")
     
-    # Tutorial de modo escuro no login
-    st.error("""
-    💡 **DICA IMPORTANTE:** Para a melhor experiência visual, ative o modo escuro do seu navegador:
+    # Mapa interativo de infraestrutura operacional
+    st.subheader("🏢 Mapa de Infraestrutura Operacional")
     
-    🌙 **Chrome/Edge:** Clique nas **3 bolinhas (⋮)** → **Configurações** → **Aparência** → **Tema Escuro**
-    🦊 **Firefox:** Clique nas **3 linhas (≡)** → **Configurações** → **Geral** → **Tema Escuro**
-    🧭 **Safari:** Menu **Safari** → **Preferências** → **Aparência** → **Escuro**
-    """)
+    geo = get_table(store, 'geo')
+    col_janela, col_cobertura, col_camadas = st.columns([2, 3, 2])
     
-    col1, col2, col3 = st.columns([1, 2, 1])
+    with col_janela:
+        janela = st.selectbox("🗺️ Região do mapa:", list(VIEWPORTS_MAPA), index=0)
+    viewport = VIEWPORTS_MAPA[janela]
+    na_janela = query_grid_bbox(geo['indice_unidades'], *viewport)
+    
+    with col_cobertura:
+        unidade = st.selectbox("📡 Cobertura da unidade:", na_janela, index=None, placeholder="Nenhuma unidade selecionada",
+                               format_func=lambda posicao: geo['unidades']['Local'].iat[posicao])
+    
+    with col_camadas:
+        mostrar_clientes = st.toggle("👥 Mostrar clientes", value=True)
+    
+    cobertura = get_table(store, 'cobertura')
+    st.plotly_chart(build_infra_map(geo, viewport, mostrar_clientes, unidade, cobertura['coberto']), use_container_width=True)
+    
+    if unidade is not None:
+        local = geo['unidades'].iloc[unidade]
+        cobertos, distancias = query_grid_radius(geo['indice_clientes'], local['Lat'], local['Lon'], local['Cobertura_KM'])
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Clientes no raio", format_int(len(cobertos)))
+        col2.metric("Raio de cobertura", f"{local['Cobertura_KM']} km")
+        col3.metric("Distância média", f"{distancias.mean():.0f} km" if len(cobertos) else "—")
+    
+    df_infra = geo['unidades'].iloc[na_janela]
+    
+    # Cobertura: cada cliente atendido pela unidade ativa mais próxima
+    st.markdown("<h4 class='section-header'>📡 Cobertura de Clientes</h4>", unsafe_allow_html=True)
+    
+    coberto = cobertura['coberto']
+    receita = cobertura['receita_cliente']
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Clientes cobertos", f"{coberto.mean() * 100:.1f}%" if len(coberto) else "—")
+    col2.metric("Clientes sem cobertura", format_int((~coberto).sum()))
+    col3.metric("Receita sem cobertura", format_brl(receita[~coberto].sum()))
+    
+    por_unidade = cobertura['por_unidade']
+    st.dataframe(por_unidade[por_unidade.index.isin(na_janela)], use_container_width=True, hide_index=True, column_config={
+        'Distancia_Media_KM': st.column_config.NumberColumn("Distância média (km)", format="%.0f"),
+        'Receita': st.column_config.NumberColumn(format="R$ %.0f"),
+    })
+    
+    # Tabela resumo da infraestrutura
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"<h4 class='section-header'>📊 Status da Rede</h4>", unsafe_allow_html=True)
+        status_summary = df_infra['Status'].value_counts()
+        fig_status = px.pie(
+            values=status_summary.values, 
+            names=status_summary.index,
+            title="Status das Unidades",
+            color_discrete_sequence=get_theme_colors()['gradients']
+        )
+        fig_status.update_layout(
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)',
+            font=dict(color=get_theme_colors()['text'])
+        )
+        st.plotly_chart(fig_status, use_container_width=True)
     
     with col2:
-        # Container principal com glassmorphism
-        st.markdown("""
-        <div class="login-container">
-            <h1 class="login-title">🏆 AURUM</h1>
-            <p class="login-subtitle">Dashboard Starter</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        
-        # Informações da versão
-        st.markdown("""
-        <div class="version-info">
-            🚀 Versão Starter | v1.0.0
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Aviso sobre dados fictícios
-        st.warning("""
-        **⚠️ IMPORTANTE:** Este é um dashboard de demonstração. Todos os dados apresentados são **FICTÍCIOS** e gerados automaticamente para fins de apresentação.
-        """)
-        
-        # Credenciais visíveis
-        st.info("""
-        **🔑 Credenciais de Acesso Demo:**
-        
-        👤 **Usuário:** `aurum`
-        🔐 **Senha:** `aurum`
-        
-        *Basta clicar em "ENTRAR" - os campos já estão preenchidos*
-        """)
-        
-        with st.form("login_form"):
-            username = st.text_input("👤 Usuário", placeholder="Digite: aurum", value="aurum")
-            password = st.text_input("🔐 Senha", type="password", placeholder="Digite: aurum", value="aurum")
-            
-            submitted = st.form_submit_button("🚀 ENTRAR NO DASHBOARD", use_container_width=True, type="primary")
-            
-            if submitted:
-                if username == "aurum" and password == "aurum":
-                    st.session_state.logged_in = True
-                    st.session_state.user = username
-                    st.success("✨ Login realizado com sucesso! Redirecionando...")
-                    st.balloons()
-                    time.sleep(2)
-                    st.rerun()
-                else:
-                    st.error("❌ Credenciais inválidas! Use: **aurum** / **aurum**")
-        
-        # Call to action no final
-        st.markdown("---")
-        st.markdown("""
-        <div style="text-align: center; color: white; padding: 20px;">
-            <h3>🚀</h3>
-            <p>Starter <strong>AURUM</strong></p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(f"<h4 class='section-header'>👥 Funcionários por Unidade</h4>", unsafe_allow_html=True)
+        df_funcionarios = df_infra[['Local', 'Funcionarios', 'Tipo']].sort_values('Funcionarios', ascending=False)
+        st.dataframe(df_funcionarios, use_container_width=True, hide_index=True)
 
-def create_kpi_card(title, value, delta, delta_label, icon):
+@st.fragment
+def show_chat(store):
+    """Histórico e formulário do chat; enviar uma pergunta reexecuta só este trecho"""
     colors = get_theme_colors()
+    chat = get_session_chat()
     
-    # Cor do título específica para temas pastel e glass
-    if st.session_state.theme in ['pastel', 'glass']:
-        title_color = "#FFFFFF"
-        title_shadow = "2px 2px 4px rgba(0,0,0,0.8)"
-    else:
-        title_color = colors['text']
-        title_shadow = "1px 1px 2px rgba(0,0,0,0.3)"
+    # Container do chat (as mensagens são escritas depois de processar o formulário abaixo)
+    chat_container = st.container()
     
-    st.markdown(f"""
-    <div class="metric-card">
-        <div style="display: flex; align-items: center; margin-bottom: 10px;">
-            <span style="font-size: 1.5rem; margin-right: 10px;">{icon}</span>
-            <span style="font-size: 0.9rem; color: {title_color}; font-weight: bold; text-shadow: {title_shadow};">{title}</span>
-        </div>
-        <div style="font-size: 2rem; font-weight: bold; margin: 10px 0; color: #FFFFFF; text-shadow: 2px 2px 4px rgba(0,0,0,0.5);">{value}</div>
-        <div style="color: {'#00FF00' if delta >= 0 else '#FF4500'}; font-size: 0.9rem; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">
-            {'📈' if delta >= 0 else '📉'} {delta:+.1f}% {delta_label}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-def create_vendedor_card(vendedor):
-    colors = get_theme_colors()
-    initial = vendedor['nome'].split()[0][0]
-    performance_color = "#00FF00" if vendedor['performance'] >= 100 else "#FFD700" if vendedor['performance'] >= 80 else "#FF6B6B"
-    
-    # Ajustar cor do texto baseado no tema
-    if st.session_state.theme == 'neon':
-        text_color = colors['text']  # Branco para tema escuro
-    elif st.session_state.theme == 'glass':
-        text_color = '#ffffff'  # Branco para contraste no fundo escuro
-    else:  # pastel
-        text_color = '#ffffff'  # Branco com sombra para contraste
+    # Área de input de mensagem
+    st.markdown(f"<h4 style='color: {colors['primary']}; margin-bottom: 15px;'>💬 Digite sua pergunta</h4>", unsafe_allow_html=True)
     
-    col1, col2, col3 = st.columns([1, 2, 1])
+    with st.form("chat_form", clear_on_submit=True):
+        col_input, col_send = st.columns([4, 1])
+        
+        with col_input:
+            user_input = st.text_input(
+                "Mensagem", 
+                placeholder="Ex: vendas do último trimestre por região",
+                label_visibility="collapsed"
+            )
+        
+        with col_send:
+            submitted = st.form_submit_button("📤 Enviar", type="primary", use_container_width=True)
     
-    with col2:
+    # Sugestões rápidas
+    st.markdown("<br>", unsafe_allow_html=True)
+    sugestao = create_quick_suggestions()
+    
+    pergunta = sugestao or (user_input.strip() if submitted else "")
+    if pergunta:
+        # A pergunta é gravada e exibida antes de a resposta começar a ser gerada
+        add_session_messages(chat, append_chat_messages(st.session_state.user, [
+            {'type': 'user', 'message': html.escape(pergunta), 'timestamp': datetime.now().strftime('%H:%M'), 'avatar': '👤'},
+        ]))
+    
+    # Área de histórico do chat
+    with chat_container:
+        if chat['tem_anteriores'] and len(chat['mensagens']) + CHAT_PAGE_SIZE > CHAT_SESSION_MAX:
+            st.caption(f"Mostrando as últimas {len(chat['mensagens'])} mensagens; as anteriores ficam salvas no histórico.")
+        elif chat['tem_anteriores'] and st.button("⬆️ Carregar mensagens anteriores", use_container_width=True):
+            anteriores, chat['tem_anteriores'] = load_chat_page(st.session_state.user, antes_de=chat['mensagens'][0][0])
+            chat['mensagens'] = anteriores + chat['mensagens']
+        
+        # Um elemento por bloco de mensagens, com o HTML dos blocos fechados reaproveitado
+        if not chat['tem_anteriores']:
+            st.markdown(''.join(render_chat_message(m) for m in generate_chat_history()), unsafe_allow_html=True)
+        for bloco in iter_chat_blocks(chat):
+            st.markdown(bloco, unsafe_allow_html=True)
+        
+        if pergunta:
+            # Resposta em streaming: indicador de digitação até o primeiro trecho
+            resposta_slot = st.empty()
+            create_typing_indicator(resposta_slot)
+            if sugestao:
+                # Análise pré-calculada em segundo plano para esta revisão do dataset
+                trechos = iter([get_table(store, 'sugestoes')[sugestao]])
+            else:
+                trechos = get_chat_backend()(store, pergunta)
+            resposta, primeiro_ms, total_ms = stream_chat_response(resposta_slot, trechos)
+            st.session_state.chat_ms = primeiro_ms
+            # Só a mensagem nova é renderizada; o HTML das anteriores já está na sessão
+            add_session_messages(chat, append_chat_messages(st.session_state.user, [
+                {'type': 'ai', 'message': resposta, 'timestamp': datetime.now().strftime('%H:%M'), 'avatar': '🤖'},
+            ]))
+            resposta_slot.markdown(chat['mensagens'][-1][1], unsafe_allow_html=True)
+            st.caption(f"⚡ Primeiro trecho em {primeiro_ms:.0f} ms · resposta completa em {total_ms:.0f} ms")
+        
+        # Simular que a IA está online - indicador de status
         st.markdown(f"""
-        <div class="vendedor-card">
-            <div style="display: flex; align-items: center; margin-bottom: 15px;">
-                <div style="width: 60px; height: 60px; background: linear-gradient(135deg, {colors['primary']}, {colors['secondary']}); 
-                            border-radius: 50%; display: flex; align-items: center; justify-content: center; 
-                            color: white; font-size: 24px; font-weight: bold; margin-right: 20px;">
-                    {initial}
-                </div>
-                <div style="flex: 1;">
-                    <h4 style="margin: 0; color: {text_color}; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.3);">{vendedor['nome']}</h4>
-                    <p style="margin: 5px 0; opacity: 0.8; color: {text_color}; text-shadow: 1px 1px 2px rgba(0,0,0,0.3);">📍 {vendedor['regiao']}</p>
-                </div>
-                <div style="text-align: right;">
-                    <div style="color: {performance_color}; font-size: 20px; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.5);">
-                        {vendedor['performance']:.1f}%
-                    </div>
-                    <div style="opacity: 0.8; font-size: 12px; color: {text_color}; text-shadow: 1px 1px 2px rgba(0,0,0,0.3);">Performance</div>
-                </div>
-            </div>
+        <div style="display: flex; align-items: center; justify-content: center; margin: 20px 0;">
+            <div style="width: 8px; height: 8px; background: #00FF00; border-radius: 50%; margin-right: 8px;
+                        animation: pulse 2s ease-in-out infinite;"></div>
+            <span style="color: {colors['text']}; font-size: 12px; opacity: 0.7;">IA Aurum está online e pronta para ajudar</span>
         </div>
         """, unsafe_allow_html=True)
-        
-        # Métricas em colunas separadas do Streamlit
-        col_vendas, col_meta, col_diff = st.columns(3)
-        
-        with col_vendas:
-            st.metric("💰 Vendas", f"R$ {vendedor['vendas']:,.0f}")
-        
-        with col_meta:
-            st.metric("🎯 Meta", f"R$ {vendedor['meta']:,.0f}")
-        
-        with col_diff:
-            diff = vendedor['vendas'] - vendedor['meta']
-            st.metric("📊 Diferença", f"R$ {abs(diff):,.0f}", 
-                     delta=f"{'Acima' if diff > 0 else 'Abaixo'} da meta")
-        
-        # Progress bar
-        progress_pct = min(vendedor['performance'] / 100, 1.0)
-        st.progress(progress_pct)
-        
-        st.markdown("<br>", unsafe_allow_html=True)
 
-def create_chart(chart_type, data, title):
+def render_chatbot(store):
     colors = get_theme_colors()
     
-    if chart_type == 'line':
-        fig = px.line(data, x='data', y='vendas', title=title)
-        fig.add_scatter(x=data['data'], y=data['meta'], mode='lines', name='Meta', line=dict(dash='dash'))
-        fig.update_traces(line=dict(color=colors['primary'], width=3))
-        
-    elif chart_type == 'bar':
-        produtos = ['Aurum Premium', 'Aurum Standard', 'Aurum Starter', 'Aurum Enterprise', 'Aurum Pro']
-        valores = [np.random.randint(500000, 2000000) for _ in produtos]
-        
-        fig = go.Figure(data=[
-            go.Bar(x=produtos, y=valores, 
-                  marker=dict(color=colors['gradients'][:len(produtos)]))
-        ])
-        fig.update_layout(title=title)
-        
-    elif chart_type == 'pie':
-        regioes = ['São Paulo', 'Rio de Janeiro', 'Minas Gerais', 'Paraná', 'Outros']
-        valores = [30, 25, 20, 15, 10]
-        
-        fig = px.pie(values=valores, names=regioes, title=title, 
-                     color_discrete_sequence=colors['gradients'])
-        
-    elif chart_type == 'gauge':
-        fig = go.Figure(go.Indicator(
-            mode = "gauge+number+delta",
-            value = 87,
-            domain = {'x': [0, 1], 'y': [0, 1]},
-            title = {'text': title},
-            delta = {'reference': 100},
-            gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': colors['primary']},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 80], 'color': colors['secondary']},
-                    {'range': [80, 100], 'color': colors['accent']}],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': 90}}))
+    st.markdown("<h2 class='section-header'>🤖 Assistente IA Aurum</h2>", unsafe_allow_html=True)
     
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        font=dict(color=colors['text'])
-    )
+    # Header do chat com status
+    col1, col2, col3 = st.columns([2, 1, 1])
     
-    return fig
-
-def show_mandatory_dark_mode_guide():
-    """Mostra guia obrigatório de modo escuro com botão para ocultar"""
-    if not st.session_state.hide_tutorial:
-        st.error("""
-        🌟 **EXPERIÊNCIA STARTER COMPLETA** 🌟
-        
-        **Para aproveitar 100% dos efeitos visuais, ative o MODO ESCURO do seu navegador:**
-        
-        🌙 **Chrome/Edge:** Clique nas **3 bolinhas (⋮)** no canto superior direito → **Configurações** → **Aparência** → **Tema Escuro**
-        
-        🦊 **Firefox:** Clique nas **3 linhas (≡)** no canto superior direito → **Configurações** → **Geral** → **Tema Escuro**
-        
-        🧭 **Safari:** Menu **Safari** → **Preferências** → **Aparência** → **Escuro**
-        
-        ✨ **Os temas NEON LED e GLASS ficam ESPETACULARES no modo escuro!** ✨
-        """)
-        
-        st.warning("""
-        💡 **DICA STARTER:** Após ativar o modo escuro, teste os 3 temas no sidebar e veja a diferença impressionante nos efeitos visuais!
-        """)
-        
-        # Botão para ocultar o tutorial
-        col1, col2, col3 = st.columns([2, 1, 2])
-        with col2:
-            if st.button("✅ Entendi, não mostrar mais", type="primary", use_container_width=True):
-                st.session_state.hide_tutorial = True
-                st.success("✨ Tutorial ocultado! Você pode reativá-lo no sidebar.")
-                st.rerun()
-
-def create_premium_sidebar():
-    """Cria um sidebar premium e estiloso com controles principais"""
-    colors = get_theme_colors()
+    with col1:
+        st.markdown(f"""
+        <div style="display: flex; align-items: center; margin-bottom: 20px;">
+            <div style="width: 50px; height: 50px; border-radius: 50%; 
+                        background: linear-gradient(135deg, {colors['accent']}, {colors['primary']});
+                        display: flex; align-items: center; justify-content: center;
+                        font-size: 24px; margin-right: 15px; border: 3px solid white; box-shadow: 0 4px 15px rgba(0,0,0,0.2);">
+                🤖
+            </div>
+            <div>
+                <h3 style="margin: 0; color: {colors['primary']}; font-weight: bold;">IA Aurum Business</h3>
+                <p style="margin: 0; color: {colors['text']}; opacity: 0.8; font-size: 14px;">Seu assistente inteligente para análises e insights</p>
+            </div>
+        </div>
+        """, unsafe_allow_html=True)
     
-    with st.sidebar:
-        # Logo e título no sidebar
+    with col2:
+        st.metric("🟢 Status", "Online", "Ativo")
+    
+    with col3:
+        if 'chat_ms' in st.session_state:
+            st.metric("⚡ Tempo Resposta", f"{st.session_state.chat_ms:.0f} ms", "1º trecho")
+        else:
+            st.metric("⚡ Tempo Resposta", "< 1s", "Otimizado")
+    
+    st.markdown("---")
+    
+    show_chat(store)
+    
+    # Recursos da IA
+    st.markdown("---")
+    st.markdown(f"<h4 style='color: {colors['primary']}; margin-bottom: 15px;'>🚀 Capacidades da IA Aurum</h4>", unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    
+    with col1:
         st.markdown(f"""
-        <div style="text-align: center; padding: 20px 0; margin-bottom: 30px;">
-            <h1 style="color: #DAA520; font-size: 2.5rem; margin: 0;">🏆</h1>
-            <h2 style="color: #DAA520 !important; font-size: 1.5rem; margin: 5px 0; text-shadow: 2px 2px 4px rgba(0,0,0,0.3);">AURUM</h2>
-            <p style="color: {colors['text']}; opacity: 0.8; margin: 0;">Dashboard Starter</p>
+        <div style="padding: 20px; background: {'linear-gradient(135deg, rgba(0,255,255,0.1) 0%, rgba(255,20,147,0.1) 100%)' if st.session_state.theme == 'neon' else 'linear-gradient(135deg, rgba(135,206,235,0.15) 0%, rgba(152,251,152,0.15) 100%)'};
+                    border-radius: 15px; border: 1px solid {colors['primary']}; text-align: center;">
+            <h3 style="color: {colors['primary']};">📊 Análise de Dados</h3>
+            <p style="color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">Interpretação inteligente de KPIs, métricas e tendências do seu negócio</p>
         </div>
         """, unsafe_allow_html=True)
-        
-        st.markdown("---")
-        
-        # Seletor de tema premium
-        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>🎨 Personalização</h3>", unsafe_allow_html=True)
-        
-        theme_names = {'pastel': '🎨 Pastel Sofisticado', 'neon': '💡 Neon LED Vibrante', 'glass': '🔮 Glass Futurista'}
-        selected_theme = st.selectbox(
-            "Selecione o tema:", 
-            options=['pastel', 'neon', 'glass'],
-            format_func=lambda x: theme_names[x],
-            key="theme_selector"
-        )
-        if selected_theme != st.session_state.theme:
-            st.session_state.theme = selected_theme
-            st.rerun()
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Informações do usuário
-        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>👤 Usuário</h3>", unsafe_allow_html=True)
-        st.markdown(f"**Bem-vindo:** {st.session_state.user}")
-        st.markdown(f"**Sessão ativa desde:** {datetime.now().strftime('%H:%M')}")
-        st.markdown(f"**Última sync:** {datetime.now().strftime('%d/%m/%Y %H:%M')}")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Status do sistema
-        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>⚡ Status Sistema</h3>", unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            st.metric("🚀 Performance", "98%", "2%")
-        with col2:
-            st.metric("📡 Conexão", "Ativo", "0ms")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Actions premium
-        st.markdown(f"<h3 style='color: {colors['primary']}; margin-bottom: 15px;'>⚡ Ações Rápidas</h3>", unsafe_allow_html=True)
-        
-        if st.button("📊 Atualizar Dados", use_container_width=True):
-            st.success("✨ Dados atualizados!")
-            time.sleep(0.5)
-            st.rerun()
-        
-        if st.button("📁 Exportar Relatório", use_container_width=True):
-            st.info("📤 Preparando relatório...")
-            
-        if st.button("📧 Enviar por Email", use_container_width=True):
-            st.info("📬 Enviando relatório...")
-        
-        # Botão para reativar tutorial se estiver oculto
-        if st.session_state.hide_tutorial:
-            if st.button("💡 Mostrar Tutorial Modo Escuro", use_container_width=True):
-                st.session_state.hide_tutorial = False
-                st.rerun()
-            
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Logout button premium
-        st.markdown("---")
-        if st.button("🚪 Logout", use_container_width=True, type="secondary"):
-            st.session_state.logged_in = False
-            st.rerun()
-        
-        # Footer do sidebar
-        st.markdown("<br><br>", unsafe_allow_html=True)
+    
+    with col2:
         st.markdown(f"""
-        <div style="text-align: center; opacity: 0.7; font-size: 0.8rem;">
-            <p style="color: {colors['text']};">🚀 Aurum Starter</p>
-            <p style="color: {colors['text']};">v1.0.0 | 2024</p>
+        <div style="padding: 20px; background: {'linear-gradient(135deg, rgba(0,255,255,0.1) 0%, rgba(255,20,147,0.1) 100%)' if st.session_state.theme == 'neon' else 'linear-gradient(135deg, rgba(135,206,235,0.15) 0%, rgba(152,251,152,0.15) 100%)'};
+                    border-radius: 15px; border: 1px solid {colors['secondary']}; text-align: center;">
+            <h3 style="color: {colors['secondary']};">🎯 Insights Estratégicos</h3>
+            <p style="color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">Recomendações personalizadas baseadas em padrões e benchmarks do mercado</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col3:
+        st.markdown(f"""
+        <div style="padding: 20px; background: {'linear-gradient(135deg, rgba(0,255,255,0.1) 0%, rgba(255,20,147,0.1) 100%)' if st.session_state.theme == 'neon' else 'linear-gradient(135deg, rgba(135,206,235,0.15) 0%, rgba(152,251,152,0.15) 100%)'};
+                    border-radius: 15px; border: 1px solid {colors['accent']}; text-align: center;">
+            <h3 style="color: {colors['accent']};">⚡ Respostas Rápidas</h3>
+            <p style="color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">Suporte 24/7 para dúvidas sobre performance, metas e oportunidades</p>
         </div>
         """, unsafe_allow_html=True)
 
+# Registro de páginas: cada aba declara as tabelas e os gráficos de que precisa; só a aba
+# ativa é carregada e renderizada, e a provável próxima é aquecida em segundo plano
+PAGINAS = {
+    "📊 Overview": {'render': render_overview, 'tabelas': ('metas', 'rollup', 'previsao', 'kpis'),
+                    'figuras': overview_figures, 'proxima': "💰 Vendas"},
+    "💰 Vendas": {'render': render_vendas, 'tabelas': ('metas', 'rollup', 'previsao', 'kpis', 'vendedores', 'indice'),
+                  'figuras': vendas_figures, 'proxima': "👥 Clientes"},
+    "👥 Clientes": {'render': render_clientes, 'tabelas': ('kpis_clientes', 'funil'), 'figuras': None, 'proxima': "⚙️ Operacional"},
+    "⚙️ Operacional": {'render': render_operacional, 'tabelas': ('geo', 'cobertura'), 'figuras': None, 'proxima': "🤖 IA Chatbot"},
+    "🤖 IA Chatbot": {'render': render_chatbot, 'tabelas': ('sugestoes',), 'figuras': None, 'proxima': "📊 Overview"},
+}
+
+@st.cache_resource
+def get_prefetch_executor():
+    """Um único worker por processo para aquecer tabelas e gráficos em segundo plano"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='aurum-prefetch')
+
+def prefetch_page(store, nome, theme, cache):
+    """Carrega as tabelas e monta os gráficos de uma aba antes de ela ser aberta"""
+    pagina = PAGINAS[nome]
+    try:
+        for tabela in pagina['tabelas']:
+            get_table(store, tabela)
+        if pagina['figuras'] is not None:
+            for chart_type, data, title in pagina['figuras'](store).values():
+                get_chart_json(chart_type, data, title, theme, cache)
+    except Exception:
+        logger.exception("Falha no prefetch da aba %s", nome)
+
+def schedule_prefetch(store, nome):
+    """Agenda o prefetch de uma aba uma única vez por revisão do dataset e tema"""
+    chave = (store['revisao'], nome, st.session_state.theme)
+    with store['lock']:
+        if chave in store['prefetch']:
+            return
+        store['prefetch'].add(chave)
+    get_prefetch_executor().submit(prefetch_page, store, nome, st.session_state.theme, get_figure_cache())
+
 def main():
     if not st.session_state.logged_in:
         show_login()
         return
     
+    show_flash_messages()
     inject_theme_css()
     create_premium_sidebar()
     
@@ -1189,13 +4073,10 @@ def main():
     
     st.markdown("---")
     
-    # Gerar dados
-    df_vendas, produtos, vendas_produtos, vendedores, transacoes = generate_fake_data()
-    
     # Navegação
     menu = option_menu(
         menu_title=None,
-        options=["📊 Overview", "💰 Vendas", "👥 Clientes", "⚙️ Operacional", "🤖 IA Chatbot"],
+        options=list(PAGINAS),
         icons=["graph-up", "currency-dollar", "people", "gear", "robot"],
         default_index=0,
         orientation="horizontal",
@@ -1204,449 +4085,14 @@ def main():
             "nav-link": {"font-size": "16px", "text-align": "center", "margin": "0px"},
         }
     )
+
     
-    if menu == "📊 Overview":
-        st.markdown("<h2 class='section-header'>📊 Visão Geral Executiva</h2>", unsafe_allow_html=True)
-        
-        # KPIs
-        col1, col2, col3, col4, col5 = st.columns(5)
-        
-        with col1:
-            create_kpi_card("Receita Total", "R$ 12,5M", 8.5, "vs mês anterior", "💰")
-        
-        with col2:
-            create_kpi_card("Vendas do Mês", "1.847", 12.3, "vs meta", "📈")
-        
-        with col3:
-            create_kpi_card("Clientes Ativos", "15.234", -2.1, "vs mês anterior", "👥")
-        
-        with col4:
-            create_kpi_card("Ticket Médio", "R$ 6.789", 15.7, "vs mês anterior", "🎯")
-        
-        with col5:
-            create_kpi_card("Taxa Conversão", "14.8%", 3.2, "vs mês anterior", "⚡")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Gráficos principais
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            fig_line = create_chart('line', df_vendas.tail(12), '📈 Evolução de Vendas Aurum (12 meses)')
-            st.plotly_chart(fig_line, use_container_width=True)
-            
-            fig_gauge = create_chart('gauge', None, '🎯 Meta vs Realizado')
-            st.plotly_chart(fig_gauge, use_container_width=True)
-        
-        with col2:
-            fig_bar = create_chart('bar', None, '🏆 Top 5 Produtos Aurum')
-            st.plotly_chart(fig_bar, use_container_width=True)
-            
-            fig_pie = create_chart('pie', None, '🗺️ Distribuição por Região')
-            st.plotly_chart(fig_pie, use_container_width=True)
-    
-    elif menu == "💰 Vendas":
-        st.markdown("<h2 class='section-header'>💰 Análise de Vendas Detalhada</h2>", unsafe_allow_html=True)
-        
-        # KPIs específicos de vendas
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            create_kpi_card("Meta Mensal", "R$ 8.2M", 15.3, "vs mês anterior", "🎯")
-        
-        with col2:
-            create_kpi_card("Realizado", "R$ 9.1M", 22.8, "acima da meta", "🚀")
-        
-        with col3:
-            create_kpi_card("Pipeline", "R$ 15.6M", 8.9, "oportunidades", "⏳")
-        
-        with col4:
-            create_kpi_card("Conversão", "18.5%", 5.2, "vs trimestre", "⚡")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Gráficos de vendas
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # Gráfico de performance por produto
-            fig_produtos = create_chart('bar', None, '📊 Performance por Produto')
-            st.plotly_chart(fig_produtos, use_container_width=True)
-        
-        with col2:
-            # Gráfico de evolução de vendas
-            fig_evolucao = create_chart('line', df_vendas.tail(6), '📈 Evolução Vendas (6 meses)')
-            st.plotly_chart(fig_evolucao, use_container_width=True)
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Filtros para o Hall da Fama
-        st.markdown(f"<h3 class='section-header'>🔍 Filtros Hall da Fama</h3>", unsafe_allow_html=True)
-        
-        col_filtro1, col_filtro2, col_filtro3 = st.columns(3)
-        
-        with col_filtro1:
-            periodo = st.selectbox(
-                "📅 Período:",
-                ["Hoje", "Esta Semana", "Este Mês", "Últimos 3 Meses", "Este Ano"],
-                index=2
-            )
-        
-        with col_filtro2:
-            regiao = st.multiselect(
-                "🌍 Região:",
-                ["São Paulo", "Rio de Janeiro", "Minas Gerais", "Paraná", "Todos"],
-                default=["Todos"]
-            )
-            
-        with col_filtro3:
-            produto_filtro = st.selectbox(
-                "📦 Produto:",
-                ["Todos", "Aurum Premium", "Aurum Standard", "Aurum Starter", "Aurum Enterprise", "Aurum Pro"],
-                index=0
-            )
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Top Vendedores com cards visuais impressionantes
-        st.markdown("<h3 class='section-header'>🏆 Hall da Fama - Top Vendedores</h3>", unsafe_allow_html=True)
-        
-        df_vendedores = pd.DataFrame(vendedores)
-        df_vendedores['performance'] = (df_vendedores['vendas'] / df_vendedores['meta'] * 100).round(1)
-        top_vendedores = df_vendedores.nlargest(5, 'vendas')
-        
-        for idx, vendedor in top_vendedores.iterrows():
-            create_vendedor_card(vendedor)
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Últimas Transações com cards visuais
-        st.markdown("<h3 class='section-header'>💳 Últimas Transações VIP</h3>", unsafe_allow_html=True)
-        
-        df_transacoes = pd.DataFrame(transacoes).head(6)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        for idx, (i, transacao) in enumerate(df_transacoes.iterrows()):
-            col = [col1, col2, col3][idx % 3]
-            
-            status_icon = {"Concluída": "✅", "Pendente": "⏳", "Processando": "🔄"}
-            status_color = {"Concluída": "#00FF00", "Pendente": "#FFD700", "Processando": "#00BFFF"}
-            
-            with col:
-                st.markdown(f"""
-                <div style="background: rgba(255,255,255,0.1); border-radius: 15px; padding: 15px; margin-bottom: 15px; 
-                            border: 1px solid {get_theme_colors()['primary']};">
-                    <div style="display: flex; justify-content: between; align-items: center; margin-bottom: 10px;">
-                        <div style="color: {status_color[transacao['status']]}; font-size: 20px;">
-                            {status_icon[transacao['status']]}
-                        </div>
-                        <div style="color: {status_color[transacao['status']]}; font-size: 12px; font-weight: bold;">
-                            {transacao['status']}
-                        </div>
-                    </div>
-                    <div style="font-weight: bold; margin-bottom: 8px; color: {get_theme_colors()['text']};">
-                        {transacao['cliente'][:25]}{'...' if len(transacao['cliente']) > 25 else ''}
-                    </div>
-                    <div style="color: {get_theme_colors()['accent']}; font-size: 14px; margin-bottom: 8px;">
-                        📦 {transacao['produto']}
-                    </div>
-                    <div style="font-size: 18px; font-weight: bold; color: #00FF00;">
-                        💰 R$ {transacao['valor']:,.0f}
-                    </div>
-                    <div style="font-size: 12px; opacity: 0.8; margin-top: 8px; color: {get_theme_colors()['text']};">
-                        📅 {transacao['data'].strftime('%d/%m/%Y')}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-    
-    elif menu == "👥 Clientes":
-        st.markdown("<h2 class='section-header'>👥 Análise de Clientes & Marketing</h2>", unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            create_kpi_card("Novos Clientes", "1.234", 18.5, "este mês", "👤")
-        
-        with col2:
-            create_kpi_card("Taxa Retenção", "89.5%", 2.1, "vs mês anterior", "🔄")
-        
-        with col3:
-            create_kpi_card("LTV Médio", "R$ 45.6K", 12.8, "vs trimestre", "💎")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        # Simulação de funil de vendas
-        st.subheader("🎯 Funil de Conversão Aurum")
-        
-        funil_data = {
-            'Etapa': ['Visitantes', 'Leads', 'Oportunidades', 'Propostas', 'Fechamentos'],
-            'Quantidade': [10000, 3500, 1200, 450, 180],
-            'Taxa Conversão': [100, 35, 34.3, 37.5, 40]
-        }
-        
-        df_funil = pd.DataFrame(funil_data)
-        
-        colors = get_theme_colors()
-        fig_funil = px.funnel(df_funil, x='Quantidade', y='Etapa', 
-                             title="Funil de Vendas Aurum",
-                             color_discrete_sequence=[colors['primary']])
-        st.plotly_chart(fig_funil, use_container_width=True)
-    
-    elif menu == "⚙️ Operacional":
-        st.markdown("<h2 class='section-header'>⚙️ Indicadores Operacionais</h2>", unsafe_allow_html=True)
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            create_kpi_card("Produtividade", "127%", 8.2, "vs meta", "⚡")
-        
-        with col2:
-            create_kpi_card("Eficiência", "94.2%", 5.1, "vs mês anterior", "🎯")
-        
-        with col3:
-            create_kpi_card("Margem", "34.8%", -1.2, "vs trimestre", "📊")
-        
-        with col4:
-            create_kpi_card("Custos", "R$ 2.1M", -3.5, "vs orçado", "💸")
-        
-        # Mapa interativo de infraestrutura operacional
-        st.subheader("🏢 Mapa de Infraestrutura Operacional")
-        
-        # Dados simulados de infraestrutura operacional
-        infraestrutura = {
-            'Local': ['Centro SP', 'Filial RJ', 'CD Campinas', 'Escritório BH', 'Hub Curitiba', 
-                     'Base Floripa', 'Centro GO', 'Filial Salvador', 'Hub Recife', 'Base Fortaleza'],
-            'Tipo': ['Sede', 'Filial', 'Centro de Distribuição', 'Escritório', 'Hub Logístico',
-                    'Base Operacional', 'Centro Regional', 'Filial', 'Hub Logístico', 'Base Operacional'],
-            'Status': ['Ativo', 'Ativo', 'Ativo', 'Ativo', 'Ativo', 'Ativo', 'Ativo', 'Manutenção', 'Ativo', 'Ativo'],
-            'Funcionarios': [350, 180, 45, 85, 120, 65, 95, 140, 110, 75],
-            'Cobertura_KM': [500, 400, 300, 350, 450, 280, 380, 420, 390, 320],
-            'Lat': [-23.5505, -22.9068, -22.9056, -19.9167, -25.2521, -27.2423, -16.6864, -12.9714, -8.0476, -3.7319],
-            'Lon': [-46.6333, -43.1729, -47.0608, -43.9345, -49.2908, -48.2619, -49.2643, -38.5014, -34.8770, -38.5267]
-        }
-        
-        df_infra = pd.DataFrame(infraestrutura)
-        
-        # Criar mapa com diferentes símbolos por tipo
-        fig_mapa = go.Figure()
-        
-        # Definir cores e símbolos por tipo
-        tipo_config = {
-            'Sede': {'color': '#DAA520', 'symbol': 'star', 'size': 20},
-            'Filial': {'color': '#00BFFF', 'symbol': 'circle', 'size': 15},
-            'Centro de Distribuição': {'color': '#FF6347', 'symbol': 'square', 'size': 18},
-            'Escritório': {'color': '#32CD32', 'symbol': 'triangle-up', 'size': 12},
-            'Hub Logístico': {'color': '#FF1493', 'symbol': 'diamond', 'size': 16},
-            'Base Operacional': {'color': '#9370DB', 'symbol': 'cross', 'size': 14},
-            'Centro Regional': {'color': '#FF8C00', 'symbol': 'hexagon', 'size': 15}
-        }
-        
-        for tipo in df_infra['Tipo'].unique():
-            df_tipo = df_infra[df_infra['Tipo'] == tipo]
-            config = tipo_config[tipo]
-            
-            fig_mapa.add_trace(go.Scattergeo(
-                lon=df_tipo['Lon'],
-                lat=df_tipo['Lat'],
-                text=df_tipo['Local'],
-                mode='markers+text',
-                name=tipo,
-                marker=dict(
-                    size=config['size'],
-                    color=config['color'],
-                    symbol=config['symbol'],
-                    line=dict(width=2, color='white')
-                ),
-                textposition="top center",
-                textfont=dict(size=10, color=config['color']),
-                hovertemplate=
-                '<b>%{text}</b><br>' +
-                'Tipo: ' + tipo + '<br>' +
-                'Funcionários: %{customdata[0]}<br>' +
-                'Cobertura: %{customdata[1]} km<br>' +
-                'Status: %{customdata[2]}' +
-                '<extra></extra>',
-                customdata=df_tipo[['Funcionarios', 'Cobertura_KM', 'Status']].values
-            ))
-        
-        fig_mapa.update_geos(
-            projection_type="natural earth",
-            showland=True, landcolor='#F0F0F0',
-            showocean=True, oceancolor='#E6F3FF',
-            showcountries=True, countrycolor='#CCCCCC',
-            showlakes=True, lakecolor='#E6F3FF',
-            fitbounds="locations",
-            bgcolor="rgba(0,0,0,0)"
-        )
-        
-        fig_mapa.update_layout(
-            title="📍 Rede de Infraestrutura Aurum",
-            geo=dict(
-                center=dict(lat=-15.0, lon=-50.0),
-                projection_scale=2.5
-            ),
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=get_theme_colors()['text']),
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
-        
-        st.plotly_chart(fig_mapa, use_container_width=True)
-        
-        # Tabela resumo da infraestrutura
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown(f"<h4 class='section-header'>📊 Status da Rede</h4>", unsafe_allow_html=True)
-            status_summary = df_infra['Status'].value_counts()
-            fig_status = px.pie(
-                values=status_summary.values, 
-                names=status_summary.index,
-                title="Status das Unidades",
-                color_discrete_sequence=get_theme_colors()['gradients']
-            )
-            fig_status.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=get_theme_colors()['text'])
-            )
-            st.plotly_chart(fig_status, use_container_width=True)
-        
-        with col2:
-            st.markdown(f"<h4 class='section-header'>👥 Funcionários por Unidade</h4>", unsafe_allow_html=True)
-            df_funcionarios = df_infra[['Local', 'Funcionarios', 'Tipo']].sort_values('Funcionarios', ascending=False)
-            st.dataframe(df_funcionarios, use_container_width=True, hide_index=True)
-    
-    elif menu == "🤖 IA Chatbot":
-        colors = get_theme_colors()
-        
-        st.markdown("<h2 class='section-header'>🤖 Assistente IA Aurum</h2>", unsafe_allow_html=True)
-        
-        # Header do chat com status
-        col1, col2, col3 = st.columns([2, 1, 1])
-        
-        with col1:
-            st.markdown(f"""
-            <div style="display: flex; align-items: center; margin-bottom: 20px;">
-                <div style="width: 50px; height: 50px; border-radius: 50%; 
-                            background: linear-gradient(135deg, {colors['accent']}, {colors['primary']});
-                            display: flex; align-items: center; justify-content: center;
-                            font-size: 24px; margin-right: 15px; border: 3px solid white; box-shadow: 0 4px 15px rgba(0,0,0,0.2);">
-                    🤖
-                </div>
-                <div>
-                    <h3 style="margin: 0; color: {colors['primary']}; font-weight: bold;">IA Aurum Business</h3>
-                    <p style="margin: 0; color: {colors['text']}; opacity: 0.8; font-size: 14px;">Seu assistente inteligente para análises e insights</p>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.metric("🟢 Status", "Online", "Ativo")
-        
-        with col3:
-            st.metric("⚡ Tempo Resposta", "< 1s", "Otimizado")
-        
-        st.markdown("---")
-        
-        # Container do chat
-        chat_container = st.container()
-        
-        # Área de histórico do chat
-        with chat_container:
-            # Exibir histórico de mensagens
-            chat_history = generate_chat_history()
-            for message in chat_history:
-                create_chat_message(message)
-            
-            # Simular que a IA está online - indicador de status
-            st.markdown(f"""
-            <div style="display: flex; align-items: center; justify-content: center; margin: 20px 0;">
-                <div style="width: 8px; height: 8px; background: #00FF00; border-radius: 50%; margin-right: 8px;
-                            animation: pulse 2s ease-in-out infinite;"></div>
-                <span style="color: {colors['text']}; font-size: 12px; opacity: 0.7;">IA Aurum está online e pronta para ajudar</span>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Área de input de mensagem
-        st.markdown(f"<h4 style='color: {colors['primary']}; margin-bottom: 15px;'>💬 Digite sua pergunta</h4>", unsafe_allow_html=True)
-        
-        with st.form("chat_form", clear_on_submit=True):
-            col_input, col_send = st.columns([4, 1])
-            
-            with col_input:
-                user_input = st.text_input(
-                    "Mensagem", 
-                    placeholder="Ex: Como estão nossas vendas este mês? Quais insights você pode me dar sobre performance?",
-                    label_visibility="collapsed"
-                )
-            
-            with col_send:
-                submitted = st.form_submit_button("📤 Enviar", type="primary", use_container_width=True)
-            
-            if submitted and user_input.strip():
-                # Simular adição de nova mensagem - apenas demonstrativo
-                st.success("✨ Mensagem enviada! Em uma versão real, aqui a IA responderia com insights personalizados baseados nos seus dados.")
-                
-                # Simular resposta da IA
-                with st.expander("🤖 **Prévia da Resposta da IA**", expanded=True):
-                    st.markdown(f"""
-                    **Sua pergunta:** "{user_input}"
-                    
-                    **Resposta IA Aurum:** 
-                    
-                    📊 Baseado nos dados do seu dashboard, posso analisar que:
-                    • Receita atual: **R$ 12,5M** (+8,5% vs mês anterior)
-                    • Performance acima da média do mercado
-                    • Oportunidades identificadas no segmento premium
-                    • Recomendo focar em **{random.choice(['retenção de clientes', 'expansão geográfica', 'novos produtos', 'otimização de custos'])}**
-                    
-                    *Esta é uma demonstração. Na versão real, a IA analisaria seus dados específicos para fornecer insights precisos e personalizados.*
-                    """)
-        
-        # Sugestões rápidas
-        st.markdown("<br>", unsafe_allow_html=True)
-        create_quick_suggestions()
-        
-        # Recursos da IA
-        st.markdown("---")
-        st.markdown(f"<h4 style='color: {colors['primary']}; margin-bottom: 15px;'>🚀 Capacidades da IA Aurum</h4>", unsafe_allow_html=True)
-        
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            st.markdown(f"""
-            <div style="padding: 20px; background: {'linear-gradient(135deg, rgba(0,255,255,0.1) 0%, rgba(255,20,147,0.1) 100%)' if st.session_state.theme == 'neon' else 'linear-gradient(135deg, rgba(135,206,235,0.15) 0%, rgba(152,251,152,0.15) 100%)'};
-                        border-radius: 15px; border: 1px solid {colors['primary']}; text-align: center;">
-                <h3 style="color: {colors['primary']};">📊 Análise de Dados</h3>
-                <p style="color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">Interpretação inteligente de KPIs, métricas e tendências do seu negócio</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div style="padding: 20px; background: {'linear-gradient(135deg, rgba(0,255,255,0.1) 0%, rgba(255,20,147,0.1) 100%)' if st.session_state.theme == 'neon' else 'linear-gradient(135deg, rgba(135,206,235,0.15) 0%, rgba(152,251,152,0.15) 100%)'};
-                        border-radius: 15px; border: 1px solid {colors['secondary']}; text-align: center;">
-                <h3 style="color: {colors['secondary']};">🎯 Insights Estratégicos</h3>
-                <p style="color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">Recomendações personalizadas baseadas em padrões e benchmarks do mercado</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div style="padding: 20px; background: {'linear-gradient(135deg, rgba(0,255,255,0.1) 0%, rgba(255,20,147,0.1) 100%)' if st.session_state.theme == 'neon' else 'linear-gradient(135deg, rgba(135,206,235,0.15) 0%, rgba(152,251,152,0.15) 100%)'};
-                        border-radius: 15px; border: 1px solid {colors['accent']}; text-align: center;">
-                <h3 style="color: {colors['accent']};">⚡ Respostas Rápidas</h3>
-                <p style="color: #FFFFFF; font-weight: bold; text-shadow: 1px 1px 2px rgba(0,0,0,0.7);">Suporte 24/7 para dúvidas sobre performance, metas e oportunidades</p>
-            </div>
-            """, unsafe_allow_html=True)
+    # Só a aba ativa é renderizada; a provável próxima é aquecida em segundo plano
+    store = get_store()
+    PAGINAS[menu]['render'](store)
+    schedule_prefetch(store, PAGINAS[menu]['proxima'])
+    # Respostas das sugestões do chatbot são recalculadas a cada nova revisão do dataset
+    schedule_prefetch(store, "🤖 IA Chatbot")
     
     # Call-to-Actions no final
     st.markdown("---")
@@ -1665,6 +4111,8 @@ def main():
     with col3:
         if st.button("🔗 Links Úteis", use_container_width=True):
             st.info("📚 Acesse nossa documentação!")
+    
+    record_login_paint()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
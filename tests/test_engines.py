@@ -0,0 +1,207 @@
+"""Motores incrementais e de consulta comparados com a reconstrução completa ou força bruta"""
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+import app  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def dados():
+    transacoes = app.generate_fake_data(seed=7, perfil='demo')[2]
+    return transacoes.sort_values('data', kind='stable', ignore_index=True)
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    """Store de um dataset demo gravado num diretório temporário"""
+    monkeypatch.setattr(app, 'DATA_DIR', tmp_path)
+    app.load_dataset.clear()
+    store = app.load_dataset(1, pd.Timestamp.today().strftime('%Y%m%d'))
+    yield store
+    app.load_dataset.clear()
+
+
+def reopen(store):
+    """O mesmo diretório aberto do zero, como faria outro processo"""
+    return dict(store, lock=threading.Lock(), tabelas={}, carregando={}, prefetch=set())
+
+
+def split_batch(transacoes, rng, n=300):
+    """Base em ordem de data e um lote sorteado de qualquer mês (inclui linhas retroativas)"""
+    no_lote = np.zeros(len(transacoes), dtype=bool)
+    no_lote[rng.choice(len(transacoes), n, replace=False)] = True
+    return (transacoes[~no_lote].reset_index(drop=True),
+            transacoes[no_lote].sort_values('data', kind='stable', ignore_index=True))
+
+
+def sorted_cube(cubo):
+    chaves = ['periodo', 'regiao', 'produto', 'status']
+    return cubo.astype({c: str for c in chaves[1:]}).sort_values(chaves, ignore_index=True)[chaves + ['valor', 'transacoes']]
+
+
+@pytest.mark.parametrize('granularidade', ['ME', 'D'])
+def test_rollup_incremental_matches_rebuild(dados, granularidade):
+    base, lote = split_batch(dados, np.random.default_rng(1))
+    incremental = app.update_rollup_cube(app.build_rollup_cube(base, granularidade), lote)
+    completo = app.build_rollup_cube(dados, granularidade)
+
+    pd.testing.assert_frame_equal(incremental['mensal'], completo['mensal'], check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_cube(incremental['cubo']), sorted_cube(completo['cubo']), check_dtype=False)
+    assert incremental['clientes_por_mes'].keys() == completo['clientes_por_mes'].keys()
+    for mes, codigos in completo['clientes_por_mes'].items():
+        np.testing.assert_array_equal(incremental['clientes_por_mes'][mes], codigos)
+
+
+def test_cohort_incremental_matches_rebuild(dados):
+    # Lote no fim do período: a matriz é atualizada sem reconstrução
+    corte = len(dados) - 200
+    base, lote = dados.iloc[:corte].reset_index(drop=True), dados.iloc[corte:].reset_index(drop=True)
+    incremental = app.update_cohort_matrix(app.build_cohort_matrix(base), lote)
+    completo = app.build_cohort_matrix(dados)
+    assert incremental is not None
+    np.testing.assert_array_equal(incremental['atividade'], completo['atividade'])
+    np.testing.assert_allclose(incremental['receita'], completo['receita'])
+    np.testing.assert_array_equal(incremental['ativos'], completo['ativos'])
+
+    # Lote retroativo: ou pede reconstrução (None) ou chega ao mesmo resultado
+    base, lote = split_batch(dados, np.random.default_rng(2))
+    retroativo = app.update_cohort_matrix(app.build_cohort_matrix(base), lote)
+    if retroativo is not None:
+        np.testing.assert_array_equal(retroativo['atividade'], completo['atividade'])
+        np.testing.assert_allclose(retroativo['receita'], completo['receita'])
+
+
+def test_extend_sorted_positions_matches_full_sort(dados):
+    corte = len(dados) - 250
+    dados = dados.assign(valor=dados['valor'] // 20000 * 20000)  # força empates de valor
+    anterior = app.build_transaction_index(dados.iloc[:corte].reset_index(drop=True))
+    chaves = [(ordenacao, status) for ordenacao in ('data', 'valor') for status in (None, 'Concluída', 'Pendente')]
+    for chave in chaves:
+        app.get_sorted_positions(anterior, *chave)
+
+    indice = app.build_transaction_index(dados)
+    app.extend_sorted_positions(indice, anterior['ordens'], corte)
+    completo = app.build_transaction_index(dados)
+    for chave in chaves:
+        np.testing.assert_array_equal(indice['ordens'][chave], app.get_sorted_positions(completo, *chave))
+
+
+@pytest.mark.parametrize('periodo', ['Hoje', 'Este Mês', 'Últimos 3 Meses', 'Este Ano'])
+@pytest.mark.parametrize('regioes,produto', [(['Todos'], 'Todos'), (['São Paulo', 'Paraná'], 'Todos'),
+                                             (['Todos'], 'Aurum Pro'), (['Minas Gerais'], 'Aurum Premium')])
+def test_filter_and_feed_match_pandas(dados, periodo, regioes, produto):
+    indice = app.build_transaction_index(dados)
+    posicoes = app.filter_transactions(indice, periodo, regioes, produto)
+
+    inicio, fim = app.get_period_range(periodo)
+    mascara = (dados['data'] >= inicio) & (dados['data'] < fim)
+    if 'Todos' not in regioes:
+        mascara &= dados['regiao'].isin(regioes)
+    if produto != 'Todos':
+        mascara &= dados['produto'] == produto
+    np.testing.assert_array_equal(posicoes, np.flatnonzero(mascara))
+
+    for status in (None, 'Pendente'):
+        esperadas = posicoes if status is None else posicoes[dados['status'].values[posicoes] == status]
+        # Mais recentes primeiro; por valor, maiores primeiro e empates do mais recente ao mais antigo
+        np.testing.assert_array_equal(app.query_transaction_feed(indice, posicoes, status, 'data'), esperadas[::-1])
+        por_valor = esperadas[np.argsort(dados['valor'].values[esperadas], kind='stable')][::-1]
+        np.testing.assert_array_equal(app.query_transaction_feed(indice, posicoes, status, 'valor'), por_valor)
+
+
+def test_nearest_site_matches_brute_force():
+    rng = np.random.default_rng(3)
+    lat, lon = rng.uniform(-34, 6, 20000), rng.uniform(-74, -34, 20000)
+    unidades_lat, unidades_lon = rng.uniform(-34, 6, 400), rng.uniform(-74, -34, 400)
+    raio = rng.integers(40, 250, 400)
+
+    mais_proxima, distancia, coberto = app.assign_nearest_sites(lat, lon, unidades_lat, unidades_lon, raio)
+
+    todas = app.haversine_km(lat[:, None], lon[:, None], unidades_lat[None, :], unidades_lon[None, :])
+    np.testing.assert_allclose(distancia, todas.min(axis=1), atol=1e-6)
+    np.testing.assert_allclose(todas[np.arange(len(lat)), mais_proxima], todas.min(axis=1), atol=1e-6)
+    # Pontos exatamente na borda de um raio podem cair de qualquer lado pelo arredondamento
+    folga = np.abs(todas - raio[None, :]).min(axis=1) > 1e-6
+    np.testing.assert_array_equal(coberto[folga], (todas <= raio[None, :]).any(axis=1)[folga])
+
+
+@pytest.mark.parametrize('pergunta,esperado', [
+    ("Vendas do último trimestre por região", {'metrica': 'valor', 'periodo': ('trimestre', 1), 'agrupar': 'regiao'}),
+    ("Transações pendentes de SP este mês", {'metrica': 'transacoes', 'periodo': ('mes', 0),
+                                            'regioes': ['São Paulo'], 'status': ['Pendente']}),
+    ("Ticket médio do Aurum Premium este ano", {'metrica': 'ticket', 'periodo': ('ano', 0),
+                                              'produtos': ['Aurum Premium']}),
+    ("Qual o faturamento por vendedor nos últimos 45 dias?", {'metrica': 'receita', 'periodo': ('dias', 45),
+                                                            'agrupar': 'vendedor'}),
+    ("vendas de março", {'metrica': 'valor', 'periodo': ('mes_nome', 3)}),
+])
+def test_parse_question(pergunta, esperado):
+    consulta = app.parse_question(app.normalize_text(pergunta), tuple(app.PRODUTOS))
+    assert {chave: consulta[chave] for chave in esperado} == esperado
+
+
+def test_parse_question_unrecognized():
+    assert app.parse_question(app.normalize_text("bom dia, tudo bem?"), tuple(app.PRODUTOS)) is None
+
+
+@pytest.mark.parametrize('pergunta', [
+    "vendas por região no último trimestre",
+    "receita por vendedor este ano",
+    "ticket médio por produto nos últimos 90 dias",
+    "transações pendentes de SP por mês este ano",
+])
+def test_chat_query_matches_pandas(store, pergunta):
+    consulta = app.parse_question(app.normalize_text(pergunta), app.get_dimension(store, 'produtos'))
+    resultado = app.run_chat_query(store, consulta)
+
+    transacoes = app.get_table(store, 'transacoes')
+    linhas = transacoes[(transacoes['data'] >= resultado['inicio']) & (transacoes['data'] < resultado['fim'])]
+    for coluna, valores in (('regiao', consulta['regioes']), ('produto', consulta['produtos']), ('status', consulta['status'])):
+        if valores:
+            linhas = linhas[linhas[coluna].isin(valores)]
+    if consulta['metrica'] == 'receita':
+        linhas = linhas[linhas['status'] == 'Concluída']
+
+    medida = {'transacoes': 'size', 'ticket': 'mean'}.get(consulta['metrica'], 'sum')
+    assert resultado['total'] == pytest.approx(linhas['valor'].agg(medida))
+    chave = linhas['data'].dt.to_period('M').dt.strftime('%m/%Y') if consulta['agrupar'] == 'mes' else linhas[consulta['agrupar']]
+    if consulta['agrupar'] == 'vendedor':
+        chave = chave.map(app.get_table(store, 'vendedores')['nome'])
+    esperado = linhas.groupby(chave, observed=True)['valor'].agg(medida)
+    assert resultado['grupos'].sort_index().to_dict() == pytest.approx(esperado.sort_index().to_dict())
+
+
+def test_ingestion_matches_reopened_store(store):
+    for tabela in ('indice', 'coortes', 'kpis'):
+        app.get_table(store, tabela)
+    for nome in ('valor', 'data'):
+        app.get_sorted_positions(app.get_table(store, 'indice'), nome)
+    for lote in range(3):
+        app.ingest_transactions(store, app.generate_transaction_batch(store, [store['seed'], lote]))
+
+    reaberto = reopen(store)
+    pd.testing.assert_frame_equal(app.get_table(store, 'transacoes'), app.get_table(reaberto, 'transacoes'))
+    pd.testing.assert_frame_equal(app.get_table(store, 'rollup')['mensal'], app.get_table(reaberto, 'rollup')['mensal'])
+    assert app.get_table(store, 'kpis') == app.get_table(reaberto, 'kpis')
+    np.testing.assert_array_equal(app.get_table(store, 'coortes')['atividade'], app.get_table(reaberto, 'coortes')['atividade'])
+    for nome in ('valor', 'data'):
+        np.testing.assert_array_equal(app.get_sorted_positions(app.get_table(store, 'indice'), nome),
+                                      app.get_sorted_positions(app.get_table(reaberto, 'indice'), nome))
+
+
+def test_concurrent_stores_publish_distinct_parts(store):
+    outro = reopen(store)
+    app.ingest_transactions(store, app.generate_transaction_batch(store, [1, 1]))
+    app.ingest_transactions(store, app.generate_transaction_batch(store, [1, 2]))
+    app.ingest_transactions(outro, app.generate_transaction_batch(outro, [1, 3]))
+
+    assert [parte.name for parte in app.list_parts(store['diretorio'])] == [
+        'transacoes-000001.arrow', 'transacoes-000002.arrow', 'transacoes-000003.arrow']
+    assert outro['revisao'] == 3
+    pd.testing.assert_frame_equal(app.get_table(outro, 'transacoes'), app.get_table(reopen(outro), 'transacoes'))